@@ -11,40 +11,65 @@ bl_info = {
 
 import bpy
 import sys
+import time
 import importlib
 import os
 
 # ТОЛЬКО БАЗОВЫЕ МОДУЛИ FREE-ВЕРСИИ
+# Регистрируются при включении аддона и не импортируют ядро децимации (NumPy, BMesh)
 base_modules = [
     ".locale_loader",
     ".preferences",
-    ".core.edge_analyzer",
-    ".core.base_decimate",
+    ".core.preview",
+    ".core.properties",
     ".operators.generate_lowpoly",
+    ".operators.batch_decimate",
+    ".operators.generate_lod",
+    ".operators.preview",
+    ".ui.stats_cache",
     ".ui.panel"
 ]
 
+# Ядро загружается при первом запуске оператора; при отключении аддона
+# unregister() вызывается только у уже загруженных модулей (сброс кэшей)
+lazy_modules = [
+    ".core.analysis_cache",
+]
+
 # FREE-ВЕРСИЯ - НЕТ PRO-ФУНКЦИЙ
 has_pro = False
 all_modules = base_modules
 
+# Режим разработчика: при каждом включении код всех модулей перечитывается с диска
+DEV_RELOAD_ENV = "SHARPDECIMATE_DEV_RELOAD"
+
+# Время регистрации последнего включения: модуль -> секунды
+registration_times = {}
+
+def is_dev_reload():
+    return os.environ.get(DEV_RELOAD_ENV, "") not in ("", "0")
+
+def purge_submodules():
+    """Выгрузка всех подмодулей аддона (включая ядро) - следующий импорт читает их заново"""
+    prefix = __package__ + "."
+    for name in [name for name in sys.modules if name.startswith(prefix)]:
+        del sys.modules[name]
+
 def register_modules(modules_list):
     """Рекурсивная регистрация всех модулей"""
     registered = []
     for module_name in modules_list:
+        start = time.perf_counter()
         try:
             if module_name.startswith("."):
                 full_name = __package__ + module_name
             else:
                 full_name = module_name
                 
-            if full_name in sys.modules:
-                importlib.reload(sys.modules[full_name])
-            else:
-                importlib.import_module(full_name, package=__package__)
+            # Уже загруженный модуль используется как есть (перезагрузка - только в режиме разработчика)
+            module = importlib.import_module(full_name, package=__package__)
                 
             # Регистрация классов Blender
-            module = sys.modules[full_name]
             if hasattr(module, 'register'):
                 module.register()
                 
@@ -52,6 +77,8 @@ def register_modules(modules_list):
             
         except Exception as e:
             print(f"SharpDecimate: Failed to register {module_name}: {e}")
+        finally:
+            registration_times[module_name] = time.perf_counter() - start
     
     return registered
 
@@ -75,30 +102,39 @@ def unregister_modules(modules_list):
 def register():
     """Регистрация аддона"""
     print("SharpDecimate: FREE VERSION LOADED")
+    start = time.perf_counter()
+    
+    dev_reload = is_dev_reload()
+    if dev_reload:
+        purge_submodules()
     
     # Очистка кэша локалей
-    from .locale_loader import get_text
-    if hasattr(get_text, "_cache"):
-        delattr(get_text, "_cache")
+    from .locale_loader import clear_cache
+    clear_cache()
     
     # УДАЛЕНО: safe_cleanup() - опасная функция
     
     # Регистрация всех модулей
+    registration_times.clear()
     register_modules(all_modules)
     
-    print(f"SharpDecimate FREE v{bl_info['version']} registered")
+    elapsed = (time.perf_counter() - start) * 1000.0
+    print(f"SharpDecimate FREE v{bl_info['version']} registered in {elapsed:.1f} ms"
+          + (" (dev reload)" if dev_reload else ""))
+    if dev_reload:
+        for module_name, seconds in registration_times.items():
+            print(f"  {module_name}: {seconds * 1000.0:.1f} ms")
 
 def unregister():
     """Отмена регистрации аддона"""
-    # Отмена регистрации модулей
-    unregister_modules(all_modules)
+    # Отмена регистрации модулей (загруженные модули ядра - первыми)
+    unregister_modules(all_modules + lazy_modules)
     
     # УДАЛЕНО: reset_all() - опасная функция
     
     # Очистка кэша локалей
-    from .locale_loader import get_text
-    if hasattr(get_text, "_cache"):
-        delattr(get_text, "_cache")
+    from .locale_loader import clear_cache
+    clear_cache()
     
     print("SharpDecimate unregistered")
 
@@ -0,0 +1,260 @@
+# FILE: cli.py
+# Пакетная обработка библиотек ассетов без интерфейса.
+# Запуск: blender -b --factory-startup --python cli.py -- --settings settings.json --output out/ --jobs 4 "assets/**/*.blend"
+# Координатор можно запускать и обычным python (путь к Blender - через --blender).
+import os
+import sys
+import glob
+import json
+import time
+import argparse
+import importlib
+import subprocess
+import traceback
+
+SUPPORTED_EXTENSIONS = (".blend", ".obj", ".fbx")
+MANIFEST_NAME = "manifest.json"
+# Статусы, при которых файл не обрабатывается повторно
+COMPLETE_STATUSES = ("done", "skipped")
+
+def import_addon_module(name):
+    """Импорт модуля аддона, когда cli запущен как отдельный скрипт"""
+    addon_dir = os.path.dirname(os.path.abspath(__file__))
+    parent_dir = os.path.dirname(addon_dir)
+    if parent_dir not in sys.path:
+        sys.path.insert(0, parent_dir)
+    return importlib.import_module(f"{os.path.basename(addon_dir)}.{name}")
+
+def parse_args(argv):
+    # Внутри Blender аргументы скрипта идут после "--"
+    args = argv[argv.index("--") + 1:] if "--" in argv else argv[1:]
+
+    parser = argparse.ArgumentParser(prog="sharpdecimate-cli", description="SharpDecimate batch processor")
+    parser.add_argument("inputs", nargs="+", help="Input files or glob patterns (.blend, .obj, .fbx)")
+    parser.add_argument("--output", required=True, help="Output directory")
+    parser.add_argument("--settings", help="JSON file with SharpDecimateProperties values")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1, help="Parallel Blender processes")
+    parser.add_argument("--manifest", help=f"Resume manifest (default: <output>/{MANIFEST_NAME})")
+    parser.add_argument("--timeout", type=float, default=None, help="Per-file timeout in seconds")
+    parser.add_argument("--retry-failed", action="store_true", help="Process files that failed in a previous run")
+    parser.add_argument("--blender", help="Blender executable (default: current Blender or 'blender')")
+    parser.add_argument("--log-level", default="WARNING", help="Worker console output: ERROR, WARNING, INFO, DEBUG")
+    # Внутренний режим: обработка одного файла в дочернем процессе
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--report", help=argparse.SUPPRESS)
+    return parser.parse_args(args)
+
+def expand_inputs(patterns):
+    """Файлы по путям и glob-шаблонам (рекурсивно для **), без повторов"""
+    paths = set()
+    for pattern in patterns:
+        matches = glob.glob(pattern, recursive=True) if glob.has_magic(pattern) else [pattern]
+        for path in matches:
+            if os.path.isfile(path) and path.lower().endswith(SUPPORTED_EXTENSIONS):
+                paths.add(os.path.abspath(path))
+    return sorted(paths)
+
+def get_output_path(input_path, input_root, output_dir):
+    """Путь результата: структура каталогов входа повторяется в output_dir"""
+    return os.path.join(output_dir, os.path.relpath(input_path, input_root))
+
+def get_report_path(output_path):
+    return os.path.splitext(output_path)[0] + ".report.json"
+
+def write_json(path, data):
+    """Атомарная запись JSON (прерванный запуск не оставляет битый файл)"""
+    temp_path = path + ".tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+    os.replace(temp_path, path)
+
+def read_json(path, default=None):
+    if not path or not os.path.exists(path):
+        return default
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"⚠️ Cannot read {path}: {e}")
+        return default
+
+# ============================================
+# Обработка одного файла (внутри Blender)
+# ============================================
+
+def load_scene(input_path):
+    """Открытие .blend или импорт .obj/.fbx в пустую сцену"""
+    import bpy
+    extension = os.path.splitext(input_path)[1].lower()
+    if extension == ".blend":
+        bpy.ops.wm.open_mainfile(filepath=input_path)
+        return
+    bpy.ops.wm.read_factory_settings(use_empty=True)
+    if extension == ".obj":
+        bpy.ops.wm.obj_import(filepath=input_path)
+    else:
+        bpy.ops.import_scene.fbx(filepath=input_path)
+
+def save_result(output_path, results):
+    """.blend сохраняется целиком, в .obj/.fbx экспортируются только lowpoly-объекты"""
+    import bpy
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    extension = os.path.splitext(output_path)[1].lower()
+    if extension == ".blend":
+        bpy.ops.wm.save_as_mainfile(filepath=output_path, copy=True)
+        return
+
+    for obj in bpy.context.view_layer.objects:
+        obj.select_set(obj in results)
+    if extension == ".obj":
+        bpy.ops.wm.obj_export(filepath=output_path, export_selected_objects=True)
+    else:
+        bpy.ops.export_scene.fbx(filepath=output_path, use_selection=True)
+
+def process_file(input_path, output_path, settings_values, log_level="WARNING"):
+    """Децимация всех мешей файла, результат - словарь отчета"""
+    import bpy
+    settings_module = import_addon_module("core.settings")
+    import_addon_module("core.profiling").configure(log_level=log_level)
+    batch = import_addon_module("operators.batch_decimate")
+    integrity = import_addon_module("core.integrity")
+
+    report = {"input": input_path, "output": output_path, "status": "failed", "objects": []}
+    known = set(settings_module.get_property_names())
+    report["unknown_settings"] = sorted(name for name in settings_values if name not in known)
+    settings = settings_module.make_settings(settings_values, validate=True)
+    report["settings"] = vars(settings)
+
+    start = time.perf_counter()
+    load_scene(input_path)
+    jobs = batch.collect_batch_jobs(list(bpy.context.scene.objects))
+    if not jobs:
+        report["status"] = "skipped"
+        report["error"] = "no mesh objects"
+        return report
+
+    results = []
+    for job in jobs:
+        batch.run_batch_job(bpy.context, job, settings)
+        entry = {
+            "objects": [obj.name for obj in job.objects],
+            "source_faces": job.source_faces,
+            "result_faces": job.result_faces,
+            "seconds": job.seconds,
+            "error": job.error,
+        }
+        if job.results:
+            entry["integrity"] = integrity.check_object_integrity(job.results[0], settings).to_dict()
+        report["objects"].append(entry)
+        results += job.results
+
+    if results:
+        save_result(output_path, results)
+    failed = [entry for entry in report["objects"] if entry["error"] is not None]
+    report["status"] = "failed" if failed or not results else "done"
+    report["seconds"] = time.perf_counter() - start
+    return report
+
+def run_worker(args):
+    """Дочерний процесс: один входной файл -> результат и JSON-отчет"""
+    input_path = args.inputs[0]
+    report = {"input": input_path, "output": args.output, "status": "failed"}
+    try:
+        report = process_file(input_path, args.output, read_json(args.settings, {}), args.log_level)
+    except Exception as e:
+        report["error"] = str(e)
+        traceback.print_exc()
+    write_json(args.report, report)
+    print(f"{'✅' if report['status'] != 'failed' else '❌'} {input_path}: {report['status']}")
+    return 0 if report["status"] != "failed" else 1
+
+# ============================================
+# Координатор: очередь файлов и пул процессов Blender
+# ============================================
+
+def get_blender_binary(args):
+    if args.blender:
+        return args.blender
+    try:
+        import bpy
+        return bpy.app.binary_path
+    except ImportError:
+        return "blender"
+
+def make_worker_command(blender, args, input_path, output_path, report_path):
+    command = [
+        blender, "-b", "--factory-startup", "--python-exit-code", "1",
+        "--python", os.path.abspath(__file__), "--",
+        "--worker", "--output", output_path, "--report", report_path, "--log-level", args.log_level,
+    ]
+    if args.settings:
+        command += ["--settings", os.path.abspath(args.settings)]
+    return command + [input_path]
+
+def run_batch(args):
+    """Обработка файлов пулом из args.jobs процессов с возобновлением по манифесту"""
+    inputs = expand_inputs(args.inputs)
+    if not inputs:
+        print("❌ No input files found")
+        return 1
+
+    output_dir = os.path.abspath(args.output)
+    os.makedirs(output_dir, exist_ok=True)
+    manifest_path = args.manifest or os.path.join(output_dir, MANIFEST_NAME)
+    manifest = read_json(manifest_path, {})
+    if args.settings and read_json(args.settings) is None:
+        print(f"❌ Invalid settings file: {args.settings}")
+        return 1
+
+    skip = COMPLETE_STATUSES if args.retry_failed else COMPLETE_STATUSES + ("failed", "timeout")
+    pending = [path for path in inputs if manifest.get(path, {}).get("status") not in skip]
+    print(f"📦 Batch: {len(inputs)} files, {len(inputs) - len(pending)} already processed, "
+          f"{len(pending)} queued on {args.jobs} processes")
+
+    input_root = os.path.commonpath([os.path.dirname(path) for path in inputs])
+    blender = get_blender_binary(args)
+    start = time.perf_counter()
+    running = {}
+
+    while pending or running:
+        while pending and len(running) < max(args.jobs, 1):
+            input_path = pending.pop(0)
+            output_path = get_output_path(input_path, input_root, output_dir)
+            report_path = get_report_path(output_path)
+            os.makedirs(os.path.dirname(output_path), exist_ok=True)
+            command = make_worker_command(blender, args, input_path, output_path, report_path)
+            process = subprocess.Popen(command, stdout=subprocess.DEVNULL)
+            running[input_path] = (process, report_path, time.perf_counter())
+
+        time.sleep(0.1)
+        for input_path, (process, report_path, started) in list(running.items()):
+            seconds = time.perf_counter() - started
+            if process.poll() is None:
+                if args.timeout is None or seconds < args.timeout:
+                    continue
+                process.kill()
+                process.wait()
+                status = "timeout"
+            else:
+                report = read_json(report_path, {})
+                status = report.get("status", "failed")
+
+            del running[input_path]
+            manifest[input_path] = {"status": status, "report": report_path, "seconds": seconds}
+            write_json(manifest_path, manifest)
+            print(f"{'✅' if status in COMPLETE_STATUSES else '❌'} {input_path}: {status} ({seconds:.1f}s)")
+
+    statuses = [manifest.get(path, {}).get("status") for path in inputs]
+    failed = sum(1 for status in statuses if status not in COMPLETE_STATUSES)
+    print(f"📦 Batch finished in {time.perf_counter() - start:.1f}s: "
+          f"{len(inputs) - failed} ok, {failed} failed | manifest: {manifest_path}")
+    return 1 if failed else 0
+
+def main(argv):
+    args = parse_args(argv)
+    if args.worker:
+        return run_worker(args)
+    return run_batch(args)
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
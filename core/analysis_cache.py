@@ -0,0 +1,143 @@
+# FILE: core/analysis_cache.py
+import hashlib
+from collections import OrderedDict
+
+from .mesh_arrays import (np, get_vertex_coords, get_edge_vertices, get_loop_vertices, get_polygon_loops,
+                          get_polygon_material_indices, get_sharp_mask, get_edge_creases)
+from .edge_analyzer import compute_edge_angles, ProtectedEdges
+from .protection_weights import compute_protection_weights
+from .importance import compute_importance
+
+MAX_CACHED_MESHES = 8
+
+def read_fingerprint_buffers(mesh):
+    """Буферы меша, по которым строится отпечаток (их же использует анализ)"""
+    return {
+        "coords": get_vertex_coords(mesh),
+        "edge_verts": get_edge_vertices(mesh),
+        "loop_verts": get_loop_vertices(mesh),
+        "loop_totals": get_polygon_loops(mesh)[1],
+        "material_indices": get_polygon_material_indices(mesh),
+        "sharp": get_sharp_mask(mesh),
+        "creases": get_edge_creases(mesh),
+    }
+
+def mesh_fingerprint(buffers):
+    """Отпечаток содержимого меша: blake2b по сырым байтам буферов"""
+    digest = hashlib.blake2b(digest_size=16)
+    for name in sorted(buffers):
+        array = np.ascontiguousarray(buffers[name])
+        digest.update(name.encode())
+        digest.update(np.array(array.shape, dtype=np.int64).tobytes())
+        digest.update(array.tobytes())
+    return digest.hexdigest()
+
+class MeshAnalysis:
+    """Результаты анализа исходного меша, которые не зависят от настроек децимации
+
+    Тяжелые части (углы, индекс защищенных ребер) считаются при первом запросе.
+    Ссылка на Mesh не хранится - методы получают меш с тем же содержимым.
+    """
+
+    def __init__(self, fingerprint, buffers):
+        self.fingerprint = fingerprint
+        self.sharp = buffers["sharp"]
+        self.creases = buffers["creases"]
+        self.material_face_counts = np.bincount(buffers["material_indices"])
+        self._edge_angles = None
+        self._importance = None
+        self._protected_edges = {}
+        self._protection_weights = {}
+
+    def edge_angles(self, mesh):
+        """Углы между полигонами по ребрам (градусы, NaN для не-manifold)"""
+        if self._edge_angles is None:
+            self._edge_angles = compute_edge_angles(mesh)
+        return self._edge_angles
+
+    def importance(self, mesh):
+        """Важность вершин (кривизна и контуры) - не зависит от настроек, считается один раз"""
+        if self._importance is None:
+            self._importance = compute_importance(mesh, self.edge_angles(mesh))
+        return self._importance
+    
+    def sharp_edge_mask(self, mesh, angle_threshold):
+        with np.errstate(invalid='ignore'):
+            return self.edge_angles(mesh) > angle_threshold
+
+    def protected_edge_mask(self, mesh, angle_threshold, keep_sharp=True, keep_crease=True, crease_threshold=0.01):
+        """Острые по углу + ручные Sharp + Crease"""
+        mask = self.sharp_edge_mask(mesh, angle_threshold)
+        if keep_sharp:
+            mask |= self.sharp
+        if keep_crease:
+            mask |= self.creases > crease_threshold
+        return mask
+
+    def protected_edges(self, mesh, keep_sharp, keep_crease, tolerance):
+        """ProtectedEdges для переноса Sharp/Crease (по одному на набор настроек)"""
+        key = (keep_sharp, keep_crease, tolerance)
+        if key not in self._protected_edges:
+            self._protected_edges[key] = ProtectedEdges(mesh, keep_sharp, keep_crease, tolerance)
+        return self._protected_edges[key]
+
+    def protection_weights(self, mesh, angle_threshold, keep_sharp, keep_crease, high_detail_slots, falloff):
+        """Веса защиты вершин для модификатора (по одному массиву на набор настроек)"""
+        key = (angle_threshold, keep_sharp, keep_crease, tuple(high_detail_slots), falloff)
+        if key not in self._protection_weights:
+            edge_mask = self.protected_edge_mask(mesh, angle_threshold, keep_sharp, keep_crease)
+            self._protection_weights[key] = compute_protection_weights(mesh, edge_mask, high_detail_slots, falloff)
+        return self._protection_weights[key]
+
+class AnalysisCache:
+    """LRU-кэш MeshAnalysis по отпечатку содержимого меша
+
+    Измененный меш дает новый отпечаток, старая запись вытесняется
+    при превышении max_entries.
+    """
+
+    def __init__(self, max_entries=MAX_CACHED_MESHES):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, mesh):
+        buffers = read_fingerprint_buffers(mesh)
+        fingerprint = mesh_fingerprint(buffers)
+
+        analysis = self.entries.get(fingerprint)
+        if analysis is not None:
+            self.entries.move_to_end(fingerprint)
+            self.hits += 1
+            return analysis
+
+        self.misses += 1
+        analysis = MeshAnalysis(fingerprint, buffers)
+        self.entries[fingerprint] = analysis
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+        return analysis
+
+    def clear(self):
+        self.entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+_analysis_cache = AnalysisCache()
+
+def get_mesh_analysis(mesh):
+    """Анализ меша из общего кэша (пересчитывается только при изменении меша)"""
+    return _analysis_cache.get(mesh)
+
+def clear_analysis_cache():
+    _analysis_cache.clear()
+
+def register():
+    pass
+
+def unregister():
+    clear_analysis_cache()
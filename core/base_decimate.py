@@ -1,487 +1,612 @@
 # FILE: core/base_decimate.py
 import bpy
-import bmesh
-from bpy.types import PropertyGroup
-from bpy.props import FloatProperty, BoolProperty, PointerProperty, StringProperty
 
-from ..locale_loader import get_text
-from ..preferences import get_ui_language
-from .edge_analyzer import (analyze_sharp_edges, get_manual_sharp_edges, 
-                           get_creased_edges, preserve_hard_edges, analyze_protected_edges)
+from .edge_analyzer import mark_sharp_edges, get_protected_edge_mask, SourceAnalysis
+from .profiling import StageTimer, log, span
+from .data_ops import sync_edit_mode, duplicate_object, replace_mesh, evaluate_decimate
+from .mesh_arrays import HAS_NUMPY, MeshBuffers, set_sharp_mask
+from .partition import (decimate_partitions, partition_by_material, partition_buffers, decimate_part, merge_parts,
+                        build_part_mesh)
+from .chunking import plan_chunks, weld_chunks
+from .islands import IslandStats, plan_island_policies, get_island_groups, build_island_proxies, count_policies
+from .parallel import parallel_decimate_mesh
+from .qem import qem_decimate_mesh
+from .analysis_cache import get_mesh_analysis
+from .integrity import check_object_integrity
+from .preview import stop_preview
+from .protection_weights import build_protection_weights
+from .importance import get_importance
+from .geometric_error import ErrorMeter, solve_target_error, write_error_attribute, MAX_RATIO
+from .settings import make_settings
 
-class SharpDecimateProperties(PropertyGroup):
-    sharp_angle: FloatProperty(
-        name="Sharp Angle",
-        description="Edges with higher angle will be preserved",
-        min=70.0,
-        max=85.0,
-        default=75.0,
-        precision=1
-    )
-    
-    keep_sharp: BoolProperty(
-        name="Keep Marked Sharp",
-        description="Preserve manually marked sharp edges",
-        default=True,
-    )
-    
-    keep_crease: BoolProperty(
-        name="Keep Edge Crease", 
-        description="Preserve edges with crease values",
-        default=True,
-    )
-    
-    ratio: FloatProperty(
-        name="Ratio",
-        description="Target polygon ratio (0.1 = 10% of original)",
-        min=0.01,
-        max=0.99,
-        default=0.3,
-        precision=2,
-        subtype='FACTOR'
-    )
-    
-    # Material-based decimation properties
-    use_material_decimation: BoolProperty(
-        name="Enable Material Decimation",
-        description="Use different decimation ratios based on materials",
-        default=False,
-    )
-    
-    material_high_ratio: FloatProperty(
-        name="High Detail Ratio",
-        description="Decimation ratio for important materials (first 2-3 slots)",
-        min=0.01,
-        max=0.99,
-        default=0.8,
-        precision=2,
-        subtype='FACTOR'
-    )
-    
-    material_low_ratio: FloatProperty(
-        name="Low Detail Ratio",
-        description="Decimation ratio for less important materials",
-        min=0.01,
-        max=0.99,
-        default=0.2,
-        precision=2,
-        subtype='FACTOR'
-    )
+def get_material_ratio(material, props):
+    """Ratio децимации для материала (HighDetail / остальные)"""
+    if material is not None and "HighDetail" in material.name:
+        return props.material_high_ratio
+    return props.material_low_ratio
 
-def safe_select_all(action='DESELECT'):
-    """Безопасное выделение/снятие выделения"""
-    try:
-        if bpy.context.mode == 'OBJECT':
-            bpy.ops.object.select_all(action=action)
-        elif bpy.context.mode == 'EDIT_MESH':
-            bpy.ops.mesh.select_all(action=action)
-    except Exception as e:
-        print(f"SharpDecimate: Safe select failed: {e}")
-
-def safe_mode_set(mode='OBJECT'):
-    """Безопасное переключение режима"""
-    try:
-        if bpy.context.mode != mode:
-            bpy.ops.object.mode_set(mode=mode)
-    except Exception as e:
-        print(f"SharpDecimate: Safe mode set failed: {e}")
+def make_ratio_getter(source_mesh, props, use_materials=True):
+    """Функция material_index -> ratio для частей меша"""
+    materials = source_mesh.materials
+    
+    def ratio_for_index(material_index):
+        if not use_materials:
+            return props.ratio
+        material = materials[material_index] if material_index < len(materials) else None
+        return get_material_ratio(material, props)
+    
+    return ratio_for_index
 
-def check_mesh_integrity(obj):
-    """Проверка целостности меша после децимации"""
-    try:
-        # Проверка что меш не пустой
-        if len(obj.data.polygons) == 0:
-            return False, "Mesh has no polygons after decimation"
-        
-        # Проверка на наличие геометрии
-        if len(obj.data.vertices) < 3:
-            return False, "Mesh has too few vertices"
-            
-        # Проверка водонепроницаемости
-        bm = bmesh.new()
-        bm.from_mesh(obj.data)
-        bm.edges.ensure_lookup_table()
-        bm.verts.ensure_lookup_table()
-        
-        issues = []
-        
-        # Проверка на non-manifold geometry
-        non_manifold_edges = [e for e in bm.edges if not e.is_manifold]
-        if non_manifold_edges:
-            issues.append(f"Non-manifold edges: {len(non_manifold_edges)}")
-            
-        # Проверка на loose geometry
-        loose_verts = [v for v in bm.verts if not v.link_edges]
-        if loose_verts:
-            issues.append(f"Loose vertices: {len(loose_verts)}")
-        
-        # Проверка на degenerate faces
-        degenerate_faces = [f for f in bm.faces if f.calc_area() < 0.0001]
-        if degenerate_faces:
-            issues.append(f"Degenerate faces: {len(degenerate_faces)}")
-        
-        bm.free()
-        
-        if issues:
-            return False, ", ".join(issues)
-            
-        return True, "Mesh integrity OK"
-        
-    except Exception as e:
-        return False, f"Mesh check failed: {str(e)}"
+class DecimateJob:
+    """Пошаговая децимация одного объекта
 
-def apply_decimate_modifier(obj, ratio):
-    """Применяет модификатор Decimate к объекту"""
-    try:
-        print(f"🔧 Applying decimation with ratio: {ratio}")
-        
-        # ГАРАНТИРУЕМ что в объектном режиме
-        safe_mode_set('OBJECT')
-        
-        # 🔴 ПРОВЕРКА ПЕРЕД ДЕЦИМАЦИЕЙ
-        pre_check, pre_message = check_mesh_integrity(obj)
-        if not pre_check:
-            print(f"⚠️ Mesh issues before decimation: {pre_message}")
-        
-        # СОЗДАЕМ МОДИФИКАТОР
-        mod = obj.modifiers.new(name="SharpDecimate_Temp", type='DECIMATE')
-        mod.decimate_type = 'COLLAPSE'
-        mod.ratio = ratio
-        
-        # ПРИМЕНЯЕМ МОДИФИКАТОР через оператор
-        bpy.context.view_layer.objects.active = obj
-        obj.select_set(True)
-        
-        # Пробуем применить модификатор
+    Работа разбита на этапы duplicate -> decimate -> protect -> transfer -> mark_sharp -> verify.
+    Каждый вызов step() выполняет один этап (в material- и chunked-режимах децимация
+    каждой части - отдельный этап), поэтому модальный оператор может отдавать управление
+    интерфейсу между этапами и откатить частично созданный объект через rollback().
+    """
+    
+    def __init__(self, context, original_obj, props, mode=None, source_analysis=None):
+        self.context = context
+        self.original_obj = original_obj
+        self.props = props
+        # Готовый анализ исходника (например, общий для всей LOD-цепочки)
+        self.source_analysis = source_analysis
+        self.mode = mode or self.detect_mode(original_obj, props)
+        self.name = "Low_" + original_obj.name
+        self.vertex_groups = [group.name for group in original_obj.vertex_groups]
+        self.timer = StageTimer(f"{self.name} [{self.mode}]")
+        
+        self.lowpoly_obj = None
+        self.decimated_parts = []
+        self.integrity = None
+        self.budget_report = None
+        self.source_protection = None
+        self.source_importance = None
+        self.mesh_analysis = None
+        self.chunk_plan = None
+        self.error_meter = None
+        self.error_report = None
+        
+        self.prepare_steps = [("duplicate", self.stage_duplicate)]
+        if props.use_importance and HAS_NUMPY:
+            self.prepare_steps.append(("importance", self.stage_importance))
+        # В chunked- и islands-режимах бюджет раздается без пробных децимаций всего меша
+        if props.use_target_budget and self.mode not in ('CHUNKED', 'ISLANDS'):
+            self.prepare_steps.append(("budget", self.stage_budget))
+        elif props.use_target_error and HAS_NUMPY and self.mode == 'STANDARD':
+            self.prepare_steps.append(("error_target", self.stage_error_target))
+        self.steps = list(self.prepare_steps)
+        self.steps += self.decimate_steps(self.mode)
+        self.steps += self.final_steps()
+        self.step_index = 0
+    
+    @staticmethod
+    def detect_mode(original_obj, props):
+        """Выбор алгоритма: CHUNKED, ISLANDS, PARALLEL, MATERIAL или STANDARD"""
+        if props.use_chunking and HAS_NUMPY:
+            return 'CHUNKED'
+        if props.use_island_policies and HAS_NUMPY:
+            return 'ISLANDS'
+        if props.use_parallel:
+            return 'PARALLEL'
+        if props.use_material_decimation and original_obj.data.materials:
+            return 'MATERIAL'
+        return 'STANDARD'
+    
+    @property
+    def finished(self):
+        return self.step_index >= len(self.steps)
+    
+    @property
+    def progress(self):
+        return self.step_index / max(len(self.steps), 1)
+    
+    @property
+    def stage_name(self):
+        return "done" if self.finished else self.steps[self.step_index][0]
+    
+    def decimate_steps(self, mode):
+        if mode == 'CHUNKED':
+            return [("chunks", self.stage_chunks)]
+        if mode == 'ISLANDS':
+            return [("islands", self.stage_islands)]
+        if mode == 'PARALLEL':
+            return [("decimate", self.stage_decimate_parallel)]
+        if mode == 'MATERIAL':
+            if HAS_NUMPY:
+                return [("partition", self.stage_partition)]
+            return [("decimate", self.stage_decimate_material)]
+        if self.use_protection_weights:
+            return [("weights", self.stage_weights), ("decimate", self.stage_decimate_standard)]
+        return [("decimate", self.stage_decimate_standard)]
+    
+    def final_steps(self):
+        steps = [
+            ("protect", self.stage_protect),
+            ("transfer", self.stage_transfer),
+            ("mark_sharp", self.stage_mark_sharp),
+        ]
+        if self.props.use_error_check and HAS_NUMPY:
+            steps.append(("error", self.stage_error))
+        steps.append(("verify", self.stage_verify))
+        return steps
+    
+    def replan(self, mode):
+        """Переход на другой алгоритм: этапы после duplicate/budget строятся заново"""
+        self.mode = mode
+        self.decimated_parts = []
+        self.steps = self.prepare_steps + self.decimate_steps(mode) + self.final_steps()
+        self.step_index = len(self.prepare_steps)
+    
+    def fallback_mode(self):
+        if self.mode == 'PARALLEL' and self.props.use_material_decimation and self.original_obj.data.materials:
+            return 'MATERIAL'
+        return 'STANDARD'
+    
+    def step(self):
+        """Выполнение следующего этапа, возвращает True, пока остались этапы"""
+        stage_name, stage = self.steps[self.step_index]
         try:
-            bpy.ops.object.modifier_apply(modifier="SharpDecimate_Temp")
-            print(f"✅ Decimation applied successfully via operator!")
+            with self.timer.stage(stage_name):
+                stage()
         except Exception as e:
-            print(f"⚠️ Operator apply failed, trying alternative method: {e}")
-            # Альтернативный метод
-            depsgraph = bpy.context.evaluated_depsgraph_get()
-            eval_obj = obj.evaluated_get(depsgraph)
-            mesh_copy = bpy.data.meshes.new_from_object(eval_obj)
-            
-            # УДАЛЯЕМ МОДИФИКАТОР И ПРИМЕНЯЕМ НОВЫЙ МЕШ
-            obj.modifiers.remove(mod)
-            old_mesh = obj.data
-            obj.data = mesh_copy
-            
-            # УДАЛЯЕМ СТАРЫЙ МЕШ
-            bpy.data.meshes.remove(old_mesh)
-            print(f"✅ Decimation applied via alternative method!")
-        
-        # 🔴 ПРОВЕРКА ПОСЛЕ ДЕЦИМАЦИИ
-        post_check, post_message = check_mesh_integrity(obj)
-        if not post_check:
-            print(f"⚠️ Mesh issues after decimation: {post_message}")
+            # Chunked-режиму некуда отступать: остальные держат весь меш в памяти
+            if self.mode in ('STANDARD', 'CHUNKED') or self.lowpoly_obj is None:
+                raise
+            fallback = self.fallback_mode()
+            log(f"❌ {self.mode} decimation failed: {e}, falling back to {fallback}", 'WARNING')
+            self.replan(fallback)
+            return True
+        
+        self.step_index += 1
+        if self.finished:
+            self.timer.finish(len(self.original_obj.data.polygons), len(self.lowpoly_obj.data.polygons))
+        return not self.finished
+    
+    def run(self):
+        """Выполнение всех этапов за один вызов"""
+        try:
+            while not self.finished:
+                self.step()
+        except Exception:
+            self.rollback()
+            raise
+        self.timer.print_report()
+        return self.lowpoly_obj
+    
+    def rollback(self):
+        """Удаление частично созданного объекта и временных данных"""
+        self.decimated_parts = []
+        self.chunk_plan = None
+        if self.lowpoly_obj is None:
+            return
+        try:
+            mesh = self.lowpoly_obj.data
+            bpy.data.objects.remove(self.lowpoly_obj, do_unlink=True)
+            if mesh.users == 0:
+                bpy.data.meshes.remove(mesh)
+        except Exception as e:
+            print(f"SharpDecimate: Rollback failed: {e}")
+        self.lowpoly_obj = None
+    
+    @property
+    def use_qem(self):
+        return self.props.decimate_engine == 'QEM' and HAS_NUMPY
+    
+    @property
+    def keeps_source_vertices(self):
+        """QEM (и chunked-режим на нем) не двигает вершины ребер - Sharp/Crease переносятся по ключам"""
+        return self.use_qem or self.mode == 'CHUNKED'
+    
+    @property
+    def use_protection_weights(self):
+        """Веса защиты и важности нужны только модификатору (QEM блокирует ребра и масштабирует квадрики сам)"""
+        return (self.props.use_protection_weights or self.props.use_importance) and not self.use_qem
+    
+    def get_protection(self, mesh):
+        """Веса защиты для децимируемого меша: исходник - из этапа weights, части - на месте"""
+        if not self.use_protection_weights:
+            return None
+        if mesh == self.original_obj.data:
+            if self.source_protection is None:
+                self.stage_weights()
+            return self.source_protection
+        with span("weights"):
+            return build_protection_weights(mesh, self.props, high_detail=False)
+    
+    def get_analysis(self):
+        """MeshAnalysis исходника: отпечаток меша считается один раз за задачу, дальше - ссылка"""
+        if self.mesh_analysis is None and HAS_NUMPY:
+            self.mesh_analysis = get_mesh_analysis(self.original_obj.data)
+        return self.mesh_analysis
+    
+    def decimate_mesh(self, mesh, ratio):
+        if self.use_qem:
+            # Анализ исходника кэшируется, временные меши частей - нет
+            analysis = self.get_analysis() if mesh == self.original_obj.data else None
+            return qem_decimate_mesh(mesh, ratio, self.props, analysis)
+        return evaluate_decimate(mesh, ratio, self.context, self.vertex_groups, self.get_protection(mesh))
+    
+    # === ЭТАПЫ ===
+    
+    def stage_duplicate(self):
+        """Новый объект с пустым мешем - заполняется на этапе decimate"""
+        sync_edit_mode(self.original_obj)
+        self.lowpoly_obj = duplicate_object(
+            self.original_obj, self.name, mesh=bpy.data.meshes.new(self.name)
+        )
+        # Стек предпросмотра исходника не переносится на результат
+        stop_preview(self.lowpoly_obj)
+    
+    def stage_budget(self):
+        """Подбор ratio под бюджет треугольников, дальше работают обычные этапы"""
+        from .target_budget import solve_target_budget
+        self.props, self.budget_report = solve_target_budget(
+            self.context, self.original_obj, self.props, self.get_analysis()
+        )
+    
+    def get_error_meter(self):
+        """Выборка и BVHTree исходника - общие для поиска ratio и финального измерения"""
+        if self.error_meter is None:
+            self.error_meter = ErrorMeter(self.original_obj.data, self.props.error_sample_count)
+        return self.error_meter
+    
+    def stage_error_target(self):
+        """Подбор наименьшего ratio, при котором отклонение от исходника в пределах допуска"""
+        props = self.props
+        source_mesh = self.original_obj.data
+        meter = self.get_error_meter()
+        max_error = meter.diagonal * props.target_max_error / 100.0
+        ratio, report, evaluations = solve_target_error(
+            lambda ratio: self.decimate_mesh(source_mesh, ratio), meter, max_error, props.target_max_evaluations
+        )
+        # Ratio применяется без ограничения пределами свойства: измеренная ошибка относится к нему
+        self.props = make_settings(props, ratio=ratio, use_target_error=False)
+        achieved = report.max_distance if report is not None else 0.0
+        log(f"📏 Target error {max_error:.4g}: ratio {ratio:.4f}, max error {achieved:.4g} "
+            f"({evaluations} evaluations)")
+        if ratio >= MAX_RATIO:
+            # Ни один ratio не уложился в допуск - результат равен исходнику, этап decimate не нужен
+            log("📏 No ratio meets the error target, source mesh is kept", 'DEBUG')
+            self.steps = self.prepare_steps + [("copy", self.stage_copy_source)] + self.final_steps()
+    
+    def stage_importance(self):
+        """Карта важности исходника: один расчет на содержимое меша, хранится в задаче (исходник не изменяется)"""
+        source_mesh = self.original_obj.data
+        # В chunked-режиме кэш анализа не используется: он держал бы копию буферов всего меша
+        analysis = None if self.mode == 'CHUNKED' else self.get_analysis()
+        self.source_importance = get_importance(source_mesh, analysis)
+        log(f"🗺️ Importance map: mean {float(self.source_importance.mean()):.3f}", 'DEBUG')
+    
+    def stage_weights(self):
+        """Защищенные ребра исходника -> веса вершин для модификатора Decimate"""
+        source_mesh = self.original_obj.data
+        self.source_protection = build_protection_weights(source_mesh, self.props, self.get_analysis())
+        if self.source_protection is not None:
+            log(f"🛡️ Protection weights: {self.source_protection.protected_count} protected vertices", 'DEBUG')
+    
+    def stage_copy_source(self):
+        """Копия исходного меша вместо децимации"""
+        replace_mesh(self.lowpoly_obj, self.original_obj.data.copy())
+    
+    def stage_decimate_standard(self):
+        log(f"🔥 STEP 1: Applying decimation with ratio {self.props.ratio}", 'DEBUG')
+        decimated_mesh = self.decimate_mesh(self.original_obj.data, self.props.ratio)
+        replace_mesh(self.lowpoly_obj, decimated_mesh)
+    
+    def stage_decimate_parallel(self):
+        source_mesh = self.original_obj.data
+        use_materials = self.props.use_material_decimation and bool(source_mesh.materials)
+        # Фоновые процессы работают модификатором, поэтому веса нужны и при выбранном QEM
+        protection = build_protection_weights(source_mesh, self.props, self.get_analysis(),
+                                              high_detail=not use_materials)
+        decimated_mesh = parallel_decimate_mesh(
+            source_mesh, self.props, make_ratio_getter(source_mesh, self.props, use_materials),
+            use_materials, self.name, protection
+        )
+        if decimated_mesh is None:
+            raise RuntimeError("No parts to merge")
+        replace_mesh(self.lowpoly_obj, decimated_mesh)
+    
+    def stage_decimate_material(self):
+        """Material-режим одним этапом (запасной путь без NumPy)"""
+        source_mesh = self.original_obj.data
+        decimated_mesh = decimate_partitions(
+            source_mesh, make_ratio_getter(source_mesh, self.props), self.decimate_mesh, self.name
+        )
+        if decimated_mesh is None:
+            raise RuntimeError("No parts to merge")
+        replace_mesh(self.lowpoly_obj, decimated_mesh)
+    
+    def stage_partition(self):
+        """Разбиение по материалам, децимация каждой части - отдельным этапом"""
+        source_mesh = self.original_obj.data
+        ratio_for_index = make_ratio_getter(source_mesh, self.props)
+        
+        part_steps = []
+        for material_index, part in sorted(partition_by_material(source_mesh).items()):
+            ratio = ratio_for_index(material_index)
+            part_steps.append((
+                f"decimate_mat_{material_index}",
+                lambda part=part, ratio=ratio, index=material_index: self.stage_decimate_part(part, ratio, index),
+            ))
+        part_steps.append(("merge", self.stage_merge))
+        
+        position = self.step_index + 1
+        self.steps[position:position] = part_steps
+    
+    def stage_decimate_part(self, part, ratio, material_index):
+        log(f"🔧 Processing material {material_index}, ratio: {ratio}", 'DEBUG')
+        result = decimate_part(
+            part, self.original_obj.data, ratio, self.decimate_mesh, f"{self.name}_Mat_{material_index}"
+        )
+        if result is not None:
+            self.decimated_parts.append(result)
+    
+    def stage_merge(self):
+        log("🔗 Merging decimated parts...", 'DEBUG')
+        if not self.decimated_parts:
+            raise RuntimeError("No parts to merge")
+        merged_mesh = merge_parts(self.decimated_parts, self.name, self.original_obj.data)
+        self.decimated_parts = []
+        replace_mesh(self.lowpoly_obj, merged_mesh)
+    
+    def stage_islands(self):
+        """Острова: статистика, политика каждого острова, децимация групп островов с общим ratio"""
+        source_mesh = self.original_obj.data
+        props = self.props
+        buffers = MeshBuffers.from_mesh(source_mesh, with_layers=True)
+        stats = IslandStats(buffers)
+        
+        if props.use_target_budget:
+            target = props.target_triangles
         else:
-            print(f"✅ Mesh integrity check passed")
-        
-    except Exception as e:
-        print(f"❌ Decimate modifier failed: {e}")
-
-def material_based_decimate(context, original_obj, props):
-    """Material-based decimation - разные ratio для разных материалов"""
-    try:
-        print("🎨 Starting material-based decimation...")
-        
-        # Проверяем наличие материалов
-        if not original_obj.data.materials:
-            print("❌ No materials found, falling back to standard decimation")
-            return standard_decimate(context, original_obj, props)
-        
-        # Сохраняем исходное состояние
-        original_active = context.view_layer.objects.active
-        original_selected = context.selected_objects.copy()
-        original_collections = original_obj.users_collection
-        
-        # Создаем коллекцию для временных объектов
-        temp_collection = bpy.data.collections.new("SharpDecimate_Temp")
-        context.scene.collection.children.link(temp_collection)
-        
-        decimated_parts = []
-        
-        # Для КАЖДОГО материала создаем отдельный объект
-        for material_index, material in enumerate(original_obj.data.materials):
-            if material is None:
+            target = props.ratio * float(stats.triangle_counts.sum())
+        policies, ratios = plan_island_policies(
+            stats, stats.diagonal * props.island_size_threshold / 100.0, props.island_small_policy, target
+        )
+        summary = ", ".join(f"{name} {count}" for name, count in count_policies(policies).items())
+        log(f"🏝️ Islands: {stats.count} ({summary})", 'DEBUG')
+        
+        face_labels, group_ratios = get_island_groups(stats, policies, ratios)
+        group_steps = []
+        for label, part in sorted(partition_buffers(buffers, face_labels).items()):
+            if label not in group_ratios:
                 continue
-                
-            print(f"🔧 Processing material {material_index}: {material.name}")
-            
-            # Дублируем исходный объект
-            safe_select_all('DESELECT')
-            original_obj.select_set(True)
-            context.view_layer.objects.active = original_obj
-            
-            safe_mode_set('OBJECT')
-            bpy.ops.object.duplicate()
-            material_obj = context.active_object
-            material_obj.name = f"Temp_{original_obj.name}_Mat_{material_index}"
-            
-            # Перемещаем во временную коллекцию
-            for coll in material_obj.users_collection:
-                coll.objects.unlink(material_obj)
-            temp_collection.objects.link(material_obj)
-            
-            # Выделяем только полигоны с текущим материалом
-            safe_mode_set('EDIT')
-            bpy.ops.mesh.select_all(action='DESELECT')
-            safe_mode_set('OBJECT')
-            
-            # Выбираем полигоны с этим материалом
-            for poly in material_obj.data.polygons:
-                if poly.material_index == material_index:
-                    poly.select = True
-            
-            # Переходим в edit mode и УДАЛЯЕМ все остальные полигоны
-            safe_mode_set('EDIT')
-            bpy.ops.mesh.select_mode(type='FACE')
-            bpy.ops.mesh.select_all(action='INVERT')
-            bpy.ops.mesh.delete(type='FACE')
-            safe_mode_set('OBJECT')
-            
-            # Пропускаем пустые объекты
-            if len(material_obj.data.polygons) == 0:
-                bpy.data.objects.remove(material_obj)
+            ratio = group_ratios[label]
+            if ratio is None:
+                # KEEP - острова переносятся без децимации
+                self.decimated_parts.append(part)
                 continue
-            
-            # Определяем ratio по типу материала
-            if "HighDetail" in material.name:
-                target_ratio = props.material_high_ratio
-                print(f"  🎯 HighDetail material, ratio: {target_ratio}")
-            else:  # LowDetail или любой другой
-                target_ratio = props.material_low_ratio
-                print(f"  🎯 LowDetail material, ratio: {target_ratio}")
-            
-            # Применяем decimation к ЭТОЙ ЧАСТИ
-            apply_decimate_modifier(material_obj, target_ratio)
-            
-            decimated_parts.append(material_obj)
-        
-        # Объединяем все части обратно
-        if len(decimated_parts) > 0:
-            print("🔗 Merging decimated parts...")
-            safe_select_all('DESELECT')
-            
-            # Перемещаем все части обратно в оригинальные коллекции ПЕРЕД объединением
-            for obj in decimated_parts:
-                for coll in obj.users_collection:
-                    coll.objects.unlink(obj)
-                for coll in original_collections:
-                    coll.objects.link(obj)
-                obj.select_set(True)
-            
-            # Делаем первую часть активной
-            context.view_layer.objects.active = decimated_parts[0]
-            
-            # Объединяем
-            bpy.ops.object.join()
-            final_obj = context.active_object
-            final_obj.name = "Low_" + original_obj.name
-            
-            # Очищаем материалы (оставляем только один)
-            final_obj.data.materials.clear()
-            
-        else:
-            # Если ничего не получилось - fallback
-            print("❌ No parts to merge, using standard decimation")
-            return standard_decimate(context, original_obj, props)
-        
-        # Удаляем временную коллекцию
-        bpy.data.collections.remove(temp_collection)
-        
-        # Восстанавливаем sharp edges
-        safe_mode_set('OBJECT')
-        final_bm = bmesh.new()
-        final_bm.from_mesh(final_obj.data)
-        
-        for edge in final_bm.edges:
-            if len(edge.link_faces) == 2:
-                angle = edge.calc_face_angle()
-                angle_degrees = angle * 180.0 / 3.14159
-                if angle_degrees > props.sharp_angle:
-                    edge.smooth = False
-        
-        final_bm.to_mesh(final_obj.data)
-        final_bm.free()
-        
-        # Настройка авто-сглаживания
-        final_obj.data.use_auto_smooth = True
-        final_obj.data.auto_smooth_angle = 3.14159
-        
-        # Гарантируем что объект видим
-        final_obj.hide_set(False)
-        final_obj.hide_viewport = False
-        final_obj.hide_render = False
-        
-        # 🔴 ФИНАЛЬНАЯ ПРОВЕРКА ЦЕЛОСТНОСТИ
-        final_check, final_message = check_mesh_integrity(final_obj)
-        if not final_check:
-            print(f"⚠️ Final mesh integrity check failed: {final_message}")
-        else:
-            print(f"✅ Final mesh integrity check passed")
-        
-        # Восстанавливаем исходное выделение
-        safe_select_all('DESELECT')
-        for obj in original_selected:
-            obj.select_set(True)
-        context.view_layer.objects.active = original_active
-        
-        print(f"✅ Material-based decimation completed! Created: {final_obj.name}")
-        return final_obj
-        
-    except Exception as e:
-        print(f"❌ Material-based decimation failed: {e}")
-        # Fallback на стандартную децимацию
+            group_steps.append((
+                f"decimate_islands_{label}",
+                lambda part=part, ratio=ratio, label=label: self.stage_decimate_island_group(part, ratio, label),
+            ))
+        
+        proxies = build_island_proxies(stats, policies, buffers.material_indices)
+        if proxies is not None:
+            self.decimated_parts.append(proxies)
+        group_steps.append(("merge", self.stage_merge))
+        
+        position = self.step_index + 1
+        self.steps[position:position] = group_steps
+    
+    def stage_decimate_island_group(self, part, ratio, label):
+        log(f"🏝️ Processing island group {label}, ratio: {ratio:.3f}", 'DEBUG')
+        result = decimate_part(
+            part, self.original_obj.data, ratio, self.decimate_mesh, f"{self.name}_Islands_{label}"
+        )
+        if result is not None:
+            self.decimated_parts.append(result)
+    
+    def stage_chunks(self):
+        """Разбиение на пространственные чанки под бюджет памяти, каждый чанк - отдельным этапом"""
+        source_mesh = self.original_obj.data
+        props = self.props
+        use_materials = props.use_material_decimation and bool(source_mesh.materials)
+        
+        # Кэш анализа не используется: он держал бы копию буферов всего меша
+        protected = get_protected_edge_mask(source_mesh, props.sharp_angle, props.keep_sharp, props.keep_crease)
+        self.chunk_plan = plan_chunks(
+            MeshBuffers.from_mesh(source_mesh), props.chunk_memory_budget, protected, use_materials,
+            self.source_importance,
+        )
+        plan = self.chunk_plan
+        log(f"🧩 Chunked decimation: {len(plan)} chunks, {plan.seam_count} locked seam vertices", 'DEBUG')
+        
+        ratio_for_index = make_ratio_getter(source_mesh, props, use_materials)
+        budget_ratio = None
+        if props.use_target_budget:
+            # QEM попадает в число треугольников точно, поиск ratio не нужен
+            budget_ratio = min(props.target_triangles / max(plan.triangle_count, 1), 1.0)
+        
+        chunk_steps = []
+        for index in range(len(plan)):
+            ratio = budget_ratio if budget_ratio is not None else ratio_for_index(plan.chunk_materials[index])
+            chunk_steps.append((
+                f"decimate_chunk_{index}",
+                lambda index=index, ratio=ratio: self.stage_decimate_chunk(index, ratio),
+            ))
+        chunk_steps.append(("stitch", self.stage_stitch))
+        
+        position = self.step_index + 1
+        self.steps[position:position] = chunk_steps
+    
+    def stage_decimate_chunk(self, index, ratio):
+        log(f"🧩 Processing chunk {index + 1}/{len(self.chunk_plan)}, ratio: {ratio}", 'DEBUG')
+        result = self.chunk_plan.decimate_chunk(index, ratio, self.props)
+        if result is not None:
+            self.decimated_parts.append(result)
+    
+    def stage_stitch(self):
+        """Склейка чанков: вершины швов свариваются по исходным индексам"""
+        log("🔗 Stitching decimated chunks...", 'DEBUG')
+        self.chunk_plan = None
+        if not self.decimated_parts:
+            raise RuntimeError("No parts to merge")
+        welded = weld_chunks(self.decimated_parts)
+        self.decimated_parts = []
+        replace_mesh(self.lowpoly_obj, build_part_mesh(welded, self.name, self.original_obj.data))
+    
+    def stage_protect(self):
+        """Защита ребер в standard-режиме: маска Sharp строится на массивах и записывается один раз"""
+        if self.mode != 'STANDARD':
+            return
+        
+        mesh = self.lowpoly_obj.data
+        if not HAS_NUMPY:
+            mark_sharp_edges(mesh, self.props.sharp_angle, reset=True)
+            return
+        
+        # Острые по sharp_angle на финальной геометрии + Crease. Sharp от QEM уже стоят
+        # на своих ребрах, Sharp после модификатора пересчитываются заново
+        mask = get_protected_edge_mask(mesh, self.props.sharp_angle, keep_sharp=self.use_qem)
+        set_sharp_mask(mesh, mask)
+    
+    def stage_transfer(self):
+        """Перенос ручных Sharp/Crease исходника по геометрическому соответствию ребер"""
+        if self.keeps_source_vertices:
+            # QEM сохраняет вершины исходника - Sharp/Crease уже перенесены по ключам ребер
+            return
+        
+        props = self.props
+        analysis = self.source_analysis
+        if analysis is None:
+            analysis = SourceAnalysis(self.original_obj.data, props.keep_sharp, props.keep_crease,
+                                      props.edge_transfer_tolerance / 100.0, self.get_analysis())
         try:
-            return standard_decimate(context, original_obj, props)
-        except:
-            return None
-
-def standard_decimate(context, original_obj, props):
-    """Стандартная децимация (без material-based)"""
-    try:
-        # Сохраняем исходное состояние выделения
-        original_active = context.view_layer.objects.active
-        original_selected = context.selected_objects.copy()
-        
-        # Дублирование объекта
-        safe_select_all('DESELECT')
-        original_obj.select_set(True)
-        context.view_layer.objects.active = original_obj
-        
-        # Безопасное дублирование
-        safe_mode_set('OBJECT')
-        bpy.ops.object.duplicate()
-        
-        lowpoly_obj = context.active_object
-        lowpoly_obj.name = "Low_" + original_obj.name
-        
-        # Применяем децимацию
-        print(f"🔥 STEP 1: Applying decimation with ratio {props.ratio}")
-        apply_decimate_modifier(lowpoly_obj, props.ratio)
-        
-        # Анализ исходного меша с поддержкой crease
-        original_bm = bmesh.new()
-        original_bm.from_mesh(original_obj.data)
-        
-        # ПРАВКА: Правильная работа с crease layer
-        crease_layer = original_bm.edges.layers.crease.verify()
-        original_bm.edges.ensure_lookup_table()
-        
-        # Получаем все типы острых граней
-        manual_sharp_edges = get_manual_sharp_edges(original_bm) if props.keep_sharp else []
-        creased_edges = get_creased_edges(original_bm) if props.keep_crease else []
-        
-        # Работа с lowpoly мешем - ГАРАНТИРУЕМ что вышли из edit mode
-        safe_mode_set('OBJECT')
-        bm = bmesh.new()
-        bm.from_mesh(lowpoly_obj.data)
-        
-        # ПРАВКА: Правильная работа с crease layer
-        target_crease_layer = bm.edges.layers.crease.verify()
-        bm.edges.ensure_lookup_table()
-        
-        # Сброс smooth для перерасчета
-        for edge in bm.edges:
-            edge.smooth = True
-        
-        # Анализ ВСЕХ защищенных ребер
-        protected_edges = analyze_protected_edges(bm, original_obj, props.sharp_angle)
-        
-        # Сохраняем ВСЕ типы острых граней
-        preserve_hard_edges(bm, protected_edges, manual_sharp_edges, creased_edges, crease_layer, target_crease_layer)
-        
-        # Применение изменений
-        safe_mode_set('OBJECT')
-        bm.to_mesh(lowpoly_obj.data)
-        bm.free()
-        original_bm.free()
-        
-        # Восстанавливаем sharp edges на финальном меше с поддержкой crease
-        safe_mode_set('OBJECT')
-        final_bm = bmesh.new()
-        final_bm.from_mesh(lowpoly_obj.data)
-        final_crease_layer = final_bm.edges.layers.crease.verify()
-        
-        # Повторно применяем sharp метки к финальной геометрии - ВСЕГДА используем sharp_angle!
-        for edge in final_bm.edges:
-            if len(edge.link_faces) == 2:
-                angle = edge.calc_face_angle()
-                angle_degrees = angle * 180.0 / 3.14159
-                if angle_degrees > props.sharp_angle:
-                    edge.smooth = False
-        
-        # Применяем изменения - ГАРАНТИРУЕМ что вышли из edit mode
-        safe_mode_set('OBJECT')
-        final_bm.to_mesh(lowpoly_obj.data)
-        final_bm.free()
+            matched = analysis.transfer(self.lowpoly_obj.data)
+            log(f"📐 Transferred Sharp/Crease to {matched} edges", 'DEBUG')
+        finally:
+            if analysis is not self.source_analysis:
+                analysis.free()
+    
+    def stage_mark_sharp(self):
+        # В standard-режиме острые грани уже отмечены на этапе protect
+        if self.mode != 'STANDARD':
+            mark_sharp_edges(self.lowpoly_obj.data, self.props.sharp_angle)
         
         # Настройка авто-сглаживания для корректного отображения
-        lowpoly_obj.data.use_auto_smooth = True
-        lowpoly_obj.data.auto_smooth_angle = 3.14159  # 180 градусов
+        self.lowpoly_obj.data.use_auto_smooth = True
+        self.lowpoly_obj.data.auto_smooth_angle = 3.14159  # 180 градусов
         
+        # Гарантируем что объект видим
+        self.lowpoly_obj.hide_viewport = False
+        self.lowpoly_obj.hide_render = False
+    
+    def stage_error(self):
+        """Расстояние Хаусдорфа между исходником и результатом, ошибка вершин - атрибутом результата"""
+        self.error_report = self.get_error_meter().measure(self.lowpoly_obj.data)
+        if self.error_report.vertex_errors is not None:
+            write_error_attribute(self.lowpoly_obj.data, self.error_report.vertex_errors)
+        log(f"📏 Geometric error: {self.error_report.message()}")
+    
+    def stage_verify(self):
         # 🔴 ФИНАЛЬНАЯ ПРОВЕРКА ЦЕЛОСТНОСТИ
-        final_check, final_message = check_mesh_integrity(lowpoly_obj)
-        if not final_check:
-            print(f"⚠️ Final mesh integrity check failed: {final_message}")
+        self.integrity = check_object_integrity(self.lowpoly_obj, self.props)
+        if not self.integrity.ok:
+            log(f"⚠️ Final mesh integrity check failed: {self.integrity.message()}", 'WARNING')
         else:
-            print(f"✅ Final mesh integrity check passed")
-        
-        # Восстанавливаем исходное выделение БЕЗОПАСНО
-        safe_mode_set('OBJECT')
-        safe_select_all('DESELECT')
-        for obj in original_selected:
-            obj.select_set(True)
-        context.view_layer.objects.active = original_active
+            log(f"✅ Final mesh integrity check passed ({self.integrity.message()})", 'DEBUG')
         
         # 🔥 ВЫВОДИМ СТАТИСТИКУ ДЕЦИМАЦИИ
-        original_faces = len(original_obj.data.polygons)
-        final_faces = len(lowpoly_obj.data.polygons)
+        original_faces = len(self.original_obj.data.polygons)
+        final_faces = len(self.lowpoly_obj.data.polygons)
         reduction = ((1 - final_faces / original_faces) * 100) if original_faces > 0 else 0
         
-        print(f"📊 DECIMATION RESULT: {original_faces} -> {final_faces} faces ({reduction:.1f}% reduction)")
-        print(f"✅ Standard decimation completed! Created: {lowpoly_obj.name}")
-        
+        log(f"📊 DECIMATION RESULT: {original_faces} -> {final_faces} faces ({reduction:.1f}% reduction)")
+        log(f"✅ Decimation completed ({self.mode})! Created: {self.lowpoly_obj.name}")
+
+def parallel_decimate(context, original_obj, props, source_analysis=None):
+    """Параллельная децимация частей (материалы или острова) в фоновых процессах
+
+    При ошибке фоновых процессов задача сама переходит на последовательный путь.
+    """
+    try:
+        lowpoly_obj = DecimateJob(context, original_obj, props, 'PARALLEL', source_analysis).run()
+        log(f"✅ Parallel decimation completed! Created: {lowpoly_obj.name}", 'DEBUG')
         return lowpoly_obj
-        
     except Exception as e:
-        # Восстанавливаем состояние в случае ошибки БЕЗОПАСНО
-        try:
-            safe_mode_set('OBJECT')
-            safe_select_all('DESELECT')
-            for obj in original_selected:
-                obj.select_set(True)
-            context.view_layer.objects.active = original_active
-        except Exception as restore_error:
-            print(f"SharpDecimate: Restore failed: {restore_error}")
-        print(f"❌ Standard decimation failed: {e}")
-        raise e
+        log(f"❌ Parallel decimation failed: {e}", 'ERROR')
+        return None
+
+def material_based_decimate(context, original_obj, props, source_analysis=None):
+    """Material-based decimation - разные ratio для разных материалов
 
-def decimate_single_object(context, original_obj, props):
-    """Основная логика упрощения одного объекта с сохранением острых граней"""
+    Полигоны разбиваются по material_index за один проход, каждая часть
+    децимируется отдельно и склеивается обратно в один меш со всеми слотами материалов.
+    """
+    log("🎨 Starting material-based decimation...", 'DEBUG')
     
-    # Выбираем алгоритм децимации
-    if props.use_material_decimation and original_obj.data.materials:
-        print("🎨 Using MATERIAL-BASED decimation")
-        return material_based_decimate(context, original_obj, props)
-    else:
-        print("🔧 Using STANDARD decimation")
-        return standard_decimate(context, original_obj, props)
+    # Проверяем наличие материалов
+    if not original_obj.data.materials:
+        log("❌ No materials found, falling back to standard decimation", 'WARNING')
+        return standard_decimate(context, original_obj, props, source_analysis)
+    
+    try:
+        # При ошибке задача сама переходит на стандартную децимацию
+        return DecimateJob(context, original_obj, props, 'MATERIAL', source_analysis).run()
+    except Exception as e:
+        log(f"❌ Material-based decimation failed: {e}", 'ERROR')
+        return None
 
-def register():
+def standard_decimate(context, original_obj, props, source_analysis=None):
+    """Стандартная децимация (без material-based)
+
+    Каждый меш загружается в BMesh не более одного раза, lowpoly
+    записывается обратно ровно один раз. Исходный объект, выделение
+    и режим не изменяются.
+    """
     try:
-        bpy.utils.register_class(SharpDecimateProperties)
-        bpy.types.Scene.sharpdecimate_props = PointerProperty(type=SharpDecimateProperties)
+        return DecimateJob(context, original_obj, props, 'STANDARD', source_analysis).run()
     except Exception as e:
-        print(f"SharpDecimate: Failed to register properties: {e}")
+        log(f"❌ Standard decimation failed: {e}", 'ERROR')
+        raise e
 
-def unregister():
+def chunked_decimate(context, original_obj, props, source_analysis=None):
+    """Децимация огромного меша пространственными чанками с ограниченным пиком памяти
+
+    Вершины на границах чанков блокируются, поэтому после склейки швы остаются
+    водонепроницаемыми. Ошибка не переводит задачу на режимы, держащие весь меш в памяти.
+    """
     try:
-        if hasattr(bpy.types.Scene, 'sharpdecimate_props'):
-            del bpy.types.Scene.sharpdecimate_props
-        bpy.utils.unregister_class(SharpDecimateProperties)
+        return DecimateJob(context, original_obj, props, 'CHUNKED', source_analysis).run()
     except Exception as e:
-        print(f"SharpDecimate: Failed to unregister properties: {e}")
\ No newline at end of file
+        log(f"❌ Chunked decimation failed: {e}", 'ERROR')
+        return None
+
+def island_decimate(context, original_obj, props, source_analysis=None):
+    """Децимация по островам: мелкие острова по своей политике, бюджет крупных - по площади
+
+    При ошибке задача сама переходит на стандартный путь.
+    """
+    try:
+        return DecimateJob(context, original_obj, props, 'ISLANDS', source_analysis).run()
+    except Exception as e:
+        log(f"❌ Island decimation failed: {e}", 'ERROR')
+        return None
+
+def decimate_single_object(context, original_obj, props, source_analysis=None):
+    """Основная логика упрощения одного объекта с сохранением острых граней
+
+    source_analysis - готовый SourceAnalysis исходника, если он общий для нескольких вызовов.
+    """
+    
+    # Выбираем алгоритм децимации
+    mode = DecimateJob.detect_mode(original_obj, props)
+    if mode == 'CHUNKED':
+        log("🧩 Using CHUNKED decimation", 'DEBUG')
+        return chunked_decimate(context, original_obj, props, source_analysis)
+    elif mode == 'ISLANDS':
+        log("🏝️ Using ISLANDS decimation", 'DEBUG')
+        return island_decimate(context, original_obj, props, source_analysis)
+    elif mode == 'PARALLEL':
+        log("⚡ Using PARALLEL decimation", 'DEBUG')
+        return parallel_decimate(context, original_obj, props, source_analysis)
+    elif mode == 'MATERIAL':
+        log("🎨 Using MATERIAL-BASED decimation", 'DEBUG')
+        return material_based_decimate(context, original_obj, props, source_analysis)
+    else:
+        log("🔧 Using STANDARD decimation", 'DEBUG')
+        return standard_decimate(context, original_obj, props, source_analysis)
@@ -0,0 +1,297 @@
+# FILE: core/benchmark.py
+# Бенчмарк пайплайна децимации на синтетических hard-surface мешах.
+# Запуск: blender -b --factory-startup --python core/benchmark.py -- --scales 10k,100k --engines modifier,qem --baseline baseline.json
+import os
+import sys
+import json
+import math
+import time
+import argparse
+import importlib
+import tracemalloc
+
+import bpy
+import bmesh
+from mathutils import Matrix
+
+# Целевое число полигонов для каждого масштаба
+SCALES = {"10k": 10000, "100k": 100000, "1m": 1000000, "5m": 5000000}
+DEFAULT_SCALES = ("10k", "100k", "1m")
+SHAPES = ("box", "cylinder", "kitbash")
+# Движки децимации: значения decimate_engine
+ENGINES = {"modifier": 'MODIFIER', "qem": 'QEM'}
+DEFAULT_ENGINES = ("modifier",)
+DEFAULT_THRESHOLD = 0.15
+# Этапы короче этого времени не сравниваются с базой (шум таймера)
+MIN_COMPARED_SECONDS = 0.005
+BENCHMARK_PREFIX = "SharpDecimate_Bench"
+
+def import_addon_module(name):
+    """Импорт модуля аддона, в том числе когда бенчмарк запущен отдельным скриптом"""
+    if __package__:
+        return importlib.import_module(f".{name}", __package__)
+    addon_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    parent_dir = os.path.dirname(addon_dir)
+    if parent_dir not in sys.path:
+        sys.path.insert(0, parent_dir)
+    return importlib.import_module(f"{os.path.basename(addon_dir)}.core.{name}")
+
+# ============================================
+# Генераторы тестовых мешей (детерминированные)
+# ============================================
+
+def get_subdivision_cuts(base_faces, target_faces):
+    """Число разрезов subdivide, при котором часть получает примерно target_faces полигонов"""
+    return max(0, round(math.sqrt(target_faces / max(base_faces, 1))) - 1)
+
+def subdivide_new_faces(bm, first_face, target_faces):
+    """Подразбиение полигонов, добавленных после first_face, до target_faces"""
+    bm.faces.ensure_lookup_table()
+    faces = bm.faces[first_face:]
+    cuts = get_subdivision_cuts(len(faces), target_faces)
+    if cuts:
+        edges = list({edge for face in faces for edge in face.edges})
+        bmesh.ops.subdivide_edges(bm, edges=edges, cuts=cuts, use_grid_fill=True)
+        bm.faces.ensure_lookup_table()
+
+def add_bevelled_box(bm, matrix, target_faces, material_index=0):
+    """Куб со скошенными ребрами: плоские грани + фаски под острыми углами"""
+    first_face = len(bm.faces)
+    verts = bmesh.ops.create_cube(bm, size=2.0, matrix=matrix)["verts"]
+    edges = list({edge for vert in verts for edge in vert.link_edges})
+    bmesh.ops.bevel(bm, geom=verts + edges, offset=0.1, segments=2, profile=0.5, affect='EDGES')
+    subdivide_new_faces(bm, first_face, target_faces)
+    for face in bm.faces[first_face:]:
+        face.material_index = material_index
+
+def add_cylinder(bm, matrix, target_faces, material_index=0):
+    """Цилиндр с треугольными крышками: острые кромки крышек + гладкая боковая поверхность"""
+    first_face = len(bm.faces)
+    bmesh.ops.create_cone(bm, cap_ends=True, cap_tris=True, segments=32,
+                          radius1=1.0, radius2=1.0, depth=2.0, matrix=matrix)
+    subdivide_new_faces(bm, first_face, target_faces)
+    for face in bm.faces[first_face:]:
+        face.material_index = material_index
+
+def add_kitbash(bm, target_faces):
+    """Сетка 3x3 из кубов и цилиндров с чередованием двух материалов"""
+    for index in range(9):
+        matrix = Matrix.Translation(((index % 3) * 3.0, (index // 3) * 3.0, 0.0))
+        add_part = add_bevelled_box if index % 2 == 0 else add_cylinder
+        add_part(bm, matrix, target_faces // 9, material_index=index % 2)
+
+def get_benchmark_material(name):
+    material = bpy.data.materials.get(name)
+    if material is None:
+        material = bpy.data.materials.new(name)
+    return material
+
+def create_case_object(context, shape, target_faces):
+    """Объект тестового случая в текущей сцене"""
+    bm = bmesh.new()
+    try:
+        if shape == "box":
+            add_bevelled_box(bm, Matrix(), target_faces)
+        elif shape == "cylinder":
+            add_cylinder(bm, Matrix(), target_faces)
+        else:
+            add_kitbash(bm, target_faces)
+        mesh = bpy.data.meshes.new(f"{BENCHMARK_PREFIX}_{shape}")
+        bm.to_mesh(mesh)
+    finally:
+        bm.free()
+
+    if shape == "kitbash":
+        # get_material_ratio различает материалы по "HighDetail" в имени
+        mesh.materials.append(get_benchmark_material(f"{BENCHMARK_PREFIX}_HighDetail"))
+        mesh.materials.append(get_benchmark_material(f"{BENCHMARK_PREFIX}_LowDetail"))
+
+    obj = bpy.data.objects.new(mesh.name, mesh)
+    context.scene.collection.objects.link(obj)
+    return obj
+
+def remove_object(obj):
+    mesh = obj.data
+    bpy.data.objects.remove(obj)
+    if mesh.users == 0:
+        bpy.data.meshes.remove(mesh)
+
+# ============================================
+# Замеры
+# ============================================
+
+def count_protected_edges(mesh, settings):
+    """Защищенные ребра исходника (острые по углу + Sharp + Crease)"""
+    mesh_arrays = import_addon_module("mesh_arrays")
+    if not mesh_arrays.HAS_NUMPY:
+        return None
+    analysis = import_addon_module("analysis_cache").get_mesh_analysis(mesh)
+    mask = analysis.protected_edge_mask(mesh, settings.sharp_angle, settings.keep_sharp, settings.keep_crease)
+    return int(mask.sum())
+
+def count_sharp_edges(mesh):
+    mesh_arrays = import_addon_module("mesh_arrays")
+    if not mesh_arrays.HAS_NUMPY:
+        return None
+    return int(mesh_arrays.get_sharp_mask(mesh).sum())
+
+def run_case(context, shape, scale, settings, trace_memory=False):
+    """Один тестовый случай: генерация, полный пайплайн DecimateJob, метрики"""
+    base_decimate = import_addon_module("base_decimate")
+    profiling = import_addon_module("profiling")
+
+    build_start = time.perf_counter()
+    obj = create_case_object(context, shape, SCALES[scale])
+    build_seconds = time.perf_counter() - build_start
+    lowpoly_obj = None
+    try:
+        source_faces = len(obj.data.polygons)
+        protected_edges = count_protected_edges(obj.data, settings)
+
+        # tracemalloc замедляет Python-код, поэтому включается только по запросу
+        if trace_memory:
+            tracemalloc.start()
+        job = base_decimate.DecimateJob(context, obj, settings)
+        lowpoly_obj = job.run()
+        python_peak_mb = None
+        if trace_memory:
+            python_peak_mb = tracemalloc.get_traced_memory()[1] / (1024.0 * 1024.0)
+            tracemalloc.stop()
+
+        stages = {}
+        for stage_name, seconds in job.timer.stages:
+            stages[stage_name] = stages.get(stage_name, 0.0) + seconds
+        stages["total"] = job.timer.total
+
+        return {
+            "shape": shape,
+            "scale": scale,
+            "engine": settings.decimate_engine,
+            "mode": job.mode,
+            "build_seconds": build_seconds,
+            "source_faces": source_faces,
+            "final_faces": len(lowpoly_obj.data.polygons),
+            "protected_edges": protected_edges,
+            "edges_preserved": count_sharp_edges(lowpoly_obj.data),
+            "stages": stages,
+            "faces_per_second": source_faces / max(job.timer.total, 1e-9),
+            "process_peak_mb": profiling.get_process_peak_mb(),
+            "python_peak_mb": python_peak_mb,
+        }
+    finally:
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+        if lowpoly_obj is not None:
+            remove_object(lowpoly_obj)
+        remove_object(obj)
+
+def get_case_name(shape, scale, engine):
+    """Имя случая: у модификатора без суффикса движка, чтобы старые базы оставались сравнимыми"""
+    if engine == "modifier":
+        return f"{shape}_{scale}"
+    return f"{shape}_{scale}_{engine}"
+
+def run_benchmark(context, shapes=SHAPES, scales=DEFAULT_SCALES, ratio=0.25, trace_memory=False,
+                  engines=DEFAULT_ENGINES):
+    """Все случаи от меньшего масштаба к большему (пик памяти процесса растет монотонно)"""
+    settings_module = import_addon_module("settings")
+    cases = {}
+    for scale in scales:
+        for shape in shapes:
+            for engine in engines:
+                settings = settings_module.make_settings(
+                    ratio=ratio,
+                    decimate_engine=ENGINES[engine],
+                    use_material_decimation=(shape == "kitbash"),
+                    use_parallel=False,
+                    use_target_budget=False,
+                )
+                name = get_case_name(shape, scale, engine)
+                print(f"🏁 Benchmark {name}...")
+                cases[name] = run_case(context, shape, scale, settings, trace_memory)
+                result = cases[name]
+                print(f"   {result['source_faces']} -> {result['final_faces']} faces, "
+                      f"{result['stages']['total']:.3f}s ({result['faces_per_second']:.0f} faces/s), "
+                      f"edges preserved {result['edges_preserved']}/{result['protected_edges']}")
+            if len(engines) > 1:
+                print_engine_comparison(cases, shape, scale, engines)
+    return {"blender": bpy.app.version_string, "ratio": ratio, "engines": list(engines), "cases": cases}
+
+def print_engine_comparison(cases, shape, scale, engines):
+    """Скорость движков на одном случае относительно первого из engines"""
+    reference = cases[get_case_name(shape, scale, engines[0])]
+    for engine in engines[1:]:
+        result = cases[get_case_name(shape, scale, engine)]
+        speedup = result["faces_per_second"] / max(reference["faces_per_second"], 1e-9)
+        print(f"   ⚖️ {engine} vs {engines[0]}: {speedup:.2f}x throughput, "
+              f"edges preserved {result['edges_preserved']} vs {reference['edges_preserved']}")
+
+def compare_results(results, baseline, threshold=DEFAULT_THRESHOLD, min_seconds=MIN_COMPARED_SECONDS):
+    """Список регрессий относительно базы: время этапов и сохраненные ребра"""
+    regressions = []
+    base_cases = baseline.get("cases", {})
+    for name, result in results["cases"].items():
+        base = base_cases.get(name)
+        if base is None:
+            continue
+
+        for stage_name, seconds in result["stages"].items():
+            base_seconds = base.get("stages", {}).get(stage_name)
+            if base_seconds is None or max(seconds, base_seconds) < min_seconds:
+                continue
+            if seconds > base_seconds * (1.0 + threshold):
+                change = (seconds / max(base_seconds, 1e-9) - 1.0) * 100.0
+                regressions.append(f"{name}: {stage_name} {base_seconds:.3f}s -> {seconds:.3f}s (+{change:.0f}%)")
+
+        preserved, base_preserved = result.get("edges_preserved"), base.get("edges_preserved")
+        if preserved is not None and base_preserved is not None and preserved < base_preserved:
+            regressions.append(f"{name}: edges preserved {base_preserved} -> {preserved}")
+    return regressions
+
+def main(argv):
+    args = argv[argv.index("--") + 1:] if "--" in argv else []
+    parser = argparse.ArgumentParser(prog="sharpdecimate-benchmark")
+    parser.add_argument("--scales", default=",".join(DEFAULT_SCALES), help=f"Comma-separated: {', '.join(SCALES)}")
+    parser.add_argument("--shapes", default=",".join(SHAPES), help=f"Comma-separated: {', '.join(SHAPES)}")
+    parser.add_argument("--engines", default=",".join(DEFAULT_ENGINES), help=f"Comma-separated: {', '.join(ENGINES)}")
+    parser.add_argument("--ratio", type=float, default=0.25)
+    parser.add_argument("--output", help="Write results JSON")
+    parser.add_argument("--baseline", help="Baseline JSON to compare against")
+    parser.add_argument("--save-baseline", action="store_true", help="Overwrite the baseline with these results")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="Allowed slowdown (0.15 = 15%%)")
+    parser.add_argument("--trace-memory", action="store_true", help="Also record Python peak memory (slower)")
+    args = parser.parse_args(args)
+
+    scales = [scale for scale in args.scales.split(",") if scale]
+    shapes = [shape for shape in args.shapes.split(",") if shape]
+    engines = [engine for engine in args.engines.split(",") if engine]
+    unknown = [value for value in scales if value not in SCALES] + [value for value in shapes if value not in SHAPES] \
+        + [value for value in engines if value not in ENGINES]
+    if unknown:
+        print(f"❌ Unknown scales/shapes/engines: {', '.join(unknown)}")
+        return 2
+
+    results = run_benchmark(bpy.context, shapes, scales, args.ratio, args.trace_memory, engines)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+    if not args.baseline:
+        return 0
+    if args.save_baseline or not os.path.exists(args.baseline):
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"💾 Baseline saved: {args.baseline}")
+        return 0
+
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+    regressions = compare_results(results, baseline, args.threshold)
+    for line in regressions:
+        print(f"⚠️ Regression: {line}")
+    if not regressions:
+        print(f"✅ No regressions against {args.baseline}")
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
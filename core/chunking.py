@@ -0,0 +1,197 @@
+# FILE: core/chunking.py
+from .mesh_arrays import np, get_edge_keys, MeshBuffers
+from .qem import QEMDecimator, get_importance_scale
+
+# Оценка рабочей памяти QEM на треугольник чанка (списки, множества и очередь Python)
+QEM_BYTES_PER_TRIANGLE = 1600
+# Меньшие чанки не создаются: вершины швов заблокированы, и мелкий чанк почти не упрощается
+MIN_CHUNK_TRIANGLES = 20000
+
+def get_buffers_nbytes(buffers):
+    arrays = [buffers.coords, buffers.edge_verts, buffers.loop_verts, buffers.loop_totals,
+              buffers.material_indices, buffers.smooth, buffers.sharp, buffers.creases]
+    return sum(array.nbytes for array in arrays + list(buffers.uv_arrays.values()))
+
+def get_chunk_triangle_limit(buffers, memory_budget_mb):
+    """Максимум треугольников в чанке, при котором пик памяти укладывается в бюджет
+
+    Буферы исходника читаются целиком и живут до конца склейки, результат
+    не больше исходника - оба вычитаются из бюджета, остаток отдается QEM.
+    """
+    budget = memory_budget_mb * 1024 * 1024 - 2 * get_buffers_nbytes(buffers)
+    return max(int(budget // QEM_BYTES_PER_TRIANGLE), MIN_CHUNK_TRIANGLES)
+
+def grid_cell_labels(points, cell_count):
+    """Метки ячеек равномерной сетки примерно из cell_count кубических ячеек по габаритам точек"""
+    low = points.min(axis=0)
+    extent = points.max(axis=0) - low
+    used = extent > 0.0
+    if cell_count <= 1 or not used.any():
+        return np.zeros(len(points), dtype=np.int64)
+
+    # Размер ячейки из объема (площади, длины) по осям, на которые ячейка помещается:
+    # тонкий по одной оси меш (скан поверхности) делится плоской сеткой
+    while True:
+        size = float(np.prod(extent[used]) / cell_count) ** (1.0 / int(used.sum()))
+        thin = used & (extent < size)
+        if not thin.any() or thin.sum() == used.sum():
+            break
+        used &= ~thin
+    dims = np.where(used, np.maximum(np.ceil(extent / size), 1.0), 1.0).astype(np.int64)
+    cells = ((points - low) / np.where(used, extent, 1.0) * dims).astype(np.int64)
+    cells = np.minimum(cells, dims - 1)
+    return (cells[:, 0] * dims[1] + cells[:, 1]) * dims[2] + cells[:, 2]
+
+def label_spatial_chunks(points, weights, limit):
+    """Метки чанков 0..N-1: ячейки сетки, переполненные ячейки дробятся своей сеткой
+
+    weights - вес (число треугольников) полигона, limit - максимальный вес чанка.
+    Ячейку из совпадающих точек раздробить нельзя - она остается как есть.
+    """
+    cell_count = int(np.ceil(weights.sum() / max(limit, 1)))
+    _, labels = np.unique(grid_cell_labels(points, cell_count), return_inverse=True)
+    labels = labels.ravel()
+
+    while True:
+        counts = np.bincount(labels)
+        loads = np.bincount(labels, weights)
+        oversized = np.flatnonzero(loads > limit)
+        if not len(oversized):
+            break
+
+        order = np.argsort(labels, kind='stable')
+        starts = np.cumsum(counts) - counts
+        next_label = len(counts)
+        for label in oversized:
+            members = order[starts[label]:starts[label] + counts[label]]
+            cells = grid_cell_labels(points[members], max(int(np.ceil(loads[label] / limit)), 2))
+            _, cells = np.unique(cells, return_inverse=True)
+            cells = cells.ravel()
+            if cells.max() == 0:
+                continue
+            moved = cells > 0
+            labels[members[moved]] = next_label + cells[moved] - 1
+            next_label += int(cells.max())
+
+        if next_label == len(counts):
+            break
+
+    _, labels = np.unique(labels, return_inverse=True)
+    return labels.ravel()
+
+def get_seam_vertices(buffers, face_labels):
+    """Маска вершин, общих для полигонов разных чанков"""
+    loop_labels = np.repeat(face_labels, buffers.loop_totals)
+    vertex_labels = np.zeros(buffers.vertex_count, dtype=np.int64)
+    # Вершине достается метка одного из ее лупов - шов там, где метки лупов расходятся
+    vertex_labels[buffers.loop_verts] = loop_labels
+    seam = np.zeros(buffers.vertex_count, dtype=bool)
+    seam[buffers.loop_verts[vertex_labels[buffers.loop_verts] != loop_labels]] = True
+    return seam
+
+class ChunkPlan:
+    """Разбиение меша на пространственные чанки для поочередной децимации
+
+    Хранит буферы исходника, полигоны чанков и маски. Буферы чанка собираются
+    в момент его обработки и освобождаются сразу после, поэтому в памяти
+    одновременно находится рабочее состояние только одного чанка.
+    Вершины швов между чанками блокируются: после децимации они остаются
+    на месте, и склейка по индексу исходной вершины дает шов без щелей.
+    importance - важность вершин исходника, если децимация ею управляется.
+    """
+
+    def __init__(self, buffers, face_labels, protected_edges=None, importance=None):
+        self.buffers = buffers
+        self.importance = importance
+        self.triangle_count = int(buffers.triangle_counts.sum())
+
+        order = np.argsort(face_labels, kind='stable')
+        _, starts = np.unique(face_labels[order], return_index=True)
+        self.chunk_faces = np.split(order, starts[1:])
+        self.chunk_materials = [int(buffers.material_indices[faces[0]]) for faces in self.chunk_faces]
+        self.seam_vertices = get_seam_vertices(buffers, face_labels)
+
+        self.protected_keys = None
+        if protected_edges is not None and np.any(protected_edges):
+            self.protected_keys = get_edge_keys(buffers.edge_verts[protected_edges])
+
+    def __len__(self):
+        return len(self.chunk_faces)
+
+    @property
+    def seam_count(self):
+        return int(self.seam_vertices.sum())
+
+    def decimate_chunk(self, index, ratio, props):
+        """QEM-децимация чанка: MeshBuffers с исходными индексами вершин или None, если результат пуст"""
+        part = self.buffers.subset(self.chunk_faces[index])
+        protected = None
+        if self.protected_keys is not None:
+            protected = np.isin(get_edge_keys(part.source_vertices[part.edge_verts]), self.protected_keys)
+
+        vertex_scale = None
+        if self.importance is not None:
+            vertex_scale = get_importance_scale(self.importance[part.source_vertices], props.importance_strength)
+
+        decimator = QEMDecimator(
+            part, protected,
+            lock_protected=props.qem_protection == 'LOCK',
+            protected_weight=props.qem_protected_weight,
+            locked_vertices=self.seam_vertices[part.source_vertices],
+            vertex_scale=vertex_scale,
+        )
+        decimator.run(max(int(decimator.face_count * ratio), 1))
+        if decimator.face_count == 0:
+            return None
+
+        result = decimator.to_buffers()
+        result.source_vertices = part.source_vertices[result.source_vertices]
+        return result
+
+def plan_chunks(buffers, memory_budget_mb, protected_edges=None, use_materials=False, importance=None):
+    """ChunkPlan под бюджет памяти
+
+    С use_materials чанк не смешивает материалы: сетка строится внутри
+    каждого материала, а границы материалов становятся швами.
+    """
+    limit = get_chunk_triangle_limit(buffers, memory_budget_mb)
+    weights = buffers.triangle_counts
+    # Опорная точка полигона - первая вершина (центры потребовали бы копию всех лупов)
+    points = buffers.coords[buffers.loop_verts[buffers.loop_starts]].astype(np.float64)
+
+    labels = np.zeros(buffers.face_count, dtype=np.int64)
+    groups = buffers.material_indices if use_materials else np.zeros(buffers.face_count, dtype=np.int32)
+    next_label = 0
+    for group in np.unique(groups):
+        faces = np.flatnonzero(groups == group)
+        chunk_labels = label_spatial_chunks(points[faces], weights[faces], limit)
+        labels[faces] = next_label + chunk_labels
+        next_label += int(chunk_labels.max()) + 1
+    return ChunkPlan(buffers, labels, protected_edges, importance)
+
+def weld_chunks(parts):
+    """Склейка чанков со сваркой вершин швов по индексу исходной вершины
+
+    Общие ребра швов остаются в одном экземпляре, их Sharp/Crease объединяются.
+    """
+    merged = MeshBuffers.concatenate(parts)
+    source_ids = np.concatenate([part.source_vertices for part in parts])
+    unique_ids, first, remap = np.unique(source_ids, return_index=True, return_inverse=True)
+    remap = remap.ravel()
+
+    merged.coords = merged.coords[first]
+    merged.loop_verts = remap[merged.loop_verts].astype(np.int32)
+
+    edge_verts = remap[merged.edge_verts]
+    _, edge_first, edge_index = np.unique(get_edge_keys(edge_verts), return_index=True, return_inverse=True)
+    edge_index = edge_index.ravel()
+    sharp = np.zeros(len(edge_first), dtype=bool)
+    np.logical_or.at(sharp, edge_index, merged.sharp)
+    creases = np.zeros(len(edge_first), dtype=np.float32)
+    np.maximum.at(creases, edge_index, merged.creases)
+
+    merged.edge_verts = edge_verts[edge_first].astype(np.int32)
+    merged.sharp = sharp
+    merged.creases = creases
+    merged.source_vertices = unique_ids
+    return merged
@@ -0,0 +1,177 @@
+# FILE: core/data_ops.py
+import bpy
+import bmesh
+
+from .mesh_arrays import HAS_NUMPY, count_triangles
+
+# Операции над датаблоками без bpy.ops, выделения и переключения режимов.
+# Работают в фоне (blender -b) и не создают шагов undo.
+
+TEMP_MODIFIER_NAME = "SharpDecimate_Temp"
+EVAL_OBJECT_NAME = "SharpDecimate_Eval"
+
+def sync_edit_mode(obj):
+    """Синхронизация данных меша, если объект находится в Edit Mode"""
+    if obj.mode == 'EDIT':
+        obj.update_from_editmode()
+
+def link_to_collections(obj, collections, scene=None):
+    """Привязка объекта к коллекциям (или к корневой коллекции сцены)"""
+    collections = [coll for coll in collections if coll is not None]
+    if not collections:
+        scene = scene or bpy.context.scene
+        collections = [scene.collection]
+    for coll in collections:
+        if obj.name not in coll.objects:
+            coll.objects.link(obj)
+
+def duplicate_object(original_obj, name, mesh=None, collections=None):
+    """Копия объекта на уровне данных
+
+    Если mesh не передан, копируется меш исходного объекта.
+    """
+    new_obj = original_obj.copy()
+    new_obj.data = mesh if mesh is not None else original_obj.data.copy()
+    new_obj.name = name
+    # Общий (связанный) меш не переименовываем
+    if new_obj.data.users == 1:
+        new_obj.data.name = name
+
+    if collections is None:
+        collections = original_obj.users_collection
+    link_to_collections(new_obj, collections)
+    return new_obj
+
+def replace_mesh(obj, new_mesh):
+    """Замена меша объекта с удалением старого, если он больше не используется"""
+    old_mesh = obj.data
+    obj.data = new_mesh
+    new_mesh.name = old_mesh.name
+    if old_mesh.users == 0:
+        bpy.data.meshes.remove(old_mesh)
+
+def copy_materials(source_mesh, target_mesh):
+    """Копирование слотов материалов между мешами"""
+    target_mesh.materials.clear()
+    for material in source_mesh.materials:
+        target_mesh.materials.append(material)
+
+class DecimateEvaluator:
+    """Временный объект с модификатором Decimate для многократного вычисления
+
+    Модификатор не применяется: при смене ratio пересчитывается только depsgraph,
+    поэтому подбор ratio стоит одного вычисления модификатора за попытку.
+    protection (ProtectionWeights) - веса защиты вершин для самого модификатора;
+    они пишутся в копию меша, исходный меш не изменяется. vertex_groups оставлен
+    для совместимости вызовов: имена групп вершин хранит сам меш.
+    """
+
+    def __init__(self, mesh, context=None, vertex_groups=(), protection=None):
+        self.mesh = mesh
+        self.context = context or bpy.context
+        self.protection = protection
+        self.protection_group_name = None
+        self.weighted_mesh = mesh.copy() if protection is not None else None
+        # Имена групп вершин хранит сам меш (Blender 3.0+), объекту их добавлять не нужно
+        self.eval_obj = bpy.data.objects.new(EVAL_OBJECT_NAME, self.weighted_mesh or mesh)
+
+        self.context.scene.collection.objects.link(self.eval_obj)
+        self.modifier = self.eval_obj.modifiers.new(name=TEMP_MODIFIER_NAME, type='DECIMATE')
+        self.modifier.decimate_type = 'COLLAPSE'
+        if protection is not None:
+            # Группа защиты - последняя, индексы групп исходника не сдвигаются
+            group = protection.write_group(self.eval_obj, replace=False)
+            self.protection_group_name = group.name
+            protection.setup_modifier(self.modifier, group.name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.free()
+
+    def free(self):
+        if self.eval_obj is not None:
+            bpy.data.objects.remove(self.eval_obj, do_unlink=True)
+            self.eval_obj = None
+        if self.weighted_mesh is not None:
+            bpy.data.meshes.remove(self.weighted_mesh)
+            self.weighted_mesh = None
+
+    def evaluate(self, ratio):
+        """Вычисленный объект для заданного ratio и его depsgraph"""
+        self.modifier.ratio = ratio
+        depsgraph = self.context.evaluated_depsgraph_get()
+        depsgraph.update()
+        return self.eval_obj.evaluated_get(depsgraph), depsgraph
+
+    def count_triangles(self, ratio):
+        """Число треугольников результата без создания нового меша"""
+        evaluated, _ = self.evaluate(ratio)
+        if HAS_NUMPY:
+            return count_triangles(evaluated.data)
+        return sum(poly.loop_total - 2 for poly in evaluated.data.polygons)
+
+    def to_mesh(self, ratio):
+        """Новый меш - результат модификатора"""
+        evaluated, depsgraph = self.evaluate(ratio)
+        result = bpy.data.meshes.new_from_object(
+            evaluated, preserve_all_data_layers=True, depsgraph=depsgraph
+        )
+        if len(result.materials) != len(self.mesh.materials):
+            copy_materials(self.mesh, result)
+        if self.protection is not None:
+            self.strip_protection(result)
+        return result
+
+    def strip_protection(self, result):
+        """Удаление группы защиты и ее весов из меша результата
+
+        Группы вершин хранит меш, поэтому временный объект только дает доступ
+        к vertex_groups: группа удаляется по имени, под которым ее создал __init__.
+        """
+        holder = bpy.data.objects.new(EVAL_OBJECT_NAME, result)
+        try:
+            group = holder.vertex_groups.get(self.protection_group_name)
+            if group is not None:
+                holder.vertex_groups.remove(group)
+        finally:
+            bpy.data.objects.remove(holder)
+
+def evaluate_decimate(mesh, ratio, context=None, vertex_groups=(), protection=None):
+    """Новый меш - результат модификатора Decimate, вычисленный через depsgraph
+
+    Исходный меш не изменяется. Модификатор вешается на временный объект,
+    поэтому модификаторы и выделение пользовательских объектов не затрагиваются.
+    """
+    with DecimateEvaluator(mesh, context, vertex_groups, protection) as evaluator:
+        return evaluator.to_mesh(ratio)
+
+def extract_faces(mesh, face_filter):
+    """Новый меш только с полигонами, для которых face_filter(face) истинно"""
+    bm = bmesh.new()
+    bm.from_mesh(mesh)
+    try:
+        faces_to_delete = [face for face in bm.faces if not face_filter(face)]
+        bmesh.ops.delete(bm, geom=faces_to_delete, context='FACES')
+
+        part = bpy.data.meshes.new(mesh.name + "_Part")
+        bm.to_mesh(part)
+    finally:
+        bm.free()
+    copy_materials(mesh, part)
+    return part
+
+def join_meshes(meshes, name):
+    """Объединение мешей в один новый меш без bpy.ops.object.join"""
+    bm = bmesh.new()
+    try:
+        for mesh in meshes:
+            bm.from_mesh(mesh)
+        joined = bpy.data.meshes.new(name)
+        bm.to_mesh(joined)
+    finally:
+        bm.free()
+    if meshes:
+        copy_materials(meshes[0], joined)
+    return joined
@@ -1,9 +1,25 @@
 # FILE: core/edge_analyzer.py
+import math
+
 import bmesh
 import bpy
 
-def analyze_sharp_edges(bm, angle_threshold):
-    """Анализ острых граней по углу между полигонами"""
+from .mesh_arrays import (HAS_NUMPY, np, get_vertex_coords, get_edge_vertices, get_edge_face_pairs,
+                          get_polygon_normals, get_sharp_mask, set_sharp_mask, get_edge_creases,
+                          set_edge_creases)
+from .spatial_index import SegmentGrid
+from .properties import DEFAULT_TRANSFER_TOLERANCE
+
+def analyze_sharp_edges(bm, angle_threshold, mesh=None):
+    """Анализ острых граней по углу между полигонами
+
+    С NumPy углы считаются одним векторным проходом по мешу: mesh - меш,
+    из которого загружен bm (тот же порядок ребер), иначе временная копия bm.
+    Без NumPy - цикл по ребрам BMesh.
+    """
+    if HAS_NUMPY:
+        return _analyze_sharp_edges_numpy(bm, angle_threshold, mesh)
+    
     sharp_edges = []
     
     for edge in bm.edges:
@@ -16,6 +32,68 @@ def analyze_sharp_edges(bm, angle_threshold):
     
     return sharp_edges
 
+def _analyze_sharp_edges_numpy(bm, angle_threshold, mesh=None):
+    temp_mesh = None
+    if mesh is None or len(mesh.edges) != len(bm.edges):
+        temp_mesh = bpy.data.meshes.new("SharpDecimate_Angles")
+        bm.to_mesh(temp_mesh)
+        mesh = temp_mesh
+    try:
+        mask = get_sharp_edge_mask(mesh, angle_threshold)
+    finally:
+        if temp_mesh is not None:
+            bpy.data.meshes.remove(temp_mesh)
+    
+    bm.edges.ensure_lookup_table()
+    return [bm.edges[index] for index in np.flatnonzero(mask).tolist()]
+
+def compute_edge_angles(mesh):
+    """Углы между полигонами для всех ребер меша за один проход (в градусах)
+
+    Для ребер, у которых не ровно два полигона, возвращается NaN.
+    """
+    angles = np.full(len(mesh.edges), np.nan, dtype=np.float64)
+    if not len(mesh.polygons):
+        return angles
+
+    edge_indices, face_a, face_b, _ = get_edge_face_pairs(mesh)
+    normals = get_polygon_normals(mesh).astype(np.float64)
+
+    dots = np.einsum('ij,ij->i', normals[face_a], normals[face_b])
+    angle = np.arccos(np.clip(dots, -1.0, 1.0))
+    angles[edge_indices] = angle * 180.0 / 3.14159
+    return angles
+
+def get_sharp_edge_mask(mesh, angle_threshold):
+    """Маска ребер с углом больше порога (та же семантика, что у analyze_sharp_edges)"""
+    angles = compute_edge_angles(mesh)
+    with np.errstate(invalid='ignore'):
+        return angles > angle_threshold
+
+def mark_sharp_edges(mesh, angle_threshold, reset=False):
+    """Пометка острых граней меша как Sharp, возвращает количество помеченных ребер
+
+    Использует NumPy при наличии, иначе - BMesh.
+    """
+    if HAS_NUMPY:
+        mask = get_sharp_edge_mask(mesh, angle_threshold)
+        if not reset:
+            mask |= get_sharp_mask(mesh)
+        set_sharp_mask(mesh, mask)
+        return int(mask.sum())
+
+    bm = bmesh.new()
+    bm.from_mesh(mesh)
+    if reset:
+        for edge in bm.edges:
+            edge.smooth = True
+    for edge in analyze_sharp_edges(bm, angle_threshold):
+        edge.smooth = False
+    marked = sum(1 for edge in bm.edges if not edge.smooth)
+    bm.to_mesh(mesh)
+    bm.free()
+    return marked
+
 def get_manual_sharp_edges(source_bm):
     """Получение граней, помеченных как Sharp вручную"""
     manual_sharp = []
@@ -39,6 +117,183 @@ def get_creased_edges(source_bm, crease_threshold=0.01):
     
     return creased_edges
 
+TRANSFER_ANGLE_LIMIT = 15.0
+
+class ProtectedEdges:
+    """Ручные Sharp и Crease исходника как отрезки в пространственном индексе
+
+    Ребра децимированного меша сопоставляются с исходными по геометрии:
+    оба конца и середина ребра должны лежать в пределах допуска от защищенных
+    отрезков, а направление - совпадать с ближайшим отрезком.
+    """
+
+    def __init__(self, mesh, keep_sharp=True, keep_crease=True,
+                 tolerance=DEFAULT_TRANSFER_TOLERANCE, crease_threshold=0.01):
+        coords = get_vertex_coords(mesh).astype(np.float64)
+        edge_verts = get_edge_vertices(mesh)
+
+        sharp = get_sharp_mask(mesh) if keep_sharp else np.zeros(len(edge_verts), dtype=bool)
+        creases = get_edge_creases(mesh) if keep_crease else np.zeros(len(edge_verts), dtype=np.float32)
+        creases[creases <= crease_threshold] = 0.0
+        mask = sharp | (creases > 0.0)
+
+        self.sharp = sharp[mask]
+        self.creases = creases[mask]
+        self.starts = coords[edge_verts[mask, 0]]
+        self.ends = coords[edge_verts[mask, 1]]
+
+        # Допуск - доля диагонали габаритов исходника
+        diagonal = float(np.linalg.norm(coords.max(axis=0) - coords.min(axis=0))) if len(coords) else 0.0
+        self.max_distance = max(tolerance * diagonal, 1e-6)
+
+        self.grid = None
+        if mask.any():
+            lengths = np.linalg.norm(self.ends - self.starts, axis=1)
+            self.grid = SegmentGrid(self.starts, self.ends, max(self.max_distance, float(np.median(lengths))))
+
+    def __len__(self):
+        return len(self.sharp)
+
+    def match(self, coords, edge_verts, angle_limit=TRANSFER_ANGLE_LIMIT):
+        """Индекс защищенного отрезка для каждого ребра или -1"""
+        if self.grid is None:
+            return np.full(len(edge_verts), -1, dtype=np.int64)
+
+        start, end = coords[edge_verts[:, 0]], coords[edge_verts[:, 1]]
+        start_ids, _ = self.grid.nearest(start, self.max_distance)
+        end_ids, _ = self.grid.nearest(end, self.max_distance)
+        ids, _ = self.grid.nearest((start + end) * 0.5, self.max_distance)
+
+        found = (start_ids >= 0) & (end_ids >= 0) & (ids >= 0)
+        direction = end - start
+        segment = self.ends[ids] - self.starts[ids]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            cosine = np.abs(np.einsum('ij,ij->i', direction, segment)) / (
+                np.linalg.norm(direction, axis=1) * np.linalg.norm(segment, axis=1))
+        found &= cosine >= np.cos(np.radians(angle_limit))
+        return np.where(found, ids, -1)
+
+    def transfer(self, mesh):
+        """Перенос Sharp/Crease на ребра меша, возвращает число найденных ребер"""
+        if self.grid is None or not len(mesh.edges):
+            return 0
+
+        ids = self.match(get_vertex_coords(mesh).astype(np.float64), get_edge_vertices(mesh))
+        found = ids >= 0
+        if self.sharp.any():
+            sharp = get_sharp_mask(mesh)
+            sharp[found] |= self.sharp[ids[found]]
+            set_sharp_mask(mesh, sharp)
+        if self.creases.any():
+            creases = get_edge_creases(mesh)
+            creases[found] = np.maximum(creases[found], self.creases[ids[found]])
+            set_edge_creases(mesh, creases)
+        return int(found.sum())
+
+class SourceAnalysis:
+    """Анализ исходного меша (ручные Sharp и Crease), общий для нескольких децимаций
+
+    С NumPy защищенные ребра хранятся в ProtectedEdges, без NumPy - BMesh
+    исходника держится открытым до вызова free(). analysis - MeshAnalysis
+    исходника, если вызывающий код его уже получил.
+    """
+
+    def __init__(self, mesh, keep_sharp=True, keep_crease=True, tolerance=DEFAULT_TRANSFER_TOLERANCE,
+                 analysis=None):
+        self.bm = None
+        self.protected_edges = None
+        self.tolerance = tolerance
+
+        if HAS_NUMPY:
+            # Индекс защищенных ребер берется из кэша, пока исходник не меняется
+            if analysis is None:
+                from .analysis_cache import get_mesh_analysis
+                analysis = get_mesh_analysis(mesh)
+            self.protected_edges = analysis.protected_edges(mesh, keep_sharp, keep_crease, tolerance)
+            return
+
+        self.bm = bmesh.new()
+        self.bm.from_mesh(mesh)
+        self.crease_layer = self.bm.edges.layers.crease.verify()
+        self.bm.edges.ensure_lookup_table()
+
+        self.manual_sharp_edges = get_manual_sharp_edges(self.bm) if keep_sharp else []
+        self.creased_edges = get_creased_edges(self.bm) if keep_crease else []
+
+    def transfer(self, mesh):
+        """Перенос Sharp/Crease исходника на децимированный меш по геометрии"""
+        if self.protected_edges is not None:
+            return self.protected_edges.transfer(mesh)
+        return self._transfer_with_kdtree(mesh)
+
+    def _transfer_with_kdtree(self, mesh):
+        """Запасной путь без NumPy: KD-дерево по серединам защищенных ребер"""
+        from mathutils import kdtree
+        from mathutils.geometry import intersect_point_line
+
+        segments = {}
+        for edge in self.manual_sharp_edges:
+            segments[edge.index] = [edge.verts[0].co.copy(), edge.verts[1].co.copy(), True, 0.0]
+        for edge in self.creased_edges:
+            segment = segments.setdefault(edge.index, [edge.verts[0].co.copy(), edge.verts[1].co.copy(), False, 0.0])
+            segment[3] = edge[self.crease_layer]
+        if not segments:
+            return 0
+
+        segments = list(segments.values())
+        tree = kdtree.KDTree(len(segments))
+        for index, (start, end, _, _) in enumerate(segments):
+            tree.insert((start + end) * 0.5, index)
+        tree.balance()
+
+        xs = [v.co.x for v in self.bm.verts]
+        ys = [v.co.y for v in self.bm.verts]
+        zs = [v.co.z for v in self.bm.verts]
+        diagonal = ((max(xs) - min(xs)) ** 2 + (max(ys) - min(ys)) ** 2 + (max(zs) - min(zs)) ** 2) ** 0.5
+        max_distance = max(self.tolerance * diagonal, 1e-6)
+        radius = max((end - start).length for start, end, _, _ in segments) * 0.5 + max_distance
+
+        def nearest(point):
+            best, best_distance = None, max_distance
+            for _, index, _ in tree.find_range(point, radius):
+                start, end = segments[index][0], segments[index][1]
+                closest, t = intersect_point_line(point, start, end)
+                if t < 0.0:
+                    closest = start
+                elif t > 1.0:
+                    closest = end
+                distance = (point - closest).length
+                if distance <= best_distance:
+                    best, best_distance = index, distance
+            return best
+
+        cos_limit = math.cos(math.radians(TRANSFER_ANGLE_LIMIT))
+        bm = bmesh.new()
+        bm.from_mesh(mesh)
+        crease_layer = bm.edges.layers.crease.verify()
+        matched = 0
+        for edge in bm.edges:
+            start, end = edge.verts[0].co, edge.verts[1].co
+            index = nearest((start + end) * 0.5)
+            if index is None or nearest(start) is None or nearest(end) is None:
+                continue
+            direction = end - start
+            segment = segments[index][1] - segments[index][0]
+            if direction.length == 0.0 or abs(direction.normalized().dot(segment.normalized())) < cos_limit:
+                continue
+            if segments[index][2]:
+                edge.smooth = False
+            edge[crease_layer] = max(edge[crease_layer], segments[index][3])
+            matched += 1
+        bm.to_mesh(mesh)
+        bm.free()
+        return matched
+
+    def free(self):
+        if self.bm is not None:
+            self.bm.free()
+            self.bm = None
+
 def analyze_protected_edges(bm, obj, angle_threshold, detail_group=None, detail_weight=0.5):
     """Анализ всех защищенных ребер (острые + детальные зоны)"""
     protected_edges = set()
@@ -57,64 +312,22 @@ def analyze_protected_edges(bm, obj, angle_threshold, detail_group=None, detail_
     
     return list(protected_edges)
 
-def transfer_edge_data(source_bm, target_bm, keep_sharp=True, keep_crease=True, crease_threshold=0.01):
-    """Перенос данных граней из исходного меша в целевой"""
-    source_bm.edges.ensure_lookup_table()
-    target_bm.edges.ensure_lookup_table()
-    
+def get_protected_edge_mask(mesh, angle_threshold, keep_sharp=True, keep_crease=True, crease_threshold=0.01):
+    """Маска защищенных ребер меша (острые по углу + ручные Sharp + Crease) за один проход"""
+    mask = get_sharp_edge_mask(mesh, angle_threshold)
     if keep_sharp:
-        # Перенос ручных Sharp меток
-        for i, edge in enumerate(source_bm.edges):
-            if i < len(target_bm.edges) and not edge.smooth:
-                target_bm.edges[i].smooth = False
+        mask |= get_sharp_mask(mesh)
     if keep_crease:
-        # Перенос Crease значений (если поддерживается)
-        if hasattr(source_bm.edges, 'layers') and hasattr(target_bm.edges, 'layers'):
-            source_crease_layer = source_bm.edges.layers.crease.active
-            target_crease_layer = target_bm.edges.layers.crease.active
-            
-            if source_crease_layer and target_crease_layer:
-                for i, edge in enumerate(source_bm.edges):
-                    if i < len(target_bm.edges):
-                        crease_value = edge[source_crease_layer]
-                        if crease_value > crease_threshold:
-                            target_bm.edges[i][target_crease_layer] = crease_value
-
-def preserve_hard_edges(target_bm, sharp_edges, manual_sharp_edges, creased_edges, source_crease_layer=None, target_crease_layer=None):
-    """Сохранение всех типов острых граней в целевом меше"""
-    
-    # ПРАВКА: Используем множества для избежания дублирования
-    processed_edges = set()
-    
-    # Сохраняем автоматически найденные острые грани
+        mask |= get_edge_creases(mesh) > crease_threshold
+    return mask
+
+def preserve_hard_edges(target_bm, sharp_edges):
+    """Пометка острых граней целевого меша как Sharp
+
+    Ручные Sharp и Crease исходника переносятся по геометрии (SourceAnalysis.transfer).
+    """
     for edge in sharp_edges:
         edge.smooth = False
-        processed_edges.add(edge.index)
-    
-    # Сохраняем ручные Sharp метки (только для непроцессированных ребер)
-    for edge in manual_sharp_edges:
-        if edge.index < len(target_bm.edges) and edge.index not in processed_edges:
-            target_edge = target_bm.edges[edge.index]
-            target_edge.smooth = False
-            processed_edges.add(edge.index)
-    
-    # Сохраняем Crease значения (если поддерживается)
-    if (hasattr(target_bm.edges, 'layers') and 
-        source_crease_layer is not None and 
-        target_crease_layer is not None):
-        
-        for edge in creased_edges:
-            if edge.index < len(target_bm.edges):
-                target_edge = target_bm.edges[edge.index]
-                
-                # Получаем crease значение из исходного edge
-                if hasattr(edge, 'layers'):
-                    try:
-                        crease_value = edge[source_crease_layer]
-                        target_edge[target_crease_layer] = crease_value
-                    except (KeyError, TypeError):
-                        # Если crease значение недоступно, пропускаем
-                        pass
 
 def register():
     pass
@@ -0,0 +1,73 @@
+# FILE: core/exchange.py
+import json
+
+from .mesh_arrays import np, MeshBuffers
+
+# Компактный бинарный формат обмена частями меша с фоновыми процессами:
+# несжатый .npz с плоскими массивами MeshBuffers и JSON-метаданными.
+# Пользовательские атрибуты, группы вершин и веса защиты идут отдельными массивами.
+
+FORMAT_VERSION = 2
+
+def save_buffers(path, buffers, protection=None, **meta):
+    """Запись MeshBuffers, весов защиты (ProtectionWeights, необязательно) и метаданных в .npz"""
+    uv_names = list(buffers.uv_arrays.keys())
+    attributes = [[name, domain, data_type] for name, (domain, data_type, _) in buffers.attributes.items()]
+    group_names = list(buffers.vertex_weights.keys())
+    meta = dict(meta, format_version=FORMAT_VERSION, uv_names=uv_names, attributes=attributes,
+                group_names=group_names)
+    if protection is not None:
+        meta["protection_strength"] = protection.strength
+
+    arrays = {
+        "coords": np.asarray(buffers.coords, dtype=np.float32),
+        "edge_verts": np.asarray(buffers.edge_verts, dtype=np.int32),
+        "loop_verts": np.asarray(buffers.loop_verts, dtype=np.int32),
+        "loop_totals": np.asarray(buffers.loop_totals, dtype=np.int32),
+        "material_indices": np.asarray(buffers.material_indices, dtype=np.int32),
+        "smooth": np.asarray(buffers.smooth, dtype=bool),
+        "sharp": np.asarray(buffers.sharp, dtype=bool),
+        "creases": np.asarray(buffers.creases, dtype=np.float32),
+        "meta": np.frombuffer(json.dumps(meta).encode("utf-8"), dtype=np.uint8),
+    }
+    for index, name in enumerate(uv_names):
+        arrays[f"uv_{index}"] = np.asarray(buffers.uv_arrays[name], dtype=np.float32)
+    for index, (name, _, _) in enumerate(attributes):
+        arrays[f"attribute_{index}"] = buffers.attributes[name][2]
+    for index, name in enumerate(group_names):
+        arrays[f"group_{index}"] = np.asarray(buffers.vertex_weights[name], dtype=np.float32)
+    if protection is not None:
+        arrays["protection"] = np.asarray(protection.weights, dtype=np.float32)
+
+    with open(path, "wb") as f:
+        np.savez(f, **arrays)
+
+def load_buffers(path):
+    """Чтение (MeshBuffers, метаданные) из .npz
+
+    Веса защиты, если они были записаны, возвращаются в meta["protection"] (ProtectionWeights).
+    """
+    with np.load(path) as data:
+        meta = json.loads(data["meta"].tobytes().decode("utf-8"))
+        if meta.get("format_version") != FORMAT_VERSION:
+            raise ValueError(f"Unsupported exchange format: {meta.get('format_version')}")
+
+        uv_arrays = {
+            name: data[f"uv_{index}"] for index, name in enumerate(meta["uv_names"])
+        }
+        attributes = {
+            name: (domain, data_type, data[f"attribute_{index}"])
+            for index, (name, domain, data_type) in enumerate(meta["attributes"])
+        }
+        vertex_weights = {
+            name: data[f"group_{index}"] for index, name in enumerate(meta["group_names"])
+        }
+        buffers = MeshBuffers(
+            data["coords"], data["edge_verts"], data["loop_verts"], data["loop_totals"],
+            data["material_indices"], data["smooth"], data["sharp"], data["creases"],
+            uv_arrays, attributes, vertex_weights,
+        )
+        if "protection" in data:
+            from .protection_weights import ProtectionWeights
+            meta["protection"] = ProtectionWeights(data["protection"], meta["protection_strength"])
+    return buffers, meta
@@ -0,0 +1,166 @@
+# FILE: core/geometric_error.py
+import bpy
+from mathutils.bvhtree import BVHTree
+
+from .mesh_arrays import np, get_vertex_coords, get_triangle_vertices
+from .properties import DEFAULT_ERROR_SAMPLES
+from .profiling import log
+
+# Геометрическая ошибка результата: расстояние Хаусдорфа между поверхностями.
+# Точки выбираются на обеих поверхностях, ближайшие точки другой поверхности
+# ищутся через BVHTree - в отличие от check_integrity, это мера формы, а не топологии.
+
+ERROR_ATTRIBUTE = "SharpDecimate_Error"
+SAMPLE_SEED = 0
+MIN_RATIO = 0.001
+MAX_RATIO = 1.0
+
+class GeometricErrorReport:
+    """Отклонение результата от исходника: максимум (Хаусдорф), среднее и RMS по выборке"""
+
+    def __init__(self, max_distance=0.0, mean_distance=0.0, rms_distance=0.0, source_max=0.0, result_max=0.0,
+                 diagonal=0.0, sample_count=0, vertex_errors=None):
+        self.max_distance = max_distance
+        self.mean_distance = mean_distance
+        self.rms_distance = rms_distance
+        # Односторонние максимумы: исходник -> результат и результат -> исходник
+        self.source_max = source_max
+        self.result_max = result_max
+        self.diagonal = diagonal
+        self.sample_count = sample_count
+        self.vertex_errors = vertex_errors
+
+    @property
+    def relative_max(self):
+        """Максимальное отклонение как доля диагонали габаритов исходника"""
+        return self.max_distance / self.diagonal if self.diagonal > 0.0 else 0.0
+
+    def message(self):
+        return (f"Max {self.max_distance:.4g} ({self.relative_max * 100:.3f}% of size), "
+                f"mean {self.mean_distance:.4g}, RMS {self.rms_distance:.4g}")
+
+    def to_dict(self):
+        return {
+            "max_distance": self.max_distance,
+            "mean_distance": self.mean_distance,
+            "rms_distance": self.rms_distance,
+            "source_max": self.source_max,
+            "result_max": self.result_max,
+            "relative_max": self.relative_max,
+            "sample_count": self.sample_count,
+        }
+
+def sample_surface(coords, tris, count, rng):
+    """count точек на треугольниках: треугольник выбирается по площади, точка - по барицентрическим координатам"""
+    p0, p1, p2 = coords[tris[:, 0]], coords[tris[:, 1]], coords[tris[:, 2]]
+    areas = np.linalg.norm(np.cross(p1 - p0, p2 - p0), axis=1)
+    total = areas.sum()
+    if count <= 0 or total <= 0.0:
+        return np.zeros((0, 3), dtype=np.float64)
+
+    faces = rng.choice(len(tris), count, p=areas / total)
+    u, v = rng.random(count), rng.random(count)
+    # Точки за диагональю параллелограмма отражаются обратно в треугольник
+    outside = u + v > 1.0
+    u[outside], v[outside] = 1.0 - u[outside], 1.0 - v[outside]
+    return p0[faces] + u[:, None] * (p1[faces] - p0[faces]) + v[:, None] * (p2[faces] - p0[faces])
+
+def nearest_distances(tree, points):
+    """Расстояние от каждой точки до ближайшей точки поверхности BVHTree"""
+    find_nearest = tree.find_nearest
+    return np.array([find_nearest(point)[3] for point in points.tolist()], dtype=np.float64)
+
+class MeshSurface:
+    """Треугольники меша, BVHTree по ним и диагональ габаритов"""
+
+    def __init__(self, mesh):
+        self.coords = get_vertex_coords(mesh).astype(np.float64)
+        self.tris = get_triangle_vertices(mesh)
+        self.tree = BVHTree.FromPolygons(self.coords.tolist(), self.tris.tolist(), all_triangles=True)
+        self.diagonal = 0.0
+        if len(self.coords):
+            self.diagonal = float(np.linalg.norm(self.coords.max(axis=0) - self.coords.min(axis=0)))
+
+    def __len__(self):
+        return len(self.tris)
+
+    def sample(self, count, seed=SAMPLE_SEED):
+        return sample_surface(self.coords, self.tris, count, np.random.default_rng(seed))
+
+class ErrorMeter:
+    """Измерение отклонения результатов от одного исходника
+
+    Поверхность исходника, ее BVHTree и точки выборки строятся один раз,
+    поэтому повторные измерения (поиск ratio под ошибку) стоят только
+    построения дерева результата и запросов ближайших точек.
+    """
+
+    def __init__(self, source_mesh, sample_count=DEFAULT_ERROR_SAMPLES):
+        self.source = MeshSurface(source_mesh)
+        self.sample_count = sample_count
+        self.source_samples = self.source.sample(sample_count)
+
+    @property
+    def diagonal(self):
+        return self.source.diagonal
+
+    def measure(self, mesh):
+        """GeometricErrorReport для меша результата (с ошибкой каждой его вершины)"""
+        result = MeshSurface(mesh)
+        if not len(result) or not len(self.source):
+            return GeometricErrorReport(float('inf'), float('inf'), float('inf'), diagonal=self.diagonal)
+
+        # Исходник -> результат: пропавшие детали. Результат -> исходник: вершины и выборка по поверхности
+        source_distances = nearest_distances(result.tree, self.source_samples)
+        vertex_errors = nearest_distances(self.source.tree, result.coords)
+        result_distances = np.concatenate([
+            vertex_errors, nearest_distances(self.source.tree, result.sample(self.sample_count))
+        ])
+
+        distances = np.concatenate([source_distances, result_distances])
+        source_max = float(source_distances.max()) if len(source_distances) else 0.0
+        result_max = float(result_distances.max())
+        return GeometricErrorReport(
+            max(source_max, result_max), float(distances.mean()), float(np.sqrt(np.mean(distances ** 2))),
+            source_max, result_max, self.diagonal, len(distances), vertex_errors.astype(np.float32),
+        )
+
+def write_error_attribute(mesh, vertex_errors):
+    """Запись ошибки вершин в атрибут ERROR_ATTRIBUTE (создается при отсутствии)"""
+    attribute = mesh.attributes.get(ERROR_ATTRIBUTE)
+    if attribute is not None and (attribute.domain != 'POINT' or attribute.data_type != 'FLOAT'):
+        mesh.attributes.remove(attribute)
+        attribute = None
+    if attribute is None:
+        attribute = mesh.attributes.new(ERROR_ATTRIBUTE, 'FLOAT', 'POINT')
+    attribute.data.foreach_set("value", np.ascontiguousarray(vertex_errors, dtype=np.float32))
+
+def solve_target_error(decimate, meter, max_error, max_evaluations):
+    """Наименьший ratio, при котором отклонение не больше max_error
+
+    decimate(ratio) возвращает новый меш (удаляется после измерения). Ошибка
+    растет при уменьшении ratio, поэтому поиск - бисекция в логарифмической
+    шкале. Возвращает (ratio, отчет или None, число децимаций); без подходящей
+    попытки ratio равен MAX_RATIO.
+    """
+    low, high = MIN_RATIO, MAX_RATIO
+    best = (MAX_RATIO, None)
+    evaluations = 0
+    while evaluations < max_evaluations:
+        ratio = float(np.sqrt(low * high))
+        mesh = decimate(ratio)
+        try:
+            report = meter.measure(mesh)
+        finally:
+            bpy.data.meshes.remove(mesh)
+        evaluations += 1
+        log(f"📏 Ratio {ratio:.4f}: max error {report.max_distance:.4g}", 'DEBUG')
+
+        if report.max_distance <= max_error:
+            high = ratio
+            best = (ratio, report)
+        else:
+            low = ratio
+        if high / low < 1.01:
+            break
+    return best[0], best[1], evaluations
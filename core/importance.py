@@ -0,0 +1,85 @@
+# FILE: core/importance.py
+from .mesh_arrays import np, get_edge_vertices, get_edge_face_pairs, get_polygon_normals
+from .edge_analyzer import compute_edge_angles
+
+# Карта важности вершин: 0 - плоские области (упрощаются сильнее), 1 - кривизна и контуры.
+# Считается один раз на содержимое меша (через кэш анализа) и живет только в памяти:
+# исходный меш не изменяется, ручная раскраска материалов не нужна.
+
+# Кривизна нормируется по этому перцентилю средних углов вершин
+CURVATURE_PERCENTILE = 95.0
+# Меньший опорный угол не используется: шум почти плоского меша не превращается в детали
+MIN_CURVATURE_ANGLE = 2.0
+# Вклад контуров в важность относительно кривизны
+SILHOUETTE_WEIGHT = 0.75
+# Проходы сглаживания по ребрам: важность описывает области, а не отдельные вершины
+SMOOTHING_PASSES = 2
+# Направления взгляда для контуров: оси и диагонали куба
+VIEW_DIRECTIONS = np.array([
+    [1, 0, 0], [0, 1, 0], [0, 0, 1],
+    [1, 1, 1], [1, 1, -1], [1, -1, 1], [-1, 1, 1],
+], dtype=np.float64) if np is not None else None
+
+def compute_vertex_curvature(edge_verts, edge_angles, vertex_count):
+    """Средний угол между полигонами по ребрам вершины, нормированный в 0..1
+
+    Ребра без ровно двух полигонов (NaN) не учитываются.
+    """
+    manifold = ~np.isnan(edge_angles)
+    ends = edge_verts[manifold].ravel()
+    angles = np.repeat(edge_angles[manifold], 2)
+    counts = np.bincount(ends, minlength=vertex_count)
+    sums = np.bincount(ends, angles, minlength=vertex_count)
+    curvature = sums / np.maximum(counts, 1)
+
+    curved = curvature[curvature > 0.0]
+    reference = np.percentile(curved, CURVATURE_PERCENTILE) if len(curved) else 0.0
+    return np.clip(curvature / max(reference, MIN_CURVATURE_ANGLE), 0.0, 1.0)
+
+def compute_silhouette_vertices(mesh, edge_verts):
+    """Маска вершин контуров: открытые края и ребра, на которых нормаль меняет знак к одному из VIEW_DIRECTIONS
+
+    Такие ребра образуют силуэт объекта при взгляде спереди, сбоку, сверху и по диагоналям.
+    """
+    edge_indices, face_a, face_b, face_counts = get_edge_face_pairs(mesh)
+    normals = get_polygon_normals(mesh).astype(np.float64)
+    facing_a = normals[face_a] @ VIEW_DIRECTIONS.T
+    facing_b = normals[face_b] @ VIEW_DIRECTIONS.T
+    contour = np.any(facing_a * facing_b < 0.0, axis=1)
+
+    silhouette = np.zeros(len(mesh.vertices), dtype=bool)
+    silhouette[edge_verts[edge_indices[contour]].ravel()] = True
+    silhouette[edge_verts[face_counts == 1].ravel()] = True
+    return silhouette
+
+def smooth_vertex_values(values, edge_verts, passes=SMOOTHING_PASSES):
+    """Сглаживание значений вершин: среднее вершины и ее соседей по ребрам"""
+    ends = np.concatenate([edge_verts[:, 0], edge_verts[:, 1]])
+    neighbors = np.concatenate([edge_verts[:, 1], edge_verts[:, 0]])
+    counts = np.bincount(ends, minlength=len(values)) + 1
+    for _ in range(passes):
+        values = (values + np.bincount(ends, values[neighbors], minlength=len(values))) / counts
+    return values
+
+def compute_importance(mesh, edge_angles=None):
+    """Важность каждой вершины (float32, 0..1) по кривизне и контурам
+
+    edge_angles - углы ребер из анализа меша, если они уже посчитаны.
+    """
+    vertex_count = len(mesh.vertices)
+    if not vertex_count or not len(mesh.polygons):
+        return np.zeros(vertex_count, dtype=np.float32)
+    if edge_angles is None:
+        edge_angles = compute_edge_angles(mesh)
+
+    edge_verts = get_edge_vertices(mesh)
+    curvature = compute_vertex_curvature(edge_verts, edge_angles, vertex_count)
+    silhouette = compute_silhouette_vertices(mesh, edge_verts) * SILHOUETTE_WEIGHT
+    importance = smooth_vertex_values(np.maximum(curvature, silhouette), edge_verts)
+    return importance.astype(np.float32)
+
+def get_importance(mesh, analysis=None):
+    """Важность вершин меша: из кэша анализа, если он передан, иначе расчетом на месте"""
+    if analysis is not None:
+        return analysis.importance(mesh)
+    return compute_importance(mesh)
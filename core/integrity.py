@@ -0,0 +1,173 @@
+# FILE: core/integrity.py
+import bmesh
+
+from .profiling import span
+from .mesh_arrays import HAS_NUMPY, np, get_vertex_coords, get_edge_vertices, get_edge_face_counts, get_loop_edges
+from .properties import DEFAULT_SAMPLE_SIZE
+
+DEGENERATE_AREA = 0.0001
+# Точность сравнения координат совпадающих вершин (знаков после запятой)
+DUPLICATE_PRECISION = 4
+SAMPLE_SEED = 0
+
+class IntegrityReport:
+    """Результат проверки целостности меша"""
+
+    def __init__(self, vertex_count=0, face_count=0, non_manifold_edges=0, loose_vertices=0,
+                 degenerate_faces=0, overlapping_vertices=0, sample_ratio=1.0, skipped=False):
+        self.vertex_count = vertex_count
+        self.face_count = face_count
+        self.non_manifold_edges = non_manifold_edges
+        self.loose_vertices = loose_vertices
+        self.degenerate_faces = degenerate_faces
+        self.overlapping_vertices = overlapping_vertices
+        self.sample_ratio = sample_ratio
+        self.skipped = skipped
+
+    @property
+    def sampled(self):
+        return self.sample_ratio < 1.0
+
+    def issues(self):
+        """Список найденных проблем в виде строк"""
+        if self.skipped:
+            return []
+        if self.face_count == 0:
+            return ["Mesh has no polygons"]
+        if self.vertex_count < 3:
+            return ["Mesh has too few vertices"]
+
+        issues = []
+        if self.non_manifold_edges:
+            issues.append(f"Non-manifold edges: {self.non_manifold_edges}")
+        if self.loose_vertices:
+            issues.append(f"Loose vertices: {self.loose_vertices}")
+        if self.degenerate_faces:
+            issues.append(f"Degenerate faces: {self.degenerate_faces}")
+        if self.overlapping_vertices:
+            issues.append(f"Overlapping vertices: {self.overlapping_vertices}")
+        return issues
+
+    @property
+    def ok(self):
+        return not self.issues()
+
+    def message(self, separator=", "):
+        if self.skipped:
+            return "Integrity check skipped"
+        issues = self.issues()
+        text = separator.join(issues) if issues else "Mesh integrity OK"
+        if self.sampled:
+            text += f" (sampled {self.sample_ratio * 100:.0f}% of faces)"
+        return text
+
+    def as_tuple(self, separator=", "):
+        """(ok, сообщение) - формат старых check_*_integrity"""
+        return self.ok, self.message(separator)
+
+    def to_dict(self):
+        return {
+            "vertex_count": self.vertex_count,
+            "face_count": self.face_count,
+            "non_manifold_edges": self.non_manifold_edges,
+            "loose_vertices": self.loose_vertices,
+            "degenerate_faces": self.degenerate_faces,
+            "overlapping_vertices": self.overlapping_vertices,
+            "sample_ratio": self.sample_ratio,
+            "skipped": self.skipped,
+        }
+
+def count_overlapping_vertices(coords, precision=DUPLICATE_PRECISION):
+    """Число групп вершин с совпадающими (округленными) координатами"""
+    if len(coords) < 2:
+        return 0
+    quantized = np.round(np.asarray(coords, dtype=np.float64) * 10 ** precision).astype(np.int64)
+    order = np.lexsort(quantized.T[::-1])
+    quantized = quantized[order]
+    same = np.all(quantized[1:] == quantized[:-1], axis=1)
+    # Начало каждой группы из двух и более совпадающих вершин
+    starts = same & ~np.concatenate(([False], same[:-1]))
+    return int(starts.sum())
+
+def get_polygon_areas(mesh):
+    areas = np.empty(len(mesh.polygons), dtype=np.float32)
+    mesh.polygons.foreach_get("area", areas)
+    return areas
+
+def check_integrity(mesh, mode='FULL', sample_size=DEFAULT_SAMPLE_SIZE):
+    """Проверка целостности меша на массивах foreach_get
+
+    mode: FULL - все полигоны, SAMPLED - случайная выборка sample_size полигонов
+    на тяжелых мешах (топология ребер считается по всему мешу), SKIP - без проверки.
+    """
+    vertex_count, face_count = len(mesh.vertices), len(mesh.polygons)
+    if mode == 'SKIP':
+        return IntegrityReport(vertex_count, face_count, skipped=True)
+    if face_count == 0 or vertex_count < 3:
+        return IntegrityReport(vertex_count, face_count)
+    if not HAS_NUMPY:
+        return _check_integrity_bmesh(mesh)
+
+    edge_verts = get_edge_vertices(mesh)
+    edge_face_counts = get_edge_face_counts(mesh)
+    areas = get_polygon_areas(mesh)
+    coords = get_vertex_coords(mesh)
+
+    loose = np.bincount(edge_verts.ravel(), minlength=vertex_count) == 0
+    non_manifold = edge_face_counts != 2
+
+    sample_ratio = 1.0
+    if mode == 'SAMPLED' and face_count > sample_size:
+        # Выборка полигонов: проверяются их площади, ребра и вершины
+        rng = np.random.default_rng(SAMPLE_SEED)
+        faces = np.sort(rng.choice(face_count, sample_size, replace=False))
+        sample_ratio = sample_size / face_count
+
+        loop_start = np.empty(face_count, dtype=np.int32)
+        loop_total = np.empty(face_count, dtype=np.int32)
+        mesh.polygons.foreach_get("loop_start", loop_start)
+        mesh.polygons.foreach_get("loop_total", loop_total)
+        totals = loop_total[faces]
+        loops = np.repeat(loop_start[faces] - (np.cumsum(totals) - totals), totals) + np.arange(int(totals.sum()))
+
+        sample_edges = np.unique(get_loop_edges(mesh)[loops])
+        sample_verts = np.unique(edge_verts[sample_edges].ravel())
+        non_manifold = non_manifold[sample_edges]
+        areas = areas[faces]
+        coords = coords[sample_verts]
+
+    return IntegrityReport(
+        vertex_count, face_count,
+        non_manifold_edges=int(non_manifold.sum()),
+        loose_vertices=int(loose.sum()),
+        degenerate_faces=int((areas < DEGENERATE_AREA).sum()),
+        overlapping_vertices=count_overlapping_vertices(coords),
+        sample_ratio=sample_ratio,
+    )
+
+def check_object_integrity(obj, props=None):
+    """Проверка меша объекта с режимом и размером выборки из настроек"""
+    with span("integrity"):
+        if props is None:
+            return check_integrity(obj.data)
+        return check_integrity(obj.data, props.integrity_mode, props.integrity_sample_size)
+
+def _check_integrity_bmesh(mesh):
+    """Запасной путь без NumPy: один проход по BMesh"""
+    bm = bmesh.new()
+    try:
+        bm.from_mesh(mesh)
+        vert_locations = {}
+        for v in bm.verts:
+            key = tuple(round(c, DUPLICATE_PRECISION) for c in v.co)
+            vert_locations[key] = vert_locations.get(key, 0) + 1
+
+        return IntegrityReport(
+            len(bm.verts), len(bm.faces),
+            non_manifold_edges=sum(1 for e in bm.edges if not e.is_manifold),
+            loose_vertices=sum(1 for v in bm.verts if not v.link_edges),
+            degenerate_faces=sum(1 for f in bm.faces if f.calc_area() < DEGENERATE_AREA),
+            overlapping_vertices=sum(1 for count in vert_locations.values() if count > 1),
+        )
+    finally:
+        bm.free()
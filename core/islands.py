@@ -0,0 +1,221 @@
+# FILE: core/islands.py
+from .mesh_arrays import np, MeshBuffers
+
+def label_vertex_islands(edge_verts, vertex_count):
+    """Метки связных компонент вершин по массиву ребер
+
+    Векторизованный union-find: корни объединяются по ребрам (меньший индекс
+    становится родителем), затем пути сжимаются pointer jumping.
+    Возвращает (метки вершин 0..N-1, количество островов).
+    """
+    parent = np.arange(vertex_count, dtype=np.int64)
+    if vertex_count == 0:
+        return parent, 0
+
+    edge_verts = np.asarray(edge_verts, dtype=np.int64).reshape(-1, 2)
+    a, b = edge_verts[:, 0], edge_verts[:, 1]
+
+    while True:
+        root_a, root_b = parent[a], parent[b]
+        pending = root_a != root_b
+        if not pending.any():
+            break
+
+        low = np.minimum(root_a[pending], root_b[pending])
+        high = np.maximum(root_a[pending], root_b[pending])
+        np.minimum.at(parent, high, low)
+
+        # Сжатие путей до корней
+        while True:
+            grand_parent = parent[parent]
+            if np.array_equal(grand_parent, parent):
+                break
+            parent = grand_parent
+
+    _, labels = np.unique(parent, return_inverse=True)
+    labels = labels.ravel()
+    return labels, int(labels.max()) + 1
+
+def label_face_islands(buffers):
+    """Метки островов для полигонов MeshBuffers: (метки полигонов, количество островов)"""
+    vertex_labels, _ = label_vertex_islands(buffers.edge_verts, buffers.vertex_count)
+    if buffers.face_count == 0:
+        return np.zeros(0, dtype=np.int64), 0
+
+    first_verts = buffers.loop_verts[buffers.loop_starts]
+    _, face_labels = np.unique(vertex_labels[first_verts], return_inverse=True)
+    face_labels = face_labels.ravel()
+    return face_labels, int(face_labels.max()) + 1
+
+# Политики островов (индекс в кортеже - код в массиве политик)
+ISLAND_POLICIES = ('KEEP', 'PROXY', 'REMOVE', 'DECIMATE')
+KEEP, PROXY, REMOVE, DECIMATE = range(len(ISLAND_POLICIES))
+# Прокси - коробка по габаритам острова
+PROXY_TRIANGLES = 12
+MIN_ISLAND_RATIO = 0.01
+# Острова с близкими ratio децимируются одной частью: ratio округляется до 1/RATIO_BUCKETS
+RATIO_BUCKETS = 16
+
+BOX_CORNERS = np.array([
+    (0, 0, 0), (1, 0, 0), (1, 1, 0), (0, 1, 0),
+    (0, 0, 1), (1, 0, 1), (1, 1, 1), (0, 1, 1),
+], dtype=np.float64)
+# Грани коробки с нормалями наружу
+BOX_FACES = np.array([
+    (0, 3, 2, 1), (4, 5, 6, 7), (0, 1, 5, 4),
+    (1, 2, 6, 5), (2, 3, 7, 6), (3, 0, 4, 7),
+], dtype=np.int64)
+BOX_EDGES = np.array([
+    (0, 1), (1, 2), (2, 3), (3, 0), (4, 5), (5, 6),
+    (6, 7), (7, 4), (0, 4), (1, 5), (2, 6), (3, 7),
+], dtype=np.int64)
+
+def get_face_areas(buffers):
+    """Площади полигонов MeshBuffers (формула Ньюэлла, подходит и для n-угольников)"""
+    if buffers.face_count == 0:
+        return np.zeros(0, dtype=np.float64)
+    starts = buffers.loop_starts.astype(np.int64)
+    next_loops = np.arange(len(buffers.loop_verts), dtype=np.int64) + 1
+    next_loops[starts + buffers.loop_totals - 1] = starts
+
+    points = buffers.coords[buffers.loop_verts].astype(np.float64)
+    cross = np.cross(points, points[next_loops])
+    return 0.5 * np.linalg.norm(np.add.reduceat(cross, starts, axis=0), axis=1)
+
+class IslandStats:
+    """Связные острова полигонов и их статистика: полигоны, треугольники, площадь, габариты"""
+
+    def __init__(self, buffers):
+        self.face_islands, self.count = label_face_islands(buffers)
+        count = self.count
+        self.face_counts = np.bincount(self.face_islands, minlength=count)
+        self.triangle_counts = np.bincount(self.face_islands, buffers.triangle_counts, minlength=count)
+        self.areas = np.bincount(self.face_islands, get_face_areas(buffers), minlength=count)
+        _, self.first_faces = np.unique(self.face_islands, return_index=True)
+
+        # Габариты по вершинам лупов, сгруппированным по островам
+        self.mins = np.zeros((count, 3))
+        self.maxs = np.zeros((count, 3))
+        if count:
+            loop_islands = np.repeat(self.face_islands, buffers.loop_totals)
+            order = np.argsort(loop_islands, kind='stable')
+            points = buffers.coords[buffers.loop_verts[order]].astype(np.float64)
+            loop_counts = np.bincount(loop_islands, minlength=count)
+            loop_starts = np.cumsum(loop_counts) - loop_counts
+            self.mins = np.minimum.reduceat(points, loop_starts, axis=0)
+            self.maxs = np.maximum.reduceat(points, loop_starts, axis=0)
+
+    @property
+    def sizes(self):
+        """Диагональ габаритов каждого острова"""
+        return np.linalg.norm(self.maxs - self.mins, axis=1)
+
+    @property
+    def diagonal(self):
+        """Диагональ габаритов всего меша"""
+        if not self.count:
+            return 0.0
+        return float(np.linalg.norm(self.maxs.max(axis=0) - self.mins.min(axis=0)))
+
+def allocate_by_area(areas, capacities, budget):
+    """Раздача бюджета треугольников пропорционально площади с ограничением capacities
+
+    Остров, которому досталось больше его числа треугольников, получает ровно
+    capacities, а излишек делится между остальными.
+    """
+    allocation = np.zeros(len(areas), dtype=np.float64)
+    free = capacities > 0
+    while budget > 0.0 and free.any():
+        weights = np.where(free, areas, 0.0)
+        if weights.sum() <= 0.0:
+            weights = free.astype(np.float64)
+        share = budget * weights / weights.sum()
+        full = free & (share >= capacities)
+        if not full.any():
+            return allocation + share
+        budget -= float(capacities[full].sum())
+        allocation[full] = capacities[full]
+        free &= ~full
+    return allocation
+
+def plan_island_policies(stats, size_threshold, small_policy, target_triangles):
+    """Политика и ratio каждого острова: (коды политик, ratio)
+
+    Острова меньше size_threshold (диагональ габаритов) получают small_policy,
+    остальные децимируются. KEEP и PROXY расходуют бюджет по своему размеру,
+    DECIMATE для мелких - ratio, уменьшенный пропорционально размеру.
+    Остаток бюджета делится между крупными островами по площади.
+    """
+    triangles = stats.triangle_counts.astype(np.float64)
+    base_ratio = min(max(target_triangles / max(triangles.sum(), 1.0), MIN_ISLAND_RATIO), 1.0)
+
+    small = stats.sizes < size_threshold
+    policies = np.full(stats.count, DECIMATE, dtype=np.int64)
+    policies[small] = ISLAND_POLICIES.index(small_policy)
+    ratios = np.ones(stats.count, dtype=np.float64)
+
+    scaled = small & (policies == DECIMATE)
+    ratios[scaled] = base_ratio * stats.sizes[scaled] / max(size_threshold, 1e-12)
+
+    spent = triangles[small & (policies == KEEP)].sum() + PROXY_TRIANGLES * np.count_nonzero(policies == PROXY)
+    spent += (triangles[scaled] * np.clip(ratios[scaled], MIN_ISLAND_RATIO, 1.0)).sum()
+
+    large = ~small
+    allocation = allocate_by_area(stats.areas[large], triangles[large], max(target_triangles - spent, 0.0))
+    ratios[large] = allocation / np.maximum(triangles[large], 1.0)
+    ratios[policies == DECIMATE] = np.clip(ratios[policies == DECIMATE], MIN_ISLAND_RATIO, 1.0)
+    return policies, ratios
+
+def get_island_groups(stats, policies, ratios):
+    """Метки полигонов для обработки островов группами: (метки, {метка: ratio или None})
+
+    Острова с одинаковым округленным ratio попадают в одну группу, KEEP - в группу
+    с ratio None. Полигоны PROXY и REMOVE получают метку -1.
+    """
+    island_labels = np.full(stats.count, -1, dtype=np.int64)
+    island_labels[policies == KEEP] = 0
+
+    decimated = policies == DECIMATE
+    buckets = np.clip(np.round(ratios * RATIO_BUCKETS), 1, RATIO_BUCKETS).astype(np.int64)
+    # Ratio 1.0 - тот же KEEP, без прогона децимации
+    island_labels[decimated] = np.where(buckets[decimated] == RATIO_BUCKETS, 0, buckets[decimated])
+
+    # Ratio группы - среднее по треугольникам: бюджет группы равен сумме бюджетов островов
+    group_ratios = {}
+    for label in np.unique(island_labels[island_labels >= 0]).tolist():
+        if label == 0:
+            group_ratios[label] = None
+            continue
+        members = island_labels == label
+        weights = stats.triangle_counts[members]
+        group_ratios[label] = float((ratios[members] * weights).sum() / max(weights.sum(), 1))
+    return island_labels[stats.face_islands], group_ratios
+
+def count_policies(policies):
+    """Число островов по политикам: {имя: количество}"""
+    counts = np.bincount(policies, minlength=len(ISLAND_POLICIES))
+    return {name: int(count) for name, count in zip(ISLAND_POLICIES, counts)}
+
+def build_island_proxies(stats, policies, material_indices):
+    """Коробки по габаритам PROXY-островов одним набором буферов или None
+
+    8 вершин и 6 граней на остров, материал - первого полигона острова.
+    """
+    islands = np.flatnonzero(policies == PROXY)
+    count = len(islands)
+    if not count:
+        return None
+    extent = stats.maxs[islands] - stats.mins[islands]
+    coords = stats.mins[islands][:, None, :] + BOX_CORNERS[None, :, :] * extent[:, None, :]
+    offsets = (np.arange(count, dtype=np.int64) * len(BOX_CORNERS))[:, None, None]
+
+    loop_verts = (BOX_FACES[None, :, :] + offsets).reshape(-1)
+    edge_verts = (BOX_EDGES[None, :, :] + offsets).reshape(-1, 2)
+    face_count = count * len(BOX_FACES)
+    return MeshBuffers(
+        coords.reshape(-1, 3).astype(np.float32), edge_verts.astype(np.int32), loop_verts.astype(np.int32),
+        np.full(face_count, 4, dtype=np.int32),
+        np.repeat(material_indices[stats.first_faces[islands]], len(BOX_FACES)).astype(np.int32),
+        np.zeros(face_count, dtype=bool), np.zeros(len(edge_verts), dtype=bool),
+        np.zeros(len(edge_verts), dtype=np.float32), {},
+    )
@@ -0,0 +1,102 @@
+# FILE: core/lod.py
+import bpy
+
+from .base_decimate import decimate_single_object
+from .data_ops import duplicate_object
+from .edge_analyzer import SourceAnalysis
+from .settings import make_settings
+from .profiling import log
+
+MIN_LEVEL_RATIO = 0.01
+MAX_LEVEL_RATIO = 0.99
+
+def parse_lod_levels(text):
+    """Разбор списка уровней: '0.5, 0.25' (доля исходника) или '20000, 5000' (число полигонов)"""
+    levels = []
+    for token in text.replace(";", ",").split(","):
+        token = token.strip()
+        if not token:
+            continue
+        value = float(token)
+        if value <= 0:
+            raise ValueError(f"Invalid LOD level: {token}")
+        levels.append(value)
+    return levels
+
+def get_level_target_faces(level, source_faces):
+    """Целевое число полигонов уровня"""
+    if level <= 1.0:
+        return max(1, int(round(source_faces * level)))
+    return int(level)
+
+def get_lod_name(base_name, level_index):
+    return f"{base_name}_LOD{level_index}"
+
+def get_lod_collection(context, base_name, parent_collections):
+    """Коллекция '<имя>_LODs' рядом с исходным объектом (создается при необходимости)"""
+    name = f"{base_name}_LODs"
+    collection = bpy.data.collections.get(name)
+    if collection is None:
+        collection = bpy.data.collections.new(name)
+        parent = parent_collections[0] if parent_collections else context.scene.collection
+        parent.children.link(collection)
+    return collection
+
+def move_to_collection(obj, collection):
+    for coll in list(obj.users_collection):
+        coll.objects.unlink(obj)
+    collection.objects.link(obj)
+
+def generate_lod_chain(context, original_obj, props, levels, cascade=True):
+    """Цепочка LOD0..LODn в отдельной коллекции
+
+    LOD0 - копия исходника с общим мешем. При cascade каждый уровень строится
+    из предыдущего, так что тяжелый проход по исходнику выполняется один раз.
+    Анализ Sharp/Crease исходника выполняется один раз и общий для всех уровней.
+    Уровни используют единый ratio (material-режим отключается, слоты материалов сохраняются).
+    """
+    base_name = original_obj.name
+    source_faces = len(original_obj.data.polygons)
+    collection = get_lod_collection(context, base_name, original_obj.users_collection)
+
+    lod0 = duplicate_object(original_obj, get_lod_name(base_name, 0), mesh=original_obj.data,
+                            collections=[collection])
+    created = [lod0]
+
+    analysis = SourceAnalysis(original_obj.data, props.keep_sharp, props.keep_crease,
+                              props.edge_transfer_tolerance / 100.0)
+    try:
+        previous_obj = original_obj
+        for level_index, level in enumerate(levels, start=1):
+            target_faces = get_level_target_faces(level, source_faces)
+            input_obj = previous_obj if cascade else original_obj
+            input_faces = len(input_obj.data.polygons)
+
+            ratio = min(max(target_faces / max(input_faces, 1), MIN_LEVEL_RATIO), MAX_LEVEL_RATIO)
+            log(f"🪜 LOD{level_index}: {input_faces} -> ~{target_faces} faces (ratio {ratio:.3f})", 'DEBUG')
+
+            level_props = make_settings(props, ratio=ratio, use_material_decimation=False,
+                                        use_target_budget=False)
+            lod_obj = decimate_single_object(context, input_obj, level_props, analysis)
+            if lod_obj is None:
+                raise RuntimeError(f"LOD{level_index} decimation failed")
+
+            lod_obj.name = get_lod_name(base_name, level_index)
+            lod_obj.data.name = lod_obj.name
+            move_to_collection(lod_obj, collection)
+            created.append(lod_obj)
+            previous_obj = lod_obj
+
+    except Exception:
+        # Удаляем незавершенную цепочку
+        for obj in created:
+            mesh = obj.data
+            bpy.data.objects.remove(obj, do_unlink=True)
+            if mesh.users == 0:
+                bpy.data.meshes.remove(mesh)
+        raise
+
+    finally:
+        analysis.free()
+
+    return created
@@ -0,0 +1,469 @@
+# FILE: core/mesh_arrays.py
+import bpy
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    np = None
+    HAS_NUMPY = False
+
+def get_vertex_coords(mesh):
+    """Координаты вершин массивом (N, 3)"""
+    coords = np.empty(len(mesh.vertices) * 3, dtype=np.float32)
+    mesh.vertices.foreach_get("co", coords)
+    return coords.reshape(-1, 3)
+
+def get_edge_vertices(mesh):
+    """Индексы вершин ребер массивом (E, 2)"""
+    edge_verts = np.empty(len(mesh.edges) * 2, dtype=np.int32)
+    mesh.edges.foreach_get("vertices", edge_verts)
+    return edge_verts.reshape(-1, 2)
+
+def get_polygon_normals(mesh):
+    """Нормали полигонов массивом (P, 3)"""
+    normals = np.empty(len(mesh.polygons) * 3, dtype=np.float32)
+    mesh.polygons.foreach_get("normal", normals)
+    return normals.reshape(-1, 3)
+
+def get_polygon_loops(mesh):
+    """Начало и длина диапазона лупов каждого полигона"""
+    count = len(mesh.polygons)
+    loop_start = np.empty(count, dtype=np.int32)
+    loop_total = np.empty(count, dtype=np.int32)
+    mesh.polygons.foreach_get("loop_start", loop_start)
+    mesh.polygons.foreach_get("loop_total", loop_total)
+    return loop_start, loop_total
+
+def get_loop_edges(mesh):
+    """Индекс ребра для каждого лупа"""
+    loop_edges = np.empty(len(mesh.loops), dtype=np.int32)
+    mesh.loops.foreach_get("edge_index", loop_edges)
+    return loop_edges
+
+def get_loop_vertices(mesh):
+    """Индекс вершины для каждого лупа"""
+    loop_verts = np.empty(len(mesh.loops), dtype=np.int32)
+    mesh.loops.foreach_get("vertex_index", loop_verts)
+    return loop_verts
+
+def get_loop_polygons(mesh):
+    """Индекс полигона для каждого лупа"""
+    loop_start, loop_total = get_polygon_loops(mesh)
+    order = np.argsort(loop_start, kind='stable')
+    loop_polys = np.repeat(order.astype(np.int32), loop_total[order])
+    return loop_polys
+
+def count_triangles(mesh):
+    """Число треугольников после триангуляции всех полигонов"""
+    _, loop_total = get_polygon_loops(mesh)
+    return int(loop_total.sum()) - 2 * len(loop_total)
+
+def get_triangle_vertices(mesh):
+    """Индексы вершин треугольников триангуляции (loop_triangles) массивом (T, 3)"""
+    mesh.calc_loop_triangles()
+    tris = np.empty(len(mesh.loop_triangles) * 3, dtype=np.int32)
+    mesh.loop_triangles.foreach_get("vertices", tris)
+    return tris.reshape(-1, 3)
+
+def get_edge_face_counts(mesh):
+    """Количество полигонов, прилегающих к каждому ребру"""
+    return np.bincount(get_loop_edges(mesh), minlength=len(mesh.edges))
+
+def get_edge_face_pairs(mesh):
+    """Пары полигонов для ребер ровно с двумя соседями
+
+    Возвращает (edge_indices, face_a, face_b, face_counts).
+    """
+    loop_edges = get_loop_edges(mesh)
+    loop_polys = get_loop_polygons(mesh)
+    face_counts = np.bincount(loop_edges, minlength=len(mesh.edges))
+
+    order = np.argsort(loop_edges, kind='stable')
+    sorted_polys = loop_polys[order]
+    offsets = np.concatenate(([0], np.cumsum(face_counts)[:-1]))
+
+    edge_indices = np.flatnonzero(face_counts == 2)
+    first = offsets[edge_indices]
+    return edge_indices, sorted_polys[first], sorted_polys[first + 1], face_counts
+
+def get_sharp_mask(mesh):
+    """Маска ребер, помеченных как Sharp"""
+    mask = np.zeros(len(mesh.edges), dtype=bool)
+    mesh.edges.foreach_get("use_edge_sharp", mask)
+    return mask
+
+def set_sharp_mask(mesh, mask):
+    """Запись маски Sharp в ребра меша"""
+    mesh.edges.foreach_set("use_edge_sharp", np.ascontiguousarray(mask, dtype=bool))
+    mesh.update()
+
+def get_edge_creases(mesh):
+    """Значения Crease ребер (нули, если слой отсутствует)"""
+    creases = np.zeros(len(mesh.edges), dtype=np.float32)
+
+    # Blender 4.0+: crease хранится как атрибут
+    attribute = mesh.attributes.get("crease_edge")
+    if attribute is not None and attribute.domain == 'EDGE':
+        attribute.data.foreach_get("value", creases)
+        return creases
+
+    # Blender 3.x: свойство ребра
+    try:
+        mesh.edges.foreach_get("crease", creases)
+    except (AttributeError, TypeError, RuntimeError):
+        creases[:] = 0.0
+    return creases
+
+def set_edge_creases(mesh, creases):
+    """Запись значений Crease в ребра меша"""
+    creases = np.ascontiguousarray(creases, dtype=np.float32)
+
+    if bpy.app.version >= (4, 0, 0):
+        attribute = mesh.attributes.get("crease_edge")
+        if attribute is None:
+            attribute = mesh.attributes.new("crease_edge", 'FLOAT', 'EDGE')
+        attribute.data.foreach_set("value", creases)
+    else:
+        mesh.edges.foreach_set("crease", creases)
+    mesh.update()
+
+def get_polygon_material_indices(mesh):
+    """Индекс материала каждого полигона"""
+    material_indices = np.empty(len(mesh.polygons), dtype=np.int32)
+    mesh.polygons.foreach_get("material_index", material_indices)
+    return material_indices
+
+def get_polygon_smooth(mesh):
+    """Флаг сглаживания каждого полигона"""
+    smooth = np.zeros(len(mesh.polygons), dtype=bool)
+    mesh.polygons.foreach_get("use_smooth", smooth)
+    return smooth
+
+def get_uv_arrays(mesh):
+    """UV-развертки меша: {имя слоя: массив (L, 2)}"""
+    uv_arrays = {}
+    for layer in mesh.uv_layers:
+        uv = np.empty(len(mesh.loops) * 2, dtype=np.float32)
+        layer.data.foreach_get("uv", uv)
+        uv_arrays[layer.name] = uv.reshape(-1, 2)
+    return uv_arrays
+
+# Пользовательские атрибуты, которые переносятся через MeshBuffers:
+# тип данных -> (свойство для foreach, число компонент, dtype)
+ATTRIBUTE_LAYOUTS = {
+    'FLOAT': ("value", 1, 'float32'),
+    'INT': ("value", 1, 'int32'),
+    'INT8': ("value", 1, 'int8'),
+    'BOOLEAN': ("value", 1, 'bool'),
+    'FLOAT2': ("vector", 2, 'float32'),
+    'FLOAT_VECTOR': ("vector", 3, 'float32'),
+    'FLOAT_COLOR': ("color", 4, 'float32'),
+    'BYTE_COLOR': ("color", 4, 'float32'),
+}
+# Ребра пересобираются через calc_edges, поэтому атрибуты ребер не переносятся
+ATTRIBUTE_DOMAINS = ('POINT', 'FACE', 'CORNER')
+# Встроенные атрибуты, которые MeshBuffers хранит отдельными массивами или которые пишет Blender
+BUILTIN_ATTRIBUTES = {"position", "material_index", "sharp_face", "sharp_edge", "crease", "crease_edge",
+                      "crease_vert", "normal"}
+GROUPS_OBJECT_NAME = "SharpDecimate_Groups"
+
+def get_generic_attributes(mesh):
+    """Пользовательские атрибуты вершин, полигонов и углов: {имя: (domain, data_type, массив (N, k))}"""
+    uv_names = {layer.name for layer in mesh.uv_layers}
+    attributes = {}
+    for attribute in mesh.attributes:
+        name = attribute.name
+        if name.startswith(".") or name in BUILTIN_ATTRIBUTES or name in uv_names:
+            continue
+        layout = ATTRIBUTE_LAYOUTS.get(attribute.data_type)
+        if layout is None or attribute.domain not in ATTRIBUTE_DOMAINS:
+            continue
+        key, width, dtype = layout
+        values = np.empty(len(attribute.data) * width, dtype=dtype)
+        attribute.data.foreach_get(key, values)
+        attributes[name] = (attribute.domain, attribute.data_type, values.reshape(-1, width))
+    return attributes
+
+def set_generic_attributes(mesh, attributes):
+    """Запись атрибутов из get_generic_attributes в новый меш"""
+    for name, (domain, data_type, values) in attributes.items():
+        key, _, dtype = ATTRIBUTE_LAYOUTS[data_type]
+        attribute = mesh.attributes.new(name, data_type, domain)
+        attribute.data.foreach_set(key, np.ascontiguousarray(values, dtype=dtype).ravel())
+
+def get_vertex_group_weights(mesh):
+    """Веса групп вершин: {имя группы: float32 (V,)}
+
+    Имена групп хранит меш (Blender 3.0+), но доступны они только через
+    объект - меш на время чтения подключается к временному объекту.
+    """
+    holder = bpy.data.objects.new(GROUPS_OBJECT_NAME, mesh)
+    try:
+        names = [group.name for group in holder.vertex_groups]
+    finally:
+        bpy.data.objects.remove(holder)
+    if not names:
+        return {}
+
+    weights = np.zeros((len(names), len(mesh.vertices)), dtype=np.float32)
+    for vertex in mesh.vertices:
+        for element in vertex.groups:
+            if element.group < len(names):
+                weights[element.group, vertex.index] = element.weight
+    return dict(zip(names, weights))
+
+def set_vertex_group_weights(mesh, vertex_weights):
+    """Создание групп вершин меша с весами: один VertexGroup.add на каждое значение веса"""
+    if not vertex_weights:
+        return
+    holder = bpy.data.objects.new(GROUPS_OBJECT_NAME, mesh)
+    try:
+        for name, weights in vertex_weights.items():
+            group = holder.vertex_groups.new(name=name)
+            weighted = np.flatnonzero(weights > 0.0)
+            weighted = weighted[np.argsort(weights[weighted], kind='stable')]
+            values, starts = np.unique(weights[weighted], return_index=True)
+            for value, indices in zip(values.tolist(), np.split(weighted, starts[1:])):
+                group.add(indices.tolist(), value, 'REPLACE')
+    finally:
+        bpy.data.objects.remove(holder)
+
+def get_edge_keys(edge_verts):
+    """Ключи ребер, не зависящие от порядка вершин (для сопоставления ребер)"""
+    edge_verts = np.sort(np.asarray(edge_verts, dtype=np.int64), axis=1)
+    return (edge_verts[:, 0] << 32) | edge_verts[:, 1]
+
+def match_edge_keys(source_keys, target_keys):
+    """Сопоставление ключей ребер: (маска найденных, индекс в source_keys)"""
+    if not len(source_keys):
+        return np.zeros(len(target_keys), dtype=bool), np.zeros(len(target_keys), dtype=np.int64)
+    order = np.argsort(source_keys)
+    sorted_keys = source_keys[order]
+    position = np.clip(np.searchsorted(sorted_keys, target_keys), 0, len(sorted_keys) - 1)
+    return sorted_keys[position] == target_keys, order[position]
+
+class MeshBuffers:
+    """Плоские массивы меша, прочитанные одним проходом foreach_get
+
+    Позволяет выделять подмножества полигонов, склеивать части и собирать
+    новый Mesh без BMesh и без полных копий исходного меша. attributes
+    (пользовательские атрибуты) и vertex_weights (группы вершин) читаются
+    только по запросу: группы вершин требуют прохода по вершинам в Python.
+    """
+
+    def __init__(self, coords, edge_verts, loop_verts, loop_totals, material_indices,
+                 smooth, sharp, creases, uv_arrays, attributes=None, vertex_weights=None):
+        self.coords = coords
+        self.edge_verts = edge_verts
+        self.loop_verts = loop_verts
+        self.loop_totals = loop_totals
+        self.material_indices = material_indices
+        self.smooth = smooth
+        self.sharp = sharp
+        self.creases = creases
+        self.uv_arrays = uv_arrays
+        self.attributes = attributes or {}
+        self.vertex_weights = vertex_weights or {}
+
+    @property
+    def loop_starts(self):
+        return np.cumsum(self.loop_totals) - self.loop_totals
+
+    @property
+    def vertex_count(self):
+        return len(self.coords)
+
+    @property
+    def face_count(self):
+        return len(self.loop_totals)
+
+    @property
+    def triangle_counts(self):
+        """Число треугольников каждого полигона после веерной триангуляции"""
+        return np.maximum(self.loop_totals.astype(np.int64) - 2, 0)
+
+    @classmethod
+    def from_mesh(cls, mesh, with_layers=False):
+        """Чтение всех нужных буферов из меша
+
+        with_layers=True читает также пользовательские атрибуты и группы вершин.
+        """
+        loop_start, loop_total = get_polygon_loops(mesh)
+        buffers = cls(get_vertex_coords(mesh), get_edge_vertices(mesh), get_loop_vertices(mesh),
+                      loop_total, get_polygon_material_indices(mesh), get_polygon_smooth(mesh),
+                      get_sharp_mask(mesh), get_edge_creases(mesh), get_uv_arrays(mesh))
+        if with_layers:
+            buffers.attributes = get_generic_attributes(mesh)
+            buffers.vertex_weights = get_vertex_group_weights(mesh)
+
+        # Приводим лупы к порядку полигонов (обычно уже так)
+        if len(loop_start) and np.any(loop_start != buffers.loop_starts):
+            order = np.arange(len(loop_start))
+            return buffers._take_polygons(order, loop_start)
+        return buffers
+
+    def _loop_indices(self, polygon_ids, loop_start=None):
+        """Индексы лупов выбранных полигонов (в порядке полигонов)"""
+        if loop_start is None:
+            loop_start = self.loop_starts
+        totals = self.loop_totals[polygon_ids]
+        new_starts = np.cumsum(totals) - totals
+        return (np.arange(int(totals.sum()), dtype=np.int64)
+                - np.repeat(new_starts, totals)
+                + np.repeat(loop_start[polygon_ids], totals))
+
+    def _take_polygons(self, polygon_ids, loop_start=None):
+        """Перестановка/выборка полигонов без удаления вершин"""
+        loop_ids = self._loop_indices(polygon_ids, loop_start)
+        return MeshBuffers(
+            self.coords, self.edge_verts, self.loop_verts[loop_ids],
+            self.loop_totals[polygon_ids], self.material_indices[polygon_ids],
+            self.smooth[polygon_ids], self.sharp, self.creases,
+            {name: uv[loop_ids] for name, uv in self.uv_arrays.items()},
+            self._take_attributes({'FACE': polygon_ids, 'CORNER': loop_ids}),
+            self.vertex_weights,
+        )
+
+    def _take_attributes(self, indices):
+        """Выборка атрибутов по доменам: indices - {домен: индексы}, остальные домены без изменений"""
+        return {
+            name: (domain, data_type, values[indices[domain]] if domain in indices else values)
+            for name, (domain, data_type, values) in self.attributes.items()
+        }
+
+    def subset(self, polygon_ids):
+        """Новые буферы только с указанными полигонами и их вершинами"""
+        polygon_ids = np.asarray(polygon_ids, dtype=np.int64)
+        part = self._take_polygons(polygon_ids)
+
+        used_verts, loop_verts = np.unique(part.loop_verts, return_inverse=True)
+        remap = np.full(self.vertex_count, -1, dtype=np.int64)
+        remap[used_verts] = np.arange(len(used_verts))
+
+        edge_verts = remap[self.edge_verts]
+        keep_edges = np.all(edge_verts >= 0, axis=1)
+
+        part.coords = self.coords[used_verts]
+        part.loop_verts = loop_verts.astype(np.int32).ravel()
+        part.edge_verts = edge_verts[keep_edges].astype(np.int32)
+        part.sharp = self.sharp[keep_edges]
+        part.creases = self.creases[keep_edges]
+        part.attributes = part._take_attributes({'POINT': used_verts})
+        part.vertex_weights = {name: weights[used_verts] for name, weights in self.vertex_weights.items()}
+        part.source_vertices = used_verts
+        return part
+
+    @classmethod
+    def concatenate(cls, parts):
+        """Склейка нескольких частей в одни буферы (вершины не свариваются)"""
+        vertex_offsets = np.cumsum([0] + [part.vertex_count for part in parts])
+
+        uv_names = []
+        for part in parts:
+            for name in part.uv_arrays:
+                if name not in uv_names:
+                    uv_names.append(name)
+
+        uv_arrays = {}
+        for name in uv_names:
+            uv_arrays[name] = np.concatenate([
+                part.uv_arrays.get(name, np.zeros((len(part.loop_verts), 2), dtype=np.float32))
+                for part in parts
+            ])
+
+        # Атрибуты и группы, которых нет у части, заполняются нулями
+        attributes = {}
+        for part in parts:
+            for name, (domain, data_type, values) in part.attributes.items():
+                attributes.setdefault(name, (domain, data_type, values.shape[1], values.dtype))
+        attribute_arrays = {}
+        for name, (domain, data_type, width, dtype) in attributes.items():
+            chunks = []
+            for part in parts:
+                values = part.attributes.get(name)
+                if values is None or values[:2] != (domain, data_type):
+                    size = {'POINT': part.vertex_count, 'FACE': part.face_count,
+                            'CORNER': len(part.loop_verts)}[domain]
+                    chunks.append(np.zeros((size, width), dtype=dtype))
+                else:
+                    chunks.append(values[2])
+            attribute_arrays[name] = (domain, data_type, np.concatenate(chunks))
+
+        group_names = []
+        for part in parts:
+            for name in part.vertex_weights:
+                if name not in group_names:
+                    group_names.append(name)
+        vertex_weights = {
+            name: np.concatenate([
+                part.vertex_weights.get(name, np.zeros(part.vertex_count, dtype=np.float32)) for part in parts
+            ])
+            for name in group_names
+        }
+
+        return cls(
+            np.concatenate([part.coords for part in parts]),
+            np.concatenate([part.edge_verts + offset for part, offset in zip(parts, vertex_offsets)]),
+            np.concatenate([part.loop_verts + offset for part, offset in zip(parts, vertex_offsets)]),
+            np.concatenate([part.loop_totals for part in parts]),
+            np.concatenate([part.material_indices for part in parts]),
+            np.concatenate([part.smooth for part in parts]),
+            np.concatenate([part.sharp for part in parts]),
+            np.concatenate([part.creases for part in parts]),
+            uv_arrays,
+            attribute_arrays,
+            vertex_weights,
+        )
+
+    def to_mesh(self, name):
+        """Сборка нового Mesh из буферов через foreach_set"""
+        mesh = bpy.data.meshes.new(name)
+
+        mesh.vertices.add(self.vertex_count)
+        mesh.vertices.foreach_set("co", np.ascontiguousarray(self.coords, dtype=np.float32).ravel())
+
+        mesh.edges.add(len(self.edge_verts))
+        mesh.edges.foreach_set("vertices", np.ascontiguousarray(self.edge_verts, dtype=np.int32).ravel())
+
+        mesh.loops.add(len(self.loop_verts))
+        mesh.loops.foreach_set("vertex_index", np.ascontiguousarray(self.loop_verts, dtype=np.int32))
+
+        mesh.polygons.add(self.face_count)
+        mesh.polygons.foreach_set("loop_start", self.loop_starts.astype(np.int32))
+        if bpy.app.version < (4, 0, 0):
+            mesh.polygons.foreach_set("loop_total", np.ascontiguousarray(self.loop_totals, dtype=np.int32))
+
+        # Достраиваем ребра полигонов, существующие ребра сохраняются
+        mesh.update(calc_edges=True)
+
+        mesh.polygons.foreach_set("material_index", np.ascontiguousarray(self.material_indices, dtype=np.int32))
+        mesh.polygons.foreach_set("use_smooth", np.ascontiguousarray(self.smooth, dtype=bool))
+
+        for uv_name, uv in self.uv_arrays.items():
+            layer = mesh.uv_layers.new(name=uv_name)
+            layer.data.foreach_set("uv", np.ascontiguousarray(uv, dtype=np.float32).ravel())
+        set_generic_attributes(mesh, self.attributes)
+        set_vertex_group_weights(mesh, self.vertex_weights)
+
+        # Порядок ребер после calc_edges не гарантирован - сопоставляем по ключам
+        self.apply_edge_flags(mesh)
+        mesh.validate()
+        return mesh
+
+    def apply_edge_flags(self, mesh):
+        """Перенос Sharp/Crease на ребра меша с теми же вершинами"""
+        if not len(self.edge_verts) or not (self.sharp.any() or self.creases.any()):
+            return
+
+        target_keys = get_edge_keys(get_edge_vertices(mesh))
+        found, source_index = match_edge_keys(get_edge_keys(self.edge_verts), target_keys)
+
+        sharp = np.zeros(len(target_keys), dtype=bool)
+        sharp[found] = self.sharp[source_index[found]]
+        set_sharp_mask(mesh, sharp)
+
+        if self.creases.any():
+            creases = np.zeros(len(target_keys), dtype=np.float32)
+            creases[found] = self.creases[source_index[found]]
+            set_edge_creases(mesh, creases)
@@ -0,0 +1,140 @@
+# FILE: core/parallel.py
+import os
+import shutil
+import subprocess
+import tempfile
+
+import bpy
+
+from .mesh_arrays import np, MeshBuffers
+from .islands import label_face_islands
+from .partition import partition_buffers
+from .data_ops import copy_materials
+from .exchange import save_buffers, load_buffers
+from .profiling import log
+
+WORKER_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "worker.py")
+
+def get_worker_count(props):
+    """Количество фоновых процессов (0 = по числу ядер)"""
+    if props.parallel_workers > 0:
+        return props.parallel_workers
+    return os.cpu_count() or 1
+
+def bin_islands(face_islands, island_count, bin_count):
+    """Детерминированная раскладка островов по корзинам, сбалансированным по числу полигонов"""
+    sizes = np.bincount(face_islands, minlength=island_count)
+    # Крупные острова первыми, при равенстве - по индексу
+    order = np.lexsort((np.arange(island_count), -sizes))
+
+    bin_loads = np.zeros(bin_count, dtype=np.int64)
+    island_bins = np.zeros(island_count, dtype=np.int64)
+    for island in order:
+        target = int(np.argmin(bin_loads))
+        island_bins[island] = target
+        bin_loads[target] += sizes[island]
+    return island_bins[face_islands]
+
+def build_partitions(buffers, granularity, ratio_for_material, bin_count, use_materials):
+    """Независимые части меша: список (ключ, MeshBuffers, ratio)
+
+    MATERIAL - по material_index, ISLAND - по несвязанным островам,
+    разложенным в bin_count корзин (внутри каждого материала, если use_materials).
+    """
+    material_labels = buffers.material_indices.astype(np.int64) if use_materials \
+        else np.zeros(buffers.face_count, dtype=np.int64)
+
+    if granularity == 'ISLAND':
+        face_islands, island_count = label_face_islands(buffers)
+        island_labels = bin_islands(face_islands, island_count, bin_count)
+    else:
+        island_labels = np.zeros(buffers.face_count, dtype=np.int64)
+
+    labels = material_labels * bin_count + island_labels
+    partitions = []
+    for label, part in sorted(partition_buffers(buffers, labels).items()):
+        material_index = label // bin_count
+        ratio = ratio_for_material(material_index)
+        partitions.append(((material_index, label % bin_count), part, ratio))
+    return partitions
+
+def order_results(partitions, results, merge_order):
+    """Детерминированный порядок склейки результатов"""
+    keys = [key for key, _, _ in partitions]
+    if merge_order == 'SIZE':
+        sizes = {key: part.face_count for key, part, _ in partitions}
+        keys.sort(key=lambda key: (-sizes[key], key))
+    return [results[key] for key in keys if key in results]
+
+def run_workers(partitions, worker_count, work_dir, timeout=None, protection=None):
+    """Запуск пула фоновых Blender и сбор результатов {ключ: MeshBuffers}
+
+    protection - веса защиты исходника (ProtectionWeights): каждая часть получает веса своих вершин.
+    """
+    task_groups = [[] for _ in range(min(worker_count, len(partitions)))]
+    outputs = {}
+
+    # Round-robin по убыванию размера - детерминированно и примерно поровну
+    by_size = sorted(range(len(partitions)), key=lambda i: (-partitions[i][1].face_count, i))
+    for position, index in enumerate(by_size):
+        key, part, ratio = partitions[index]
+        task_path = os.path.join(work_dir, f"task_{index}.npz")
+        output_path = os.path.join(work_dir, f"result_{index}.npz")
+        part_protection = protection.subset(part.source_vertices) if protection is not None else None
+        save_buffers(task_path, part, part_protection, key=list(key), ratio=ratio, output=output_path)
+        task_groups[position % len(task_groups)].append(task_path)
+        outputs[key] = output_path
+
+    processes = []
+    for tasks in task_groups:
+        command = [
+            bpy.app.binary_path, "-b", "--factory-startup", "--python-exit-code", "1",
+            "--python", WORKER_SCRIPT, "--", *tasks,
+        ]
+        processes.append(subprocess.Popen(command, stdout=subprocess.DEVNULL))
+
+    failed = 0
+    for process in processes:
+        try:
+            if process.wait(timeout=timeout) != 0:
+                failed += 1
+        except subprocess.TimeoutExpired:
+            process.kill()
+            failed += 1
+    if failed:
+        raise RuntimeError(f"{failed} decimation worker(s) failed")
+
+    results = {}
+    for key, output_path in outputs.items():
+        result, _ = load_buffers(output_path)
+        results[key] = result
+    return results
+
+def parallel_decimate_mesh(source_mesh, props, ratio_for_material, use_materials, name, protection=None):
+    """Децимация независимых частей меша параллельно в фоновых процессах Blender
+
+    Группы вершин, пользовательские атрибуты и веса защиты (protection) передаются в части.
+    """
+    worker_count = get_worker_count(props)
+    buffers = MeshBuffers.from_mesh(source_mesh, with_layers=True)
+    partitions = build_partitions(
+        buffers, props.parallel_granularity, ratio_for_material, worker_count, use_materials
+    )
+    if not partitions:
+        return None
+
+    log(f"⚡ Parallel decimation: {len(partitions)} partitions on {worker_count} workers", 'DEBUG')
+    work_dir = tempfile.mkdtemp(prefix="sharpdecimate_")
+    try:
+        results = run_workers(partitions, worker_count, work_dir, protection=protection)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    parts = [part for part in order_results(partitions, results, props.parallel_merge_order)
+             if part.face_count]
+    if not parts:
+        return None
+
+    merged_mesh = MeshBuffers.concatenate(parts).to_mesh(name)
+    copy_materials(source_mesh, merged_mesh)
+    return merged_mesh
@@ -0,0 +1,101 @@
+# FILE: core/partition.py
+import bpy
+
+from .mesh_arrays import HAS_NUMPY, np, MeshBuffers
+from .data_ops import copy_materials, extract_faces, join_meshes
+
+def partition_buffers(buffers, labels):
+    """Разбиение полигонов по меткам за один проход: {метка: MeshBuffers}"""
+    labels = np.asarray(labels)
+    order = np.argsort(labels, kind='stable')
+    sorted_labels = labels[order]
+
+    unique_labels, starts = np.unique(sorted_labels, return_index=True)
+    ends = np.append(starts[1:], len(sorted_labels))
+
+    return {
+        int(label): buffers.subset(order[start:end])
+        for label, start, end in zip(unique_labels, starts, ends)
+    }
+
+def partition_by_material(mesh):
+    """Разбиение меша на части по material_index без копий всего меша
+
+    Части несут группы вершин и пользовательские атрибуты исходника.
+    """
+    buffers = MeshBuffers.from_mesh(mesh, with_layers=True)
+    return partition_buffers(buffers, buffers.material_indices)
+
+def build_part_mesh(part, name, source_mesh):
+    """Сборка временного меша части с исходными слотами материалов"""
+    part_mesh = part.to_mesh(name)
+    copy_materials(source_mesh, part_mesh)
+    return part_mesh
+
+def merge_parts(parts, name, source_mesh):
+    """Склейка частей в один меш с сохранением слотов материалов"""
+    merged_mesh = MeshBuffers.concatenate(parts).to_mesh(name)
+    copy_materials(source_mesh, merged_mesh)
+    return merged_mesh
+
+def decimate_part(part, source_mesh, ratio, decimate, name):
+    """Децимация одной части: MeshBuffers результата или None, если он пуст"""
+    part_mesh = build_part_mesh(part, name, source_mesh)
+    try:
+        decimated_mesh = decimate(part_mesh, ratio)
+    finally:
+        bpy.data.meshes.remove(part_mesh)
+
+    try:
+        if len(decimated_mesh.polygons) == 0:
+            return None
+        return MeshBuffers.from_mesh(decimated_mesh, with_layers=True)
+    finally:
+        bpy.data.meshes.remove(decimated_mesh)
+
+def decimate_partitions(source_mesh, ratio_for_index, decimate, name):
+    """Разбиение по материалам, децимация каждой части и склейка результата
+
+    ratio_for_index(material_index) возвращает ratio части,
+    decimate(mesh, ratio) - новый децимированный меш.
+    Без NumPy используется запасной путь через BMesh.
+    """
+    if not HAS_NUMPY:
+        return _decimate_partitions_bmesh(source_mesh, ratio_for_index, decimate, name)
+
+    decimated_parts = []
+    for material_index, part in sorted(partition_by_material(source_mesh).items()):
+        result = decimate_part(
+            part, source_mesh, ratio_for_index(material_index), decimate,
+            f"{name}_Mat_{material_index}"
+        )
+        if result is not None:
+            decimated_parts.append(result)
+
+    if not decimated_parts:
+        return None
+    return merge_parts(decimated_parts, name, source_mesh)
+
+def _decimate_partitions_bmesh(source_mesh, ratio_for_index, decimate, name):
+    """Запасной путь без NumPy: отдельный BMesh на каждый материал"""
+    material_indices = sorted({poly.material_index for poly in source_mesh.polygons})
+    part_meshes = []
+    try:
+        for material_index in material_indices:
+            part_mesh = extract_faces(
+                source_mesh, lambda face: face.material_index == material_index
+            )
+            try:
+                if len(part_mesh.polygons):
+                    part_meshes.append(decimate(part_mesh, ratio_for_index(material_index)))
+            finally:
+                bpy.data.meshes.remove(part_mesh)
+
+        if not part_meshes:
+            return None
+        merged_mesh = join_meshes(part_meshes, name)
+        copy_materials(source_mesh, merged_mesh)
+        return merged_mesh
+    finally:
+        for mesh in part_meshes:
+            bpy.data.meshes.remove(mesh)
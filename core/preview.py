@@ -0,0 +1,201 @@
+# FILE: core/preview.py
+import math
+
+import bpy
+from bpy.app.handlers import persistent
+
+# Управляемый стек модификаторов предпросмотра на исходном объекте.
+# Модификаторы не применяются: смена настроек стоит одного пересчета depsgraph.
+# Модуль нужен панели и свойствам при включении аддона, поэтому ядро
+# (NumPy, веса защиты) импортируется только при построении предпросмотра.
+
+PREVIEW_DECIMATE_NAME = "SharpDecimate_Preview"
+PREVIEW_EDGE_SPLIT_NAME = "SharpDecimate_Preview_Split"
+PREVIEW_DEBOUNCE = 0.2
+
+# Имя объекта -> число полигонов результата / параметры, по которым построены веса
+_preview_face_counts = {}
+_weight_signatures = {}
+# Имя меша -> MeshAnalysis: отпечаток меша не пересчитывается на каждое обновление
+# предпросмотра, запись сбрасывается при изменении данных меша
+_preview_analyses = {}
+# Меши, которые сейчас обновляет сам предпросмотр: запись группы защиты тоже
+# приходит в depsgraph как изменение меша и не должна запускать новое обновление
+# (evaluated_depsgraph_get в update_preview вызывает обработчики еще внутри него)
+_updating_meshes = set()
+
+def is_preview_active(obj):
+    return obj is not None and obj.type == 'MESH' and PREVIEW_DECIMATE_NAME in obj.modifiers
+
+def get_preview_objects(scene):
+    return [obj for obj in scene.objects if is_preview_active(obj)]
+
+def get_preview_face_count(obj):
+    """Число полигонов предпросмотра (из последнего пересчета) или None"""
+    return _preview_face_counts.get(obj.name_full)
+
+def get_preview_analysis(mesh):
+    """MeshAnalysis меша для предпросмотра (из общего кэша при первом запросе после изменения)"""
+    analysis = _preview_analyses.get(mesh.name_full)
+    if analysis is None:
+        from .analysis_cache import get_mesh_analysis
+        analysis = get_mesh_analysis(mesh)
+        _preview_analyses[mesh.name_full] = analysis
+    return analysis
+
+def get_effective_ratio(obj, props):
+    """Общий ratio предпросмотра: в material-режиме - среднее по полигонам слотов"""
+    from .mesh_arrays import HAS_NUMPY, np
+
+    mesh = obj.data
+    if not (props.use_material_decimation and mesh.materials and HAS_NUMPY):
+        return props.ratio
+
+    from .base_decimate import make_ratio_getter
+
+    counts = get_preview_analysis(mesh).material_face_counts
+    if not counts.sum():
+        return props.ratio
+    ratio_for_index = make_ratio_getter(mesh, props)
+    ratios = np.array([ratio_for_index(index) for index in range(len(counts))])
+    return float((counts * ratios).sum() / counts.sum())
+
+def update_protection_group(obj, props):
+    """Группа весов защиты (та же, что у модификатора при генерации), пересчет только при смене настроек"""
+    from .mesh_arrays import HAS_NUMPY
+    from .protection_weights import PROTECTION_GROUP_NAME, build_protection_weights
+
+    signature = (obj.data.name_full, props.use_protection_weights, props.sharp_angle, props.keep_sharp,
+                 props.keep_crease, props.protect_high_detail, props.protection_falloff,
+                 props.use_importance, props.importance_strength)
+    if _weight_signatures.get(obj.name_full) == signature:
+        return obj.vertex_groups.get(PROTECTION_GROUP_NAME)
+
+    analysis = None
+    if HAS_NUMPY:
+        analysis = get_preview_analysis(obj.data)
+    protection = build_protection_weights(obj.data, props, analysis)
+    _weight_signatures[obj.name_full] = signature
+    if protection is None:
+        group = obj.vertex_groups.get(PROTECTION_GROUP_NAME)
+        if group is not None:
+            obj.vertex_groups.remove(group)
+        return None
+    return protection.write_group(obj)
+
+def start_preview(context, obj, props):
+    """Добавление стека предпросмотра на объект"""
+    if not is_preview_active(obj):
+        decimate = obj.modifiers.new(name=PREVIEW_DECIMATE_NAME, type='DECIMATE')
+        decimate.decimate_type = 'COLLAPSE'
+
+        edge_split = obj.modifiers.new(name=PREVIEW_EDGE_SPLIT_NAME, type='EDGE_SPLIT')
+        edge_split.use_edge_sharp = True
+        edge_split.show_in_editmode = False
+    update_preview(context, obj, props)
+
+def update_preview(context, obj, props):
+    """Перенос текущих настроек в стек и подсчет полигонов результата"""
+    mesh_name = obj.data.name_full
+    _updating_meshes.add(mesh_name)
+    try:
+        _update_preview_stack(context, obj, props)
+    finally:
+        _updating_meshes.discard(mesh_name)
+
+def _update_preview_stack(context, obj, props):
+    group = update_protection_group(obj, props)
+
+    decimate = obj.modifiers[PREVIEW_DECIMATE_NAME]
+    if group is not None:
+        decimate.vertex_group = group.name
+        # Вес 1 - защищенная вершина, модификатор штрафует вершины с малым весом
+        decimate.invert_vertex_group = True
+        decimate.vertex_group_factor = props.protection_strength
+    else:
+        decimate.vertex_group = ""
+    decimate.ratio = get_effective_ratio(obj, props)
+    edge_split = obj.modifiers.get(PREVIEW_EDGE_SPLIT_NAME)
+    if edge_split is not None:
+        edge_split.split_angle = math.radians(props.sharp_angle)
+
+    depsgraph = context.evaluated_depsgraph_get()
+    evaluated = obj.evaluated_get(depsgraph)
+    _preview_face_counts[obj.name_full] = len(evaluated.data.polygons)
+
+def stop_preview(obj):
+    """Удаление стека предпросмотра и группы защиты с объекта"""
+    from .protection_weights import PROTECTION_GROUP_NAME
+
+    for name in (PREVIEW_EDGE_SPLIT_NAME, PREVIEW_DECIMATE_NAME):
+        modifier = obj.modifiers.get(name)
+        if modifier is not None:
+            obj.modifiers.remove(modifier)
+    group = obj.vertex_groups.get(PROTECTION_GROUP_NAME)
+    if group is not None:
+        obj.vertex_groups.remove(group)
+    _preview_face_counts.pop(obj.name_full, None)
+    _weight_signatures.pop(obj.name_full, None)
+    _preview_analyses.pop(obj.data.name_full, None)
+
+def _apply_pending_update():
+    """Отложенное обновление всех объектов с предпросмотром"""
+    context = bpy.context
+    scene = context.scene
+    if scene is None:
+        return None
+    for obj in get_preview_objects(scene):
+        if obj.mode == 'OBJECT':
+            update_preview(context, obj, scene.sharpdecimate_props)
+
+    for window in context.window_manager.windows:
+        for area in window.screen.areas:
+            if area.type == 'VIEW_3D':
+                area.tag_redraw()
+    return None
+
+def schedule_preview_update():
+    """Пересчет предпросмотра после паузы в изменениях (PREVIEW_DEBOUNCE)"""
+    if bpy.app.timers.is_registered(_apply_pending_update):
+        bpy.app.timers.unregister(_apply_pending_update)
+    bpy.app.timers.register(_apply_pending_update, first_interval=PREVIEW_DEBOUNCE)
+
+def on_preview_setting_changed(self, context):
+    """update-колбэк свойств: пересчет предпросмотра после паузы в изменениях"""
+    if not get_preview_objects(context.scene):
+        return
+    schedule_preview_update()
+
+@persistent
+def on_depsgraph_update(scene, depsgraph):
+    """Изменение данных меша с предпросмотром: сброс анализа и весов, отложенный пересчет
+
+    Смена модификаторов меш не трогает, изменения от самого предпросмотра пропускаются.
+    В Edit Mode пересчет ждет возврата в Object Mode (_apply_pending_update).
+    """
+    if not _preview_face_counts:
+        return
+    changed = False
+    for update in depsgraph.updates:
+        data = update.id.original
+        if not isinstance(data, bpy.types.Mesh) or data.name_full in _updating_meshes:
+            continue
+        _preview_analyses.pop(data.name_full, None)
+        for obj in get_preview_objects(scene):
+            if obj.data == data:
+                _weight_signatures.pop(obj.name_full, None)
+                changed = True
+    if changed:
+        schedule_preview_update()
+
+def register():
+    bpy.app.handlers.depsgraph_update_post.append(on_depsgraph_update)
+
+def unregister():
+    if on_depsgraph_update in bpy.app.handlers.depsgraph_update_post:
+        bpy.app.handlers.depsgraph_update_post.remove(on_depsgraph_update)
+    if bpy.app.timers.is_registered(_apply_pending_update):
+        bpy.app.timers.unregister(_apply_pending_update)
+    _preview_face_counts.clear()
+    _weight_signatures.clear()
+    _preview_analyses.clear()
@@ -0,0 +1,198 @@
+# FILE: core/profiling.py
+import io
+import os
+import re
+import sys
+import json
+import time
+import pstats
+import cProfile
+from contextlib import contextmanager
+
+# Уровни журнала: DEBUG - построчный вывод по материалам/частям/этапам
+LOG_LEVELS = ('ERROR', 'WARNING', 'INFO', 'DEBUG')
+DEFAULT_LOG_LEVEL = 'INFO'
+CPROFILE_TOP = 20
+
+# Настройки телеметрии (задаются из настроек аддона или cli)
+_config = {"log_level": DEFAULT_LOG_LEVEL, "cprofile": False, "dump_dir": ""}
+# Таймеры с открытым этапом - в них пишутся вложенные span()
+_active_timers = []
+
+def configure(log_level=None, cprofile=None, dump_dir=None):
+    if log_level is not None:
+        _config["log_level"] = log_level if log_level in LOG_LEVELS else DEFAULT_LOG_LEVEL
+    if cprofile is not None:
+        _config["cprofile"] = bool(cprofile)
+    if dump_dir is not None:
+        _config["dump_dir"] = dump_dir
+
+def is_log_enabled(level):
+    return LOG_LEVELS.index(level) <= LOG_LEVELS.index(_config["log_level"])
+
+def log(message, level='INFO'):
+    """Вывод в консоль с учетом уровня журнала"""
+    if is_log_enabled(level):
+        print(message)
+
+def get_process_peak_mb():
+    """Пиковая память процесса (включая C-аллокации Blender) или None"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux - килобайты, macOS - байты
+    return peak / (1024.0 * 1024.0) if sys.platform == "darwin" else peak / 1024.0
+
+@contextmanager
+def span(name):
+    """Вложенный замер внутри текущего этапа (без открытого этапа ничего не пишет)"""
+    if not _active_timers:
+        yield
+        return
+    with _active_timers[-1].stage(name):
+        yield
+
+class StageTimer:
+    """Замер времени этапов пайплайна децимации
+
+    Этапы могут быть вложенными (span() внутри stage()) - вложенные
+    записываются как "этап/span" и не входят в total. cProfile, если включен,
+    работает только внутри этапов, поэтому модальный оператор профилирует
+    только свою работу, а не интерфейс между тиками.
+    """
+
+    def __init__(self, name, use_cprofile=None):
+        self.name = name
+        self.stages = []
+        self._path = []
+        self.source_faces = 0
+        self.result_faces = 0
+        self.peak_start_mb = get_process_peak_mb()
+        self.peak_end_mb = None
+        if use_cprofile is None:
+            use_cprofile = _config["cprofile"]
+        self.profiler = cProfile.Profile() if use_cprofile else None
+
+    @contextmanager
+    def stage(self, stage_name):
+        """Контекст замера одного этапа"""
+        path = "/".join(self._path + [stage_name])
+        # Место в списке занимается сразу - родитель идет перед вложенными
+        index = len(self.stages)
+        self.stages.append((path, 0.0))
+        top_level = not self._path
+        self._path.append(stage_name)
+        _active_timers.append(self)
+        if top_level:
+            self.enable_profiler()
+
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[index] = (path, time.perf_counter() - start)
+            if top_level:
+                self.disable_profiler()
+            _active_timers.pop()
+            self._path.pop()
+
+    def enable_profiler(self):
+        if self.profiler is None:
+            return
+        try:
+            self.profiler.enable()
+        except ValueError:
+            # Другой профайлер уже активен - этот замер без cProfile
+            self.profiler = None
+
+    def disable_profiler(self):
+        if self.profiler is not None:
+            self.profiler.disable()
+
+    @property
+    def total(self):
+        return sum(duration for stage_name, duration in self.stages if "/" not in stage_name)
+
+    @property
+    def faces_per_second(self):
+        return self.source_faces / max(self.total, 1e-9)
+
+    @property
+    def memory_delta_mb(self):
+        """Рост пиковой памяти процесса за время работы или None"""
+        if self.peak_start_mb is None or self.peak_end_mb is None:
+            return None
+        return self.peak_end_mb - self.peak_start_mb
+
+    def finish(self, source_faces, result_faces):
+        """Итоги после последнего этапа; при заданном каталоге - дамп в JSON"""
+        self.source_faces = source_faces
+        self.result_faces = result_faces
+        self.peak_end_mb = get_process_peak_mb()
+        if _config["dump_dir"]:
+            try:
+                self.dump_json(self.get_dump_path(_config["dump_dir"]))
+            except OSError as e:
+                log(f"⚠️ Profile dump failed: {e}", 'WARNING')
+
+    def get_dump_path(self, directory):
+        safe_name = re.sub(r"[^\w.-]+", "_", self.name).strip("_")
+        return os.path.join(directory, f"sharpdecimate_{safe_name}_{time.strftime('%Y%m%d_%H%M%S')}.json")
+
+    def get_profile_stats(self, limit=CPROFILE_TOP):
+        """Самые дорогие функции по cProfile (по cumulative)"""
+        if self.profiler is None:
+            return []
+        stats = pstats.Stats(self.profiler, stream=io.StringIO()).stats
+        rows = sorted(stats.items(), key=lambda item: -item[1][3])[:limit]
+        return [
+            {
+                "function": f"{os.path.basename(filename)}:{line}({function})",
+                "calls": calls,
+                "total_seconds": total_time,
+                "cumulative_seconds": cumulative_time,
+            }
+            for (filename, line, function), (_, calls, total_time, cumulative_time, _) in rows
+        ]
+
+    def summary_line(self):
+        """Короткая сводка для отчета оператора"""
+        text = f"{self.total:.2f}s"
+        if self.source_faces:
+            text += f", {self.faces_per_second:,.0f} faces/s"
+        if self.memory_delta_mb is not None:
+            text += f", peak +{self.memory_delta_mb:.0f} MB"
+        return text
+
+    def report(self):
+        """Текстовый отчет по этапам"""
+        lines = [f"⏱️ {self.name}: {self.total * 1000.0:.1f} ms ({self.summary_line()})"]
+        for stage_name, duration in self.stages:
+            depth = stage_name.count("/")
+            label = "  " * depth + stage_name.rsplit("/", 1)[-1]
+            lines.append(f"   {label:<24} {duration * 1000.0:9.1f} ms")
+        for row in self.get_profile_stats(limit=10):
+            lines.append(f"   🐍 {row['cumulative_seconds'] * 1000.0:9.1f} ms  {row['function']}")
+        return "\n".join(lines)
+
+    def print_report(self):
+        log(self.report(), 'INFO')
+
+    def to_dict(self):
+        return {
+            "name": self.name,
+            "total_seconds": self.total,
+            "stages": [{"name": stage_name, "seconds": duration} for stage_name, duration in self.stages],
+            "source_faces": self.source_faces,
+            "result_faces": self.result_faces,
+            "faces_per_second": self.faces_per_second,
+            "memory_delta_mb": self.memory_delta_mb,
+            "cprofile": self.get_profile_stats(),
+        }
+
+    def dump_json(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, indent=2)
+        return path
@@ -0,0 +1,368 @@
+# FILE: core/properties.py
+import bpy
+from bpy.types import PropertyGroup
+from bpy.props import FloatProperty, BoolProperty, IntProperty, EnumProperty, PointerProperty, StringProperty
+
+from .preview import on_preview_setting_changed
+
+# Модуль регистрируется при включении аддона, поэтому не импортирует ядро децимации
+# (NumPy, BMesh): оно загружается при первом запуске оператора.
+
+# Допуск переноса Sharp/Crease - доля размера объекта
+DEFAULT_TRANSFER_TOLERANCE = 0.001
+# Число полигонов в выборке проверки целостности (режим SAMPLED)
+DEFAULT_SAMPLE_SIZE = 100000
+# Число точек на поверхности для измерения геометрической ошибки (в каждую сторону)
+DEFAULT_ERROR_SAMPLES = 20000
+
+class SharpDecimateProperties(PropertyGroup):
+    sharp_angle: FloatProperty(
+        name="Sharp Angle",
+        description="Edges with higher angle will be preserved",
+        min=70.0,
+        max=85.0,
+        default=75.0,
+        precision=1,
+        update=on_preview_setting_changed,
+    )
+    
+    keep_sharp: BoolProperty(
+        name="Keep Marked Sharp",
+        description="Preserve manually marked sharp edges",
+        default=True,
+        update=on_preview_setting_changed,
+    )
+    
+    keep_crease: BoolProperty(
+        name="Keep Edge Crease", 
+        description="Preserve edges with crease values",
+        default=True,
+        update=on_preview_setting_changed,
+    )
+    
+    edge_transfer_tolerance: FloatProperty(
+        name="Transfer Tolerance",
+        description="Max distance (percent of object size) between a decimated edge and a marked source edge",
+        min=0.001,
+        max=5.0,
+        default=DEFAULT_TRANSFER_TOLERANCE * 100.0,
+        precision=3,
+        subtype='PERCENTAGE'
+    )
+    
+    ratio: FloatProperty(
+        name="Ratio",
+        description="Target polygon ratio (0.1 = 10% of original)",
+        min=0.01,
+        max=0.99,
+        default=0.3,
+        precision=2,
+        subtype='FACTOR',
+        update=on_preview_setting_changed,
+    )
+    
+    # Material-based decimation properties
+    use_material_decimation: BoolProperty(
+        name="Enable Material Decimation",
+        description="Use different decimation ratios based on materials",
+        default=False,
+        update=on_preview_setting_changed,
+    )
+    
+    material_high_ratio: FloatProperty(
+        name="High Detail Ratio",
+        description="Decimation ratio for important materials (first 2-3 slots)",
+        min=0.01,
+        max=0.99,
+        default=0.8,
+        precision=2,
+        subtype='FACTOR',
+        update=on_preview_setting_changed,
+    )
+    
+    material_low_ratio: FloatProperty(
+        name="Low Detail Ratio",
+        description="Decimation ratio for less important materials",
+        min=0.01,
+        max=0.99,
+        default=0.2,
+        precision=2,
+        subtype='FACTOR',
+        update=on_preview_setting_changed,
+    )
+    
+    # Parallel processing properties
+    use_parallel: BoolProperty(
+        name="Parallel Processing",
+        description="Decimate independent parts in background Blender processes on all cores",
+        default=False,
+    )
+    
+    parallel_workers: IntProperty(
+        name="Workers",
+        description="Number of background Blender processes (0 = number of CPU cores)",
+        min=0,
+        max=64,
+        default=0,
+    )
+    
+    parallel_granularity: EnumProperty(
+        name="Partition",
+        description="How the mesh is split into independent parts",
+        items=[
+            ('MATERIAL', "Materials", "One part per material slot"),
+            ('ISLAND', "Islands", "Disconnected mesh islands grouped into balanced parts"),
+        ],
+        default='MATERIAL',
+    )
+    
+    parallel_merge_order: EnumProperty(
+        name="Merge Order",
+        description="Order in which decimated parts are merged back",
+        items=[
+            ('INDEX', "Part Index", "Merge parts in material/part index order"),
+            ('SIZE', "Largest First", "Merge parts from largest to smallest"),
+        ],
+        default='INDEX',
+    )
+    
+    # Chunked processing properties
+    use_chunking: BoolProperty(
+        name="Chunked Processing",
+        description="Decimate huge meshes in spatial chunks one at a time to bound peak memory "
+                    "(chunk seams are locked, chunks use the native QEM engine)",
+        default=False,
+    )
+    
+    chunk_memory_budget: IntProperty(
+        name="Memory Budget",
+        description="Approximate peak memory of chunked processing in MB, sets the chunk size",
+        min=256,
+        max=262144,
+        default=4096,
+    )
+    
+    # Island policy properties
+    use_island_policies: BoolProperty(
+        name="Island Policies",
+        description="Handle disconnected parts separately: small islands follow their own policy, "
+                    "the triangle budget goes to large islands by surface area",
+        default=False,
+    )
+    
+    island_size_threshold: FloatProperty(
+        name="Small Island Size",
+        description="Islands with a bounding box diagonal below this percentage of the object size are small",
+        min=0.0,
+        max=100.0,
+        default=2.0,
+        precision=2,
+        subtype='PERCENTAGE',
+    )
+    
+    island_small_policy: EnumProperty(
+        name="Small Islands",
+        description="What happens to small islands (bolts, rivets)",
+        items=[
+            ('KEEP', "Keep", "Keep small islands unchanged"),
+            ('PROXY', "Proxy Box", "Replace each small island with its bounding box"),
+            ('REMOVE', "Remove", "Delete small islands"),
+            ('DECIMATE', "Decimate", "Decimate with a ratio scaled down by island size"),
+        ],
+        default='KEEP',
+    )
+    
+    # Integrity check properties
+    integrity_mode: EnumProperty(
+        name="Integrity Check",
+        description="How thoroughly meshes are checked before and after decimation",
+        items=[
+            ('FULL', "Full", "Check every face, edge and vertex"),
+            ('SAMPLED', "Sampled", "Check a random sample of faces on heavy meshes"),
+            ('SKIP', "Skip", "Do not check mesh integrity"),
+        ],
+        default='FULL',
+    )
+    
+    integrity_sample_size: IntProperty(
+        name="Sample Size",
+        description="Number of faces checked in Sampled mode",
+        min=1000,
+        default=DEFAULT_SAMPLE_SIZE,
+    )
+    
+    # Decimation engine properties
+    decimate_engine: EnumProperty(
+        name="Engine",
+        description="Algorithm used to collapse edges",
+        items=[
+            ('MODIFIER', "Blender Modifier", "Blender's Decimate modifier, sharp edges are re-marked afterwards"),
+            ('QEM', "Native QEM", "Quadric error collapse that keeps protected edges during simplification"),
+        ],
+        default='MODIFIER',
+    )
+    
+    qem_protection: EnumProperty(
+        name="Protected Edges",
+        description="How sharp, marked sharp and creased edges are handled by the native engine",
+        items=[
+            ('LOCK', "Lock", "Protected edges are never collapsed or moved"),
+            ('WEIGHT', "Weight", "Protected edges may collapse along themselves but resist moving off"),
+        ],
+        default='LOCK',
+    )
+    
+    qem_protected_weight: FloatProperty(
+        name="Protection Weight",
+        description="Weight of protected edge constraints in Weight mode",
+        min=1.0,
+        max=100000.0,
+        default=1000.0,
+    )
+    
+    # Protection weights properties
+    use_protection_weights: BoolProperty(
+        name="Protection Weights",
+        description="Feed protected edges to the Decimate modifier as vertex weights so it avoids collapsing them",
+        default=False,
+        update=on_preview_setting_changed,
+    )
+    
+    protection_strength: FloatProperty(
+        name="Protection Strength",
+        description="Extra collapse cost near protected edges (modifier vertex group factor)",
+        min=0.0,
+        max=1000.0,
+        soft_max=200.0,
+        default=20.0,
+        update=on_preview_setting_changed,
+    )
+    
+    protection_falloff: FloatProperty(
+        name="Protection Falloff",
+        description="Distance from protected edges over which the weight fades out, % of object size (0 = edge vertices only)",
+        min=0.0,
+        max=25.0,
+        default=1.0,
+        precision=2,
+        subtype='PERCENTAGE',
+        update=on_preview_setting_changed,
+    )
+    
+    protect_high_detail: BoolProperty(
+        name="Protect HighDetail",
+        description="Also protect faces with a HighDetail material when materials are not decimated separately",
+        default=True,
+        update=on_preview_setting_changed,
+    )
+    
+    # Importance map properties
+    use_importance: BoolProperty(
+        name="Importance Map",
+        description="Decimate flat regions harder and keep curved regions and silhouettes, "
+                    "using a map computed from the mesh (no HighDetail/LowDetail materials needed)",
+        default=False,
+        update=on_preview_setting_changed,
+    )
+    
+    importance_strength: FloatProperty(
+        name="Importance Strength",
+        description="How much more detail important regions keep compared to flat ones",
+        min=0.0,
+        max=1.0,
+        default=0.5,
+        subtype='FACTOR',
+        update=on_preview_setting_changed,
+    )
+    
+    # Target budget properties
+    use_target_budget: BoolProperty(
+        name="Target Triangle Budget",
+        description="Search the ratio so the result fits the triangle budget instead of using a fixed ratio",
+        default=False,
+    )
+    
+    target_triangles: IntProperty(
+        name="Target Triangles",
+        description="Maximum number of triangles in the result",
+        min=4,
+        default=15000,
+    )
+    
+    target_tolerance: FloatProperty(
+        name="Tolerance",
+        description="Stop searching once the result is within this percentage below the budget",
+        min=0.1,
+        max=25.0,
+        default=1.0,
+        precision=1,
+        subtype='PERCENTAGE'
+    )
+    
+    target_max_evaluations: IntProperty(
+        name="Max Evaluations",
+        description="Maximum number of decimation evaluations while searching the ratio",
+        min=2,
+        max=32,
+        default=8,
+    )
+    
+    # Geometric error properties
+    use_error_check: BoolProperty(
+        name="Measure Error",
+        description="Measure the Hausdorff distance between source and result and store "
+                    "per-vertex deviation in the SharpDecimate_Error attribute",
+        default=True,
+    )
+    
+    error_sample_count: IntProperty(
+        name="Error Samples",
+        description="Number of surface points sampled on each mesh to measure the error",
+        min=1000,
+        max=1000000,
+        default=DEFAULT_ERROR_SAMPLES,
+    )
+    
+    use_target_error: BoolProperty(
+        name="Target Max Error",
+        description="Search the lowest ratio whose maximum deviation stays below Max Error (Standard mode)",
+        default=False,
+    )
+    
+    target_max_error: FloatProperty(
+        name="Max Error",
+        description="Allowed maximum deviation from the source, % of object size",
+        min=0.001,
+        max=10.0,
+        default=0.5,
+        precision=3,
+        subtype='PERCENTAGE',
+    )
+    
+    # LOD chain properties
+    lod_levels: StringProperty(
+        name="LOD Levels",
+        description="Comma-separated LOD1..LODn: fractions of the source (0.5, 0.25) or face counts (20000, 5000)",
+        default="0.5, 0.25, 0.125, 0.0625",
+    )
+    
+    lod_cascade: BoolProperty(
+        name="Cascade Levels",
+        description="Build each LOD from the previous level instead of the full-res source",
+        default=True,
+    )
+
+def register():
+    try:
+        bpy.utils.register_class(SharpDecimateProperties)
+        bpy.types.Scene.sharpdecimate_props = PointerProperty(type=SharpDecimateProperties)
+    except Exception as e:
+        print(f"SharpDecimate: Failed to register properties: {e}")
+
+def unregister():
+    try:
+        if hasattr(bpy.types.Scene, 'sharpdecimate_props'):
+            del bpy.types.Scene.sharpdecimate_props
+        bpy.utils.unregister_class(SharpDecimateProperties)
+    except Exception as e:
+        print(f"SharpDecimate: Failed to unregister properties: {e}")
\ No newline at end of file
@@ -0,0 +1,161 @@
+# FILE: core/protection_weights.py
+import bmesh
+
+from .mesh_arrays import HAS_NUMPY, np, get_vertex_coords, get_edge_vertices, get_loop_vertices, get_loop_polygons, \
+    get_polygon_material_indices
+from .edge_analyzer import analyze_protected_edges, get_protected_edge_mask
+from .spatial_index import SegmentGrid
+from .importance import get_importance
+
+# Веса защиты для модификатора Decimate (COLLAPSE).
+# Модификатор добавляет стоимость схлопывания ребрам с малым весом группы,
+# поэтому группа подключается с invert_vertex_group: вес 1 - защищенная вершина.
+
+PROTECTION_GROUP_NAME = "SharpDecimate_Protect"
+# Уровни квантования: группа заполняется одним VertexGroup.add на уровень
+WEIGHT_LEVELS = 32
+
+def get_high_detail_slots(mesh):
+    """Слоты материалов HighDetail (то же правило, что у get_material_ratio)"""
+    return tuple(
+        index for index, material in enumerate(mesh.materials)
+        if material is not None and "HighDetail" in material.name
+    )
+
+def get_slot_vertex_mask(mesh, slots):
+    """Маска вершин, принадлежащих полигонам из слотов slots"""
+    mask = np.zeros(len(mesh.vertices), dtype=bool)
+    if slots:
+        face_mask = np.isin(get_polygon_material_indices(mesh), slots)
+        mask[get_loop_vertices(mesh)[face_mask[get_loop_polygons(mesh)]]] = True
+    return mask
+
+def compute_protection_weights(mesh, edge_mask, high_detail_slots=(), falloff=0.0):
+    """Вес защиты каждой вершины (float32)
+
+    1 - вершины защищенных ребер и полигонов HighDetail, дальше линейный спад
+    до 0 на расстоянии falloff (доля диагонали габаритов) от защищенных ребер.
+    """
+    coords = get_vertex_coords(mesh).astype(np.float64)
+    protected = get_edge_vertices(mesh)[edge_mask]
+
+    weights = np.zeros(len(coords), dtype=np.float32)
+    weights[protected.ravel()] = 1.0
+    weights[get_slot_vertex_mask(mesh, high_detail_slots)] = 1.0
+
+    diagonal = float(np.linalg.norm(coords.max(axis=0) - coords.min(axis=0))) if len(coords) else 0.0
+    distance = falloff * diagonal
+    if distance <= 0.0 or not len(protected):
+        return weights
+
+    starts, ends = coords[protected[:, 0]], coords[protected[:, 1]]
+    lengths = np.linalg.norm(ends - starts, axis=1)
+    grid = SegmentGrid(starts, ends, max(distance, float(np.median(lengths))))
+
+    candidates = np.flatnonzero(weights < 1.0)
+    _, distances = grid.nearest(coords[candidates], distance)
+    # За пределами радиуса расстояние inf -> вес 0
+    weights[candidates] = np.clip(1.0 - distances / distance, 0.0, 1.0)
+    return weights
+
+def _compute_weights_bmesh(mesh, angle_threshold, high_detail_slots):
+    """Запасной путь без NumPy: вес 1 на вершинах защищенных ребер, без спада"""
+    bm = bmesh.new()
+    try:
+        bm.from_mesh(mesh)
+        weights = [0.0] * len(bm.verts)
+        for edge in analyze_protected_edges(bm, None, angle_threshold):
+            for vert in edge.verts:
+                weights[vert.index] = 1.0
+        for face in bm.faces:
+            if face.material_index in high_detail_slots:
+                for vert in face.verts:
+                    weights[vert.index] = 1.0
+        return weights
+    finally:
+        bm.free()
+
+class ProtectionWeights:
+    """Веса защиты вершин меша и сила их влияния на модификатор Decimate"""
+
+    def __init__(self, weights, strength, group_name=PROTECTION_GROUP_NAME):
+        self.weights = weights
+        self.strength = strength
+        self.group_name = group_name
+
+    def subset(self, vertex_ids):
+        """Веса для части меша: vertex_ids - индексы ее вершин в исходнике"""
+        return ProtectionWeights(np.asarray(self.weights)[vertex_ids], self.strength, self.group_name)
+
+    @property
+    def protected_count(self):
+        if HAS_NUMPY:
+            return int((np.asarray(self.weights) >= 1.0).sum())
+        return sum(1 for weight in self.weights if weight >= 1.0)
+
+    def get_levels(self):
+        """Пары (вес, индексы вершин) для квантованных уровней веса"""
+        if not HAS_NUMPY:
+            levels = {}
+            for index, weight in enumerate(self.weights):
+                if weight > 0.0:
+                    levels.setdefault(weight, []).append(index)
+            return sorted(levels.items())
+
+        levels = np.round(np.asarray(self.weights) * WEIGHT_LEVELS).astype(np.int64)
+        weighted = np.flatnonzero(levels > 0)
+        order = np.argsort(levels[weighted], kind='stable')
+        weighted = weighted[order]
+        values, starts = np.unique(levels[weighted], return_index=True)
+        return [
+            (float(value) / WEIGHT_LEVELS, indices.tolist())
+            for value, indices in zip(values, np.split(weighted, starts[1:]))
+        ]
+
+    def write_group(self, obj, replace=True):
+        """Группа вершин с весами на объекте
+
+        replace=True заменяет группу с тем же именем, иначе новая группа
+        добавляется в конец списка (уникальное имя дает Blender).
+        """
+        group = obj.vertex_groups.get(self.group_name) if replace else None
+        if group is not None:
+            obj.vertex_groups.remove(group)
+        group = obj.vertex_groups.new(name=self.group_name)
+        for weight, indices in self.get_levels():
+            group.add(indices, weight, 'REPLACE')
+        return group
+
+    def setup_modifier(self, modifier, group_name=None):
+        modifier.vertex_group = group_name or self.group_name
+        modifier.invert_vertex_group = True
+        modifier.vertex_group_factor = self.strength
+
+def build_protection_weights(mesh, props, analysis=None, high_detail=True):
+    """Веса защиты по настройкам или None, если защита весами и карта важности выключены
+
+    analysis - MeshAnalysis исходника: веса кэшируются вместе с его анализом.
+    high_detail=False - для частей одного материала, где HighDetail теряет смысл.
+    Карта важности (только с NumPy) поднимает веса кривых областей и контуров
+    до importance * importance_strength.
+    """
+    use_importance = props.use_importance and HAS_NUMPY
+    if not (props.use_protection_weights or use_importance):
+        return None
+    if not props.use_protection_weights:
+        weights = get_importance(mesh, analysis) * props.importance_strength
+        return ProtectionWeights(weights, props.protection_strength)
+
+    slots = get_high_detail_slots(mesh) if high_detail and props.protect_high_detail else ()
+    falloff = props.protection_falloff / 100.0
+    if not HAS_NUMPY:
+        weights = _compute_weights_bmesh(mesh, props.sharp_angle, slots)
+    elif analysis is not None:
+        weights = analysis.protection_weights(mesh, props.sharp_angle, props.keep_sharp, props.keep_crease,
+                                              slots, falloff)
+    else:
+        edge_mask = get_protected_edge_mask(mesh, props.sharp_angle, props.keep_sharp, props.keep_crease)
+        weights = compute_protection_weights(mesh, edge_mask, slots, falloff)
+    if use_importance:
+        weights = np.maximum(weights, get_importance(mesh, analysis) * props.importance_strength)
+    return ProtectionWeights(weights, props.protection_strength)
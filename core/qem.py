@@ -0,0 +1,437 @@
+# FILE: core/qem.py
+import heapq
+
+import bpy
+
+from .mesh_arrays import np, MeshBuffers, get_edge_keys, match_edge_keys
+from .data_ops import copy_materials
+from .edge_analyzer import get_protected_edge_mask
+from .importance import get_importance
+from .profiling import log
+
+BOUNDARY_WEIGHT = 100.0
+PROTECTED_WEIGHT = 1000.0
+UV_SEAM_EPSILON = 1e-5
+DET_EPSILON = 1e-10
+# Минимальный косинус между нормалью треугольника до и после схлопывания
+FLIP_LIMIT = 0.1
+# Квадрики вершины с важностью 1 при силе 1 весят в 1 + IMPORTANCE_GAIN раз больше
+IMPORTANCE_GAIN = 10.0
+
+KEY_MASK = (1 << 32) - 1
+
+def triangulate_buffers(buffers):
+    """Веерная триангуляция полигонов
+
+    Возвращает (tris (T, 3) - вершины, corner_loops (T, 3) - лупы углов, face_ids (T,) - исходный полигон).
+    """
+    totals = buffers.loop_totals.astype(np.int64)
+    starts = buffers.loop_starts.astype(np.int64)
+    tri_counts = np.maximum(totals - 2, 0)
+
+    face_ids = np.repeat(np.arange(len(totals)), tri_counts)
+    offsets = np.arange(int(tri_counts.sum())) - np.repeat(np.cumsum(tri_counts) - tri_counts, tri_counts)
+    first = starts[face_ids]
+    corner_loops = np.stack([first, first + offsets + 1, first + offsets + 2], axis=1)
+    return buffers.loop_verts[corner_loops].astype(np.int64), corner_loops, face_ids
+
+def plane_quadrics(normals, offsets, weights):
+    """Квадрики плоскостей n·x + d = 0: (N, 10) - верхний треугольник матрицы 4x4"""
+    a, b, c = normals[:, 0], normals[:, 1], normals[:, 2]
+    d = offsets
+    return weights[:, None] * np.stack([a * a, a * b, a * c, a * d, b * b, b * c, b * d, c * c, c * d, d * d], axis=1)
+
+def quadric_error(q, x, y, z):
+    a2, ab, ac, ad, b2, bc, bd, c2, cd, d2 = q
+    return (a2 * x * x + 2 * ab * x * y + 2 * ac * x * z + 2 * ad * x
+            + b2 * y * y + 2 * bc * y * z + 2 * bd * y
+            + c2 * z * z + 2 * cd * z + d2)
+
+def optimal_position(q):
+    """Точка минимума квадрики или None, если система вырождена"""
+    a2, ab, ac, ad, b2, bc, bd, c2, cd, _ = q
+    m00, m01, m02 = b2 * c2 - bc * bc, ac * bc - ab * c2, ab * bc - ac * b2
+    det = a2 * m00 + ab * m01 + ac * m02
+    scale = a2 + b2 + c2
+    if abs(det) <= DET_EPSILON * scale * scale * scale:
+        return None
+
+    m11, m12, m22 = a2 * c2 - ac * ac, ab * ac - a2 * bc, a2 * b2 - ab * ab
+    return (
+        -(m00 * ad + m01 * bd + m02 * cd) / det,
+        -(m01 * ad + m11 * bd + m12 * cd) / det,
+        -(m02 * ad + m12 * bd + m22 * cd) / det,
+    )
+
+def _evaluate_quadrics(q, points):
+    """Векторная версия quadric_error: q (N, 10), points (N, 3)"""
+    x, y, z = points[:, 0], points[:, 1], points[:, 2]
+    return quadric_error(q.T, x, y, z)
+
+def _triangle_normal(p0, p1, p2):
+    ux, uy, uz = p1[0] - p0[0], p1[1] - p0[1], p1[2] - p0[2]
+    vx, vy, vz = p2[0] - p0[0], p2[1] - p0[1], p2[2] - p0[2]
+    return uy * vz - uz * vy, uz * vx - ux * vz, ux * vy - uy * vx
+
+class QEMDecimator:
+    """Упрощение схлопыванием ребер по квадрикам ошибки (Garland-Heckbert)
+
+    Квадрики, ограничения и начальные стоимости считаются на массивах NumPy,
+    дальше ребра схлопываются из очереди с приоритетом (heapq).
+    Вершины защищенных ребер, границ материалов и UV-швов блокируются: они не
+    двигаются и не удаляются, поэтому такие ребра сохраняются во время
+    упрощения. В режиме без блокировки защищенные ребра получают плоскости-
+    ограничения с большим весом. locked_vertices - маска вершин, блокируемых
+    дополнительно (например, швы между чанками). vertex_scale - множитель
+    квадрик вершин: схлопывания в важных областях обходятся дороже.
+    """
+
+    def __init__(self, buffers, protected_edges=None, lock_protected=True,
+                 protected_weight=PROTECTED_WEIGHT, boundary_weight=BOUNDARY_WEIGHT, locked_vertices=None,
+                 vertex_scale=None):
+        self.buffers = buffers
+        tris, corner_loops, face_ids = triangulate_buffers(buffers)
+        coords = buffers.coords.astype(np.float64)
+        vertex_count = len(coords)
+        self.face_ids = face_ids
+
+        # Плоскости треугольников, вес - площадь
+        p0, p1, p2 = coords[tris[:, 0]], coords[tris[:, 1]], coords[tris[:, 2]]
+        cross = np.cross(p1 - p0, p2 - p0)
+        double_area = np.linalg.norm(cross, axis=1)
+        normals = cross / np.maximum(double_area, 1e-20)[:, None]
+        face_quadrics = plane_quadrics(normals, -np.einsum('ij,ij->i', normals, p0), double_area * 0.5)
+
+        # Полуребра: (начало, конец, треугольник)
+        half_start = tris.ravel()
+        half_end = tris[:, [1, 2, 0]].ravel()
+        half_face = np.repeat(np.arange(len(tris)), 3)
+        half_keys = get_edge_keys(np.stack([half_start, half_end], axis=1))
+
+        order = np.argsort(half_keys, kind='stable')
+        edge_keys, first, edge_counts = np.unique(half_keys[order], return_index=True, return_counts=True)
+        half_counts = np.empty(len(half_keys), dtype=np.int64)
+        half_counts[order] = np.repeat(edge_counts, edge_counts)
+
+        # Ребра, вершины которых блокируются
+        locked_keys = [edge_keys[edge_counts > 2]]
+        manifold = edge_counts == 2
+        h1, h2 = order[first[manifold]], order[first[manifold] + 1]
+        seam = buffers.material_indices[face_ids[half_face[h1]]] != buffers.material_indices[face_ids[half_face[h2]]]
+        for uv in buffers.uv_arrays.values():
+            corner_uv = uv[corner_loops]
+            start_uv = corner_uv.reshape(-1, 2)
+            end_uv = corner_uv[:, [1, 2, 0]].reshape(-1, 2)
+            min_uv = np.where((half_start < half_end)[:, None], start_uv, end_uv)
+            max_uv = np.where((half_start < half_end)[:, None], end_uv, start_uv)
+            seam |= np.any(np.abs(min_uv[h1] - min_uv[h2]) > UV_SEAM_EPSILON, axis=1)
+            seam |= np.any(np.abs(max_uv[h1] - max_uv[h2]) > UV_SEAM_EPSILON, axis=1)
+        locked_keys.append(edge_keys[manifold][seam])
+
+        protected_half = np.zeros(len(half_keys), dtype=bool)
+        if protected_edges is not None and np.any(protected_edges):
+            protected_keys = get_edge_keys(buffers.edge_verts[protected_edges])
+            if lock_protected:
+                locked_keys.append(protected_keys)
+            else:
+                protected_half = np.isin(half_keys, protected_keys)
+
+        locked_keys = np.concatenate(locked_keys)
+        locked = np.zeros(vertex_count, dtype=bool)
+        locked[locked_keys >> 32] = True
+        locked[locked_keys & KEY_MASK] = True
+        if locked_vertices is not None:
+            locked |= np.asarray(locked_vertices, dtype=bool)
+
+        # Плоскости-ограничения вдоль границ и (без блокировки) защищенных ребер
+        boundary_half = half_counts == 1
+        constrained = boundary_half | protected_half
+        edge_vector = coords[half_end[constrained]] - coords[half_start[constrained]]
+        plane_normals = np.cross(edge_vector, normals[half_face[constrained]])
+        plane_normals /= np.maximum(np.linalg.norm(plane_normals, axis=1), 1e-20)[:, None]
+        weights = np.where(boundary_half[constrained], boundary_weight, protected_weight)
+        weights = weights * np.einsum('ij,ij->i', edge_vector, edge_vector)
+        constraint_quadrics = plane_quadrics(
+            plane_normals, -np.einsum('ij,ij->i', plane_normals, coords[half_start[constrained]]), weights
+        )
+
+        quadrics = np.zeros((vertex_count, 10), dtype=np.float64)
+        for k in range(10):
+            quadrics[:, k] = np.bincount(tris.ravel(), np.repeat(face_quadrics[:, k], 3), minlength=vertex_count)
+            for ends in (half_start[constrained], half_end[constrained]):
+                quadrics[:, k] += np.bincount(ends, constraint_quadrics[:, k], minlength=vertex_count)
+
+        if vertex_scale is not None:
+            quadrics *= np.asarray(vertex_scale, dtype=np.float64)[:, None]
+
+        boundary = np.zeros(vertex_count, dtype=bool)
+        boundary[half_start[boundary_half]] = True
+        boundary[half_end[boundary_half]] = True
+
+        # Рабочее состояние - списки Python для быстрого доступа в цикле
+        self.coords = coords.tolist()
+        self.quadrics = quadrics.tolist()
+        self.locked = locked.tolist()
+        self.boundary = boundary.tolist()
+        self.faces = tris.tolist()
+        self.face_alive = [True] * len(tris)
+        self.face_count = len(tris)
+        self.corner_uvs = {name: uv[corner_loops].tolist() for name, uv in buffers.uv_arrays.items()}
+        self.stamps = [0] * vertex_count
+        self.vertex_faces = [set() for _ in range(vertex_count)]
+        for face_index, face in enumerate(self.faces):
+            for vertex in face:
+                self.vertex_faces[vertex].add(face_index)
+
+        self.collapses = 0
+        self.rejected = 0
+        self.heap = self._initial_heap(coords, quadrics, locked, edge_keys)
+
+    def _initial_heap(self, coords, quadrics, locked, edge_keys):
+        """Стоимости всех ребер одним векторным проходом"""
+        a = (edge_keys >> 32).astype(np.int64)
+        b = (edge_keys & KEY_MASK).astype(np.int64)
+        free = ~(locked[a] & locked[b])
+        a, b = a[free], b[free]
+
+        q = quadrics[a] + quadrics[b]
+        pa, pb = coords[a], coords[b]
+        candidates = [pa, pb, (pa + pb) * 0.5]
+        errors = np.stack([_evaluate_quadrics(q, p) for p in candidates], axis=1)
+        best = np.argmin(errors, axis=1)
+        position = np.choose(best[:, None], candidates)
+        cost = errors[np.arange(len(best)), best]
+
+        # Оптимальная точка там, где система невырождена и точка рядом с ребром
+        matrix = np.stack([
+            np.stack([q[:, 0], q[:, 1], q[:, 2]], axis=1),
+            np.stack([q[:, 1], q[:, 4], q[:, 5]], axis=1),
+            np.stack([q[:, 2], q[:, 5], q[:, 7]], axis=1),
+        ], axis=1)
+        scale = q[:, 0] + q[:, 4] + q[:, 7]
+        solvable = np.abs(np.linalg.det(matrix)) > DET_EPSILON * scale ** 3
+        if np.any(solvable):
+            solved = np.linalg.solve(matrix[solvable], -q[solvable][:, [3, 6, 8], None])[:, :, 0]
+            middle = (pa[solvable] + pb[solvable]) * 0.5
+            length = np.linalg.norm(pb[solvable] - pa[solvable], axis=1)
+            near = np.linalg.norm(solved - middle, axis=1) <= length * 2.0
+            index = np.flatnonzero(solvable)[near]
+            position[index] = solved[near]
+            cost[index] = _evaluate_quadrics(q[index], solved[near])
+
+        # Заблокированная вершина остается на месте
+        lock_a, lock_b = locked[a], locked[b]
+        position[lock_a] = pa[lock_a]
+        position[lock_b] = pb[lock_b]
+        fixed = lock_a | lock_b
+        cost[fixed] = _evaluate_quadrics(q[fixed], position[fixed])
+
+        # Удаляется свободная вершина (при равных условиях - не граничная)
+        boundary = np.array(self.boundary, dtype=bool)
+        keep_a = lock_a | (boundary[a] & ~boundary[b] & ~lock_b)
+        removed = np.where(keep_a, b, a)
+        kept = np.where(keep_a, a, b)
+
+        heap = [
+            (c, r, k, 0, 0, tuple(p))
+            for c, r, k, p in zip(cost.tolist(), removed.tolist(), kept.tolist(), position.tolist())
+        ]
+        heapq.heapify(heap)
+        return heap
+
+    def plan_collapse(self, a, b):
+        """(cost, removed, kept, position) или None, если ребро заблокировано"""
+        lock_a, lock_b = self.locked[a], self.locked[b]
+        if lock_a and lock_b:
+            return None
+
+        q = [x + y for x, y in zip(self.quadrics[a], self.quadrics[b])]
+        pa, pb = self.coords[a], self.coords[b]
+        if lock_a or lock_b:
+            kept, removed = (a, b) if lock_a else (b, a)
+            position = tuple(self.coords[kept])
+            return quadric_error(q, *position), removed, kept, position
+
+        if self.boundary[a] and not self.boundary[b]:
+            kept, removed = a, b
+        else:
+            kept, removed = b, a
+
+        candidates = [tuple(pa), tuple(pb), ((pa[0] + pb[0]) * 0.5, (pa[1] + pb[1]) * 0.5, (pa[2] + pb[2]) * 0.5)]
+        solved = optimal_position(q)
+        if solved is not None:
+            middle = candidates[2]
+            length_sq = sum((x - y) ** 2 for x, y in zip(pa, pb))
+            if sum((x - y) ** 2 for x, y in zip(solved, middle)) <= 4.0 * length_sq:
+                return quadric_error(q, *solved), removed, kept, solved
+
+        position = min(candidates, key=lambda p: quadric_error(q, *p))
+        return quadric_error(q, *position), removed, kept, position
+
+    def neighbors(self, vertex):
+        faces = self.faces
+        return {other for face in self.vertex_faces[vertex] for other in faces[face]} - {vertex}
+
+    def can_collapse(self, removed, kept, position):
+        """Проверка связности (link condition) и отсутствия перевернутых треугольников"""
+        shared = self.vertex_faces[removed] & self.vertex_faces[kept]
+        if not shared:
+            return False
+        if len(shared) > 1 and self.boundary[removed] and self.boundary[kept]:
+            return False
+        if len(self.neighbors(removed) & self.neighbors(kept)) != len(shared):
+            return False
+
+        coords = self.coords
+        for vertex in (removed, kept):
+            for face_index in self.vertex_faces[vertex] - shared:
+                corners = [coords[v] for v in self.faces[face_index]]
+                before = _triangle_normal(*corners)
+                corners[self.faces[face_index].index(vertex)] = position
+                after = _triangle_normal(*corners)
+
+                length_before = sum(x * x for x in before) ** 0.5
+                length_after = sum(x * x for x in after) ** 0.5
+                if length_after <= 1e-12 * max(length_before, 1e-30):
+                    return False
+                dot = sum(x * y for x, y in zip(before, after))
+                if dot < FLIP_LIMIT * length_before * length_after:
+                    return False
+        return True
+
+    def collapse(self, removed, kept, position):
+        shared = self.vertex_faces[removed] & self.vertex_faces[kept]
+
+        # UV новой вершины: заблокированная остается на месте, свободная интерполируется по ребру
+        pr, pk = self.coords[removed], self.coords[kept]
+        edge = [y - x for x, y in zip(pr, pk)]
+        length_sq = sum(x * x for x in edge)
+        t = 1.0
+        if not self.locked[kept] and length_sq > 0.0:
+            t = min(max(sum((p - x) * e for p, x, e in zip(position, pr, edge)) / length_sq, 0.0), 1.0)
+
+        reference = next(iter(shared))
+        reference_face = self.faces[reference]
+        for corner_uvs in self.corner_uvs.values():
+            face_uvs = corner_uvs[reference]
+            uv_removed = face_uvs[reference_face.index(removed)]
+            uv_kept = face_uvs[reference_face.index(kept)]
+            new_uv = [r + (k - r) * t for r, k in zip(uv_removed, uv_kept)]
+            for vertex, faces in ((removed, self.vertex_faces[removed]), (kept, self.vertex_faces[kept])):
+                if vertex == kept and self.locked[kept]:
+                    continue
+                for face_index in faces:
+                    corner_uvs[face_index][self.faces[face_index].index(vertex)] = new_uv
+
+        for face_index in shared:
+            self.face_alive[face_index] = False
+            self.face_count -= 1
+            for vertex in self.faces[face_index]:
+                self.vertex_faces[vertex].discard(face_index)
+
+        for face_index in self.vertex_faces[removed]:
+            face = self.faces[face_index]
+            face[face.index(removed)] = kept
+            self.vertex_faces[kept].add(face_index)
+        self.vertex_faces[removed] = set()
+
+        self.coords[kept] = list(position)
+        self.quadrics[kept] = [x + y for x, y in zip(self.quadrics[removed], self.quadrics[kept])]
+        self.boundary[kept] = self.boundary[kept] or self.boundary[removed]
+        self.stamps[kept] += 1
+        self.stamps[removed] = -1
+        self.collapses += 1
+
+        for other in self.neighbors(kept):
+            plan = self.plan_collapse(kept, other)
+            if plan is not None:
+                cost, r, k, p = plan
+                heapq.heappush(self.heap, (cost, r, k, self.stamps[r], self.stamps[k], p))
+
+    def run(self, target_faces):
+        """Схлопывание ребер, пока треугольников больше target_faces"""
+        heap = self.heap
+        stamps = self.stamps
+        while heap and self.face_count > target_faces:
+            _, removed, kept, stamp_removed, stamp_kept, position = heapq.heappop(heap)
+            if stamps[removed] != stamp_removed or stamps[kept] != stamp_kept:
+                continue
+            if not self.can_collapse(removed, kept, position):
+                self.rejected += 1
+                continue
+            self.collapse(removed, kept, position)
+        return self.face_count
+
+    def to_buffers(self):
+        """Результат в MeshBuffers: только живые треугольники и их вершины"""
+        buffers = self.buffers
+        alive = np.flatnonzero(np.array(self.face_alive, dtype=bool))
+        tris = np.array(self.faces, dtype=np.int64).reshape(-1, 3)[alive]
+        face_ids = self.face_ids[alive]
+
+        used_verts, loop_verts = np.unique(tris, return_inverse=True)
+        loop_verts = loop_verts.reshape(-1, 3)
+        coords = np.array(self.coords, dtype=np.float64)[used_verts]
+
+        # Ребра результата в исходной нумерации вершин - для переноса Sharp/Crease
+        edge_verts = np.unique(np.sort(np.concatenate([
+            loop_verts[:, [0, 1]], loop_verts[:, [1, 2]], loop_verts[:, [2, 0]]
+        ]), axis=1), axis=0)
+        found, source_index = match_edge_keys(
+            get_edge_keys(buffers.edge_verts), get_edge_keys(used_verts[edge_verts])
+        )
+        sharp = np.zeros(len(edge_verts), dtype=bool)
+        sharp[found] = buffers.sharp[source_index[found]]
+        creases = np.zeros(len(edge_verts), dtype=np.float32)
+        creases[found] = buffers.creases[source_index[found]]
+
+        result = MeshBuffers(
+            coords.astype(np.float32), edge_verts.astype(np.int32),
+            loop_verts.ravel().astype(np.int32), np.full(len(tris), 3, dtype=np.int32),
+            buffers.material_indices[face_ids], buffers.smooth[face_ids], sharp, creases,
+            {name: np.array(uvs, dtype=np.float32).reshape(-1, 3, 2)[alive].reshape(-1, 2)
+             for name, uvs in self.corner_uvs.items()},
+        )
+        result.source_vertices = used_verts
+        return result
+
+def get_importance_scale(importance, strength):
+    """Множители квадрик по важности вершин: 1 в плоских областях, до 1 + strength * IMPORTANCE_GAIN"""
+    return 1.0 + strength * IMPORTANCE_GAIN * np.asarray(importance, dtype=np.float64)
+
+def qem_decimate_mesh(mesh, ratio, props, analysis=None):
+    """Новый меш, упрощенный QEM с защитой ребер по настройкам props
+
+    analysis - MeshAnalysis меша из кэша, если он есть (углы не пересчитываются).
+    """
+    buffers = MeshBuffers.from_mesh(mesh, with_layers=True)
+    if analysis is not None:
+        protected = analysis.protected_edge_mask(mesh, props.sharp_angle, props.keep_sharp, props.keep_crease)
+    else:
+        protected = get_protected_edge_mask(mesh, props.sharp_angle, props.keep_sharp, props.keep_crease)
+    vertex_scale = None
+    if props.use_importance:
+        vertex_scale = get_importance_scale(get_importance(mesh, analysis), props.importance_strength)
+    decimator = QEMDecimator(
+        buffers, protected,
+        lock_protected=props.qem_protection == 'LOCK',
+        protected_weight=props.qem_protected_weight,
+        vertex_scale=vertex_scale,
+    )
+    source_faces = decimator.face_count
+    decimator.run(max(int(source_faces * ratio), 1))
+    log(f"🧮 QEM: {source_faces} -> {decimator.face_count} tris, "
+        f"{decimator.collapses} collapses, {decimator.rejected} rejected", 'DEBUG')
+
+    decimated = decimator.to_buffers()
+    # Вершины результата - вершины исходника: их атрибуты и веса групп переносятся по индексу,
+    # атрибуты полигонов и углов после триангуляции теряют смысл
+    kept = decimated.source_vertices
+    decimated.attributes = {
+        name: (domain, data_type, values[kept])
+        for name, (domain, data_type, values) in buffers.attributes.items() if domain == 'POINT'
+    }
+    decimated.vertex_weights = {name: weights[kept] for name, weights in buffers.vertex_weights.items()}
+    result = decimated.to_mesh(mesh.name + "_QEM")
+    copy_materials(mesh, result)
+    return result
@@ -0,0 +1,69 @@
+# FILE: core/settings.py
+from types import SimpleNamespace
+
+def get_property_names():
+    """Имена полей SharpDecimateProperties"""
+    from .properties import SharpDecimateProperties
+    return list(SharpDecimateProperties.__annotations__.keys())
+
+def get_default_settings():
+    """Значения по умолчанию всех полей SharpDecimateProperties (без регистрации в Blender)"""
+    from .properties import SharpDecimateProperties
+    defaults = {}
+    for name, prop in SharpDecimateProperties.__annotations__.items():
+        keywords = getattr(prop, "keywords", {})
+        defaults[name] = keywords.get("default")
+    return defaults
+
+def get_property_keywords():
+    """Параметры объявления полей SharpDecimateProperties: {имя: keywords}"""
+    from .properties import SharpDecimateProperties
+    return {name: getattr(prop, "keywords", {}) for name, prop in SharpDecimateProperties.__annotations__.items()}
+
+def validate_setting(name, value, keywords):
+    """Значение поля в пределах свойства
+
+    Числа приводятся к min/max, как при записи в PropertyGroup. Значение,
+    которого нет среди вариантов EnumProperty, - ошибка ValueError.
+    """
+    items = keywords.get("items")
+    if isinstance(items, (list, tuple)):
+        identifiers = [item[0] for item in items]
+        if value not in identifiers:
+            raise ValueError(f"Setting '{name}': {value!r} is not one of {identifiers}")
+        return value
+
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return value
+    clamped = value
+    if keywords.get("min") is not None:
+        clamped = max(clamped, keywords["min"])
+    if keywords.get("max") is not None:
+        clamped = min(clamped, keywords["max"])
+    if clamped != value:
+        from .profiling import log
+        log(f"⚠️ Setting '{name}' = {value} is out of range, clamped to {clamped}", 'WARNING')
+    default = keywords.get("default")
+    return int(clamped) if isinstance(default, int) else float(clamped)
+
+def make_settings(props=None, validate=False, **overrides):
+    """Настройки децимации с полями SharpDecimateProperties
+
+    Берет значения из props (PropertyGroup или dict), поверх - overrides.
+    validate=True проверяет значения dict по пределам свойств (validate_setting) -
+    для пользовательского ввода; overrides (вычисленные ratio и т.п.) не проверяются.
+    Результат можно передавать везде, где ожидается scene.sharpdecimate_props.
+    """
+    values = get_default_settings()
+    if isinstance(props, dict):
+        given = {name: value for name, value in props.items() if name in values}
+        if validate:
+            keywords = get_property_keywords()
+            given = {name: validate_setting(name, value, keywords[name]) for name, value in given.items()}
+        values.update(given)
+    elif props is not None:
+        for name in values:
+            if hasattr(props, name):
+                values[name] = getattr(props, name)
+    values.update(overrides)
+    return SimpleNamespace(**values)
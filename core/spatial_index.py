@@ -0,0 +1,107 @@
+# FILE: core/spatial_index.py
+from itertools import product
+
+from .mesh_arrays import np
+
+NEIGHBOR_OFFSETS = list(product((-1, 0, 1), repeat=3))
+
+def point_segment_distances(points, starts, ends):
+    """Расстояния от точек до отрезков (попарно, массивы одной длины)"""
+    direction = ends - starts
+    length_sq = np.einsum('ij,ij->i', direction, direction)
+    t = np.einsum('ij,ij->i', points - starts, direction) / np.maximum(length_sq, 1e-30)
+    closest = starts + np.clip(t, 0.0, 1.0)[:, None] * direction
+    return np.linalg.norm(points - closest, axis=1)
+
+def _expand_ranges(starts, counts):
+    """Индексы всех диапазонов [start, start + count) подряд"""
+    offsets = np.cumsum(counts) - counts
+    return np.arange(int(counts.sum()), dtype=np.int64) - np.repeat(offsets - starts, counts)
+
+class SegmentGrid:
+    """Равномерная сетка над отрезками для пакетного поиска ближайшего отрезка
+
+    Длинные отрезки режутся на куски не длиннее ячейки, каждый кусок попадает
+    в несколько соседних ячеек. Запрос проверяет 27 ячеек вокруг точки, поэтому
+    размер ячейки должен быть не меньше радиуса поиска.
+    """
+
+    def __init__(self, starts, ends, cell_size):
+        self.starts = np.asarray(starts, dtype=np.float64)
+        self.ends = np.asarray(ends, dtype=np.float64)
+        self.cell_size = float(cell_size)
+
+        # Куски отрезков не длиннее ячейки
+        lengths = np.linalg.norm(self.ends - self.starts, axis=1)
+        pieces = np.maximum(np.ceil(lengths / self.cell_size).astype(np.int64), 1)
+        piece_segments = np.repeat(np.arange(len(lengths)), pieces)
+        piece_index = _expand_ranges(np.zeros(len(pieces), dtype=np.int64), pieces)
+        step = (self.ends - self.starts)[piece_segments] / pieces[piece_segments, None]
+        piece_starts = self.starts[piece_segments] + step * piece_index[:, None]
+        piece_ends = piece_starts + step
+
+        low = np.floor(np.minimum(piece_starts, piece_ends) / self.cell_size).astype(np.int64)
+        high = np.floor(np.maximum(piece_starts, piece_ends) / self.cell_size).astype(np.int64)
+
+        # Запас в две ячейки: у любой точки в радиусе поиска все соседи внутри сетки
+        self.origin = low.min(axis=0) - 2
+        self.dims = high.max(axis=0) - self.origin + 3
+
+        # Все ячейки, которые задевает каждый кусок
+        extent = high - low + 1
+        counts = extent.prod(axis=1)
+        owners = np.repeat(np.arange(len(counts)), counts)
+        local = _expand_ranges(np.zeros(len(counts), dtype=np.int64), counts)
+        nx, ny = extent[owners, 0], extent[owners, 1]
+        cells = low[owners] + np.stack([local % nx, (local // nx) % ny, local // (nx * ny)], axis=1)
+
+        keys = self._cell_keys(cells)
+        order = np.argsort(keys, kind='stable')
+        self.cell_keys = keys[order]
+        self.cell_segments = piece_segments[owners[order]]
+
+    def __len__(self):
+        return len(self.starts)
+
+    def _cell_keys(self, cells):
+        shifted = cells - self.origin
+        return (shifted[:, 0] * self.dims[1] + shifted[:, 1]) * self.dims[2] + shifted[:, 2]
+
+    def nearest(self, points, max_distance):
+        """Ближайший отрезок в радиусе max_distance: (индексы или -1, расстояния)"""
+        points = np.asarray(points, dtype=np.float64)
+        best_ids = np.full(len(points), -1, dtype=np.int64)
+        best_distances = np.full(len(points), np.inf)
+
+        cells = np.floor(points / self.cell_size).astype(np.int64)
+        shifted = cells - self.origin
+        inside = np.all((shifted >= 1) & (shifted <= self.dims - 2), axis=1)
+        query_ids = np.flatnonzero(inside)
+        query_cells = cells[query_ids]
+
+        for offset in NEIGHBOR_OFFSETS:
+            keys = self._cell_keys(query_cells + offset)
+            left = np.searchsorted(self.cell_keys, keys, side='left')
+            counts = np.searchsorted(self.cell_keys, keys, side='right') - left
+            if not counts.any():
+                continue
+
+            point_ids = np.repeat(query_ids, counts)
+            segment_ids = self.cell_segments[_expand_ranges(left, counts)]
+            distances = point_segment_distances(
+                points[point_ids], self.starts[segment_ids], self.ends[segment_ids]
+            )
+
+            # Лучший кандидат каждой точки в этом проходе
+            order = np.lexsort((distances, point_ids))
+            point_ids, segment_ids, distances = point_ids[order], segment_ids[order], distances[order]
+            first = np.ones(len(point_ids), dtype=bool)
+            first[1:] = point_ids[1:] != point_ids[:-1]
+            point_ids, segment_ids, distances = point_ids[first], segment_ids[first], distances[first]
+
+            better = distances < best_distances[point_ids]
+            best_ids[point_ids[better]] = segment_ids[better]
+            best_distances[point_ids[better]] = distances[better]
+
+        best_ids[best_distances > max_distance] = -1
+        return best_ids, best_distances
@@ -0,0 +1,230 @@
+# FILE: core/target_budget.py
+import bpy
+
+from .mesh_arrays import HAS_NUMPY, np, count_triangles, get_polygon_loops, get_polygon_material_indices
+from .data_ops import DecimateEvaluator, extract_faces
+from .partition import partition_by_material, build_part_mesh
+from .settings import make_settings
+from .protection_weights import build_protection_weights
+from .profiling import log
+
+MIN_RATIO = 0.001
+MAX_RATIO = 1.0
+# Поиск для QEM идет по формуле без децимаций, поэтому попыток можно больше
+QEM_MAX_EVALUATIONS = 64
+
+# make_settings не ограничивает overrides пределами свойств: найденный ratio
+# (вплоть до MIN_RATIO и MAX_RATIO) применяется как есть, и отчет описывает
+# именно тот меш, который будет децимирован.
+
+def clamp_ratio(ratio):
+    return min(max(ratio, MIN_RATIO), MAX_RATIO)
+
+def make_material_settings(props, scale):
+    """Настройки с ratio HighDetail/LowDetail, умноженными на scale"""
+    return make_settings(
+        props,
+        material_high_ratio=clamp_ratio(props.material_high_ratio * scale),
+        material_low_ratio=clamp_ratio(props.material_low_ratio * scale),
+        use_target_budget=False,
+    )
+
+class RatioSearch:
+    """Ограниченный поиск ratio под бюджет треугольников
+
+    Число треугольников монотонно растет с ratio, поэтому поиск ведется в вилке
+    [low, high]: следующая попытка - пропорциональная оценка budget / tris,
+    а если она выходит за вилку или уже вычислялась - бисекция.
+    Вычисленные значения кэшируются, бюджет никогда не превышается.
+    """
+
+    def __init__(self, count_triangles, budget, tolerance, max_evaluations, low=MIN_RATIO, high=MAX_RATIO):
+        self.count_triangles = count_triangles
+        self.budget = budget
+        self.tolerance = tolerance
+        self.max_evaluations = max(max_evaluations, 1)
+        self.low = low
+        self.high = high
+        self.cache = {}
+
+    def count(self, ratio):
+        key = round(ratio, 6)
+        if key not in self.cache:
+            self.cache[key] = self.count_triangles(key)
+        return self.cache[key]
+
+    @property
+    def evaluations(self):
+        return len(self.cache)
+
+    def solve(self, initial_ratio):
+        """(ratio, треугольники) - лучший результат не больше бюджета"""
+        low, high = self.low, self.high
+        best = None
+        ratio = min(max(initial_ratio, low), high)
+
+        while self.evaluations < self.max_evaluations:
+            triangles = self.count(ratio)
+            if triangles <= self.budget:
+                low = ratio
+                if best is None or triangles > best[1]:
+                    best = (ratio, triangles)
+                if self.budget - triangles <= self.tolerance or ratio >= self.high:
+                    break
+            else:
+                high = ratio
+
+            if high - low < 1e-5:
+                break
+
+            # Пропорциональная оценка, с бисекцией как страховкой
+            next_ratio = ratio * self.budget / max(triangles, 1)
+            if not (low < next_ratio < high) or round(next_ratio, 6) in self.cache:
+                next_ratio = (low + high) / 2.0
+            ratio = next_ratio
+
+        if best is None:
+            best = (low, self.count(low))
+        return best
+
+def get_material_part_meshes(source_mesh):
+    """Временные меши частей по материалам: [(material_index, mesh)]"""
+    if HAS_NUMPY:
+        return [
+            (material_index, build_part_mesh(part, f"SharpDecimate_Budget_{material_index}", source_mesh))
+            for material_index, part in sorted(partition_by_material(source_mesh).items())
+        ]
+
+    material_indices = sorted({poly.material_index for poly in source_mesh.polygons})
+    return [
+        (index, extract_faces(source_mesh, lambda face, index=index: face.material_index == index))
+        for index in material_indices
+    ]
+
+def get_budget_protection(mesh, props, is_source=True, analysis=None):
+    """Веса защиты для оценки модификатором - те же, что получит DecimateJob
+
+    analysis - MeshAnalysis исходника от задачи (отпечаток меша не считается повторно).
+    """
+    if props.decimate_engine == 'QEM' and HAS_NUMPY:
+        return None
+    if not is_source:
+        return build_protection_weights(mesh, props, high_detail=False)
+    if analysis is None and HAS_NUMPY:
+        from .analysis_cache import get_mesh_analysis
+        analysis = get_mesh_analysis(mesh)
+    return build_protection_weights(mesh, props, analysis)
+
+def solve_standard_budget(context, original_obj, props, budget, tolerance, analysis=None):
+    vertex_groups = [group.name for group in original_obj.vertex_groups]
+    protection = get_budget_protection(original_obj.data, props, analysis=analysis)
+    with DecimateEvaluator(original_obj.data, context, vertex_groups, protection) as evaluator:
+        source_triangles = evaluator.count_triangles(MAX_RATIO)
+        search = RatioSearch(evaluator.count_triangles, budget, tolerance, props.target_max_evaluations)
+        search.cache[MAX_RATIO] = source_triangles
+        ratio, triangles = search.solve(budget / max(source_triangles, 1))
+
+    settings = make_settings(props, ratio=ratio, use_target_budget=False)
+    return settings, ratio, triangles, search.evaluations
+
+def solve_material_budget(context, original_obj, props, budget, tolerance):
+    """Подбор общего множителя для ratio HighDetail/LowDetail"""
+    from .base_decimate import make_ratio_getter
+
+    source_mesh = original_obj.data
+    ratio_for_index = make_ratio_getter(source_mesh, props)
+    vertex_groups = [group.name for group in original_obj.vertex_groups]
+
+    part_meshes = get_material_part_meshes(source_mesh)
+    evaluators = []
+    try:
+        for material_index, mesh in part_meshes:
+            protection = get_budget_protection(mesh, props, is_source=False)
+            evaluators.append((ratio_for_index(material_index),
+                               DecimateEvaluator(mesh, context, vertex_groups, protection)))
+
+        def count_scaled(scale):
+            return sum(
+                evaluator.count_triangles(clamp_ratio(ratio * scale))
+                for ratio, evaluator in evaluators
+            )
+
+        max_scale = MAX_RATIO / max(min(ratio for ratio, _ in evaluators), MIN_RATIO)
+        source_triangles = sum(evaluator.count_triangles(MAX_RATIO) for _, evaluator in evaluators)
+        expected = sum(ratio for ratio, _ in evaluators) / len(evaluators) * source_triangles
+
+        search = RatioSearch(count_scaled, budget, tolerance, props.target_max_evaluations, high=max_scale)
+        scale, triangles = search.solve(budget / max(expected, 1))
+    finally:
+        for _, evaluator in evaluators:
+            evaluator.free()
+        for _, mesh in part_meshes:
+            bpy.data.meshes.remove(mesh)
+
+    settings = make_material_settings(props, scale)
+    return settings, scale, triangles, search.evaluations
+
+def get_material_triangle_counts(mesh):
+    """Число треугольников полигонов каждого слота материала"""
+    _, loop_total = get_polygon_loops(mesh)
+    return np.bincount(get_polygon_material_indices(mesh), loop_total - 2).astype(np.int64)
+
+def solve_qem_budget(context, original_obj, props, budget, tolerance, use_materials):
+    """Бюджет для QEM: движок останавливается ровно на int(tris * ratio), пробные децимации не нужны"""
+    source_mesh = original_obj.data
+    if not use_materials:
+        source_triangles = count_triangles(source_mesh)
+        ratio = clamp_ratio(budget / max(source_triangles, 1))
+        settings = make_settings(props, ratio=ratio, use_target_budget=False)
+        return settings, ratio, int(source_triangles * ratio), 0
+
+    from .base_decimate import make_ratio_getter
+
+    ratio_for_index = make_ratio_getter(source_mesh, props)
+    counts = get_material_triangle_counts(source_mesh)
+    ratios = np.array([ratio_for_index(index) for index in range(len(counts))], dtype=np.float64)
+
+    def count_scaled(scale):
+        return int(np.floor(counts * np.clip(ratios * scale, MIN_RATIO, MAX_RATIO)).sum())
+
+    max_scale = MAX_RATIO / max(ratios.min(initial=MAX_RATIO), MIN_RATIO)
+    search = RatioSearch(count_scaled, budget, tolerance, QEM_MAX_EVALUATIONS, high=max_scale)
+    scale, triangles = search.solve(budget / max(float((counts * ratios).sum()), 1.0))
+
+    settings = make_material_settings(props, scale)
+    return settings, scale, triangles, 0
+
+def solve_target_budget(context, original_obj, props, analysis=None):
+    """Настройки, при которых результат укладывается в бюджет треугольников
+
+    Возвращает (settings, отчет). Модификатор вычисляется через depsgraph без применения,
+    для QEM ratio считается по числу треугольников исходника. analysis - MeshAnalysis
+    исходника, если он уже есть у вызывающего кода.
+    """
+    budget = props.target_triangles
+    tolerance = budget * props.target_tolerance / 100.0
+    use_materials = props.use_material_decimation and bool(original_obj.data.materials)
+
+    if props.decimate_engine == 'QEM' and HAS_NUMPY:
+        settings, value, triangles, evaluations = solve_qem_budget(
+            context, original_obj, props, budget, tolerance, use_materials
+        )
+    elif use_materials:
+        settings, value, triangles, evaluations = solve_material_budget(
+            context, original_obj, props, budget, tolerance
+        )
+    else:
+        settings, value, triangles, evaluations = solve_standard_budget(
+            context, original_obj, props, budget, tolerance, analysis
+        )
+
+    report = {"budget": budget, "triangles": triangles, "value": value, "evaluations": evaluations}
+    if use_materials:
+        report["material_ratios"] = (settings.material_high_ratio, settings.material_low_ratio)
+        applied = f"high {settings.material_high_ratio:.4f}, low {settings.material_low_ratio:.4f}"
+    else:
+        report["ratio"] = settings.ratio
+        applied = f"ratio {settings.ratio:.4f}"
+    log(f"🎯 Target budget {budget} tris: {triangles} tris "
+        f"({applied}, {evaluations} evaluations)")
+    return settings, report
@@ -0,0 +1,50 @@
+# FILE: core/worker.py
+# Фоновый процесс децимации частей меша.
+# Запуск: blender -b --factory-startup --python worker.py -- task_1.npz [task_2.npz ...]
+import os
+import sys
+import importlib
+import traceback
+
+def import_addon_module(name):
+    """Импорт модуля аддона, когда worker запущен как отдельный скрипт"""
+    addon_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    parent_dir = os.path.dirname(addon_dir)
+    if parent_dir not in sys.path:
+        sys.path.insert(0, parent_dir)
+    return importlib.import_module(f"{os.path.basename(addon_dir)}.core.{name}")
+
+def process_task(task_path):
+    """Децимация одной части: читает задачу, пишет результат в meta['output']"""
+    import bpy
+    exchange = import_addon_module("exchange")
+    data_ops = import_addon_module("data_ops")
+    mesh_arrays = import_addon_module("mesh_arrays")
+
+    buffers, meta = exchange.load_buffers(task_path)
+    mesh = buffers.to_mesh("SharpDecimate_Worker")
+    try:
+        decimated = data_ops.evaluate_decimate(mesh, meta["ratio"], protection=meta.get("protection"))
+    finally:
+        bpy.data.meshes.remove(mesh)
+
+    try:
+        result = mesh_arrays.MeshBuffers.from_mesh(decimated, with_layers=True)
+    finally:
+        bpy.data.meshes.remove(decimated)
+
+    exchange.save_buffers(meta["output"], result, key=meta["key"])
+
+def main(argv):
+    task_paths = argv[argv.index("--") + 1:] if "--" in argv else []
+    for task_path in task_paths:
+        try:
+            process_task(task_path)
+        except Exception as e:
+            print(f"SharpDecimate worker: task {task_path} failed: {e}")
+            traceback.print_exc()
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
@@ -13,7 +13,7 @@ else:
 
 # Проверим сам класс
 try:
-    from core.base_decimate import SharpDecimateProperties
+    from core.properties import SharpDecimateProperties
     print("SharpDecimateProperties class found")
     print("Properties in class:")
     for prop in SharpDecimateProperties.bl_rna.properties:
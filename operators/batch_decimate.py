@@ -0,0 +1,198 @@
+# FILE: operators/batch_decimate.py
+import time
+from collections import deque
+
+import bpy
+from bpy.types import Operator
+from bpy.props import EnumProperty, StringProperty
+
+from ..locale_loader import get_text
+from ..preferences import get_ui_language
+from ..core.profiling import log
+
+class BatchJob:
+    """Задача пакетной обработки: один уникальный меш и все его объекты"""
+
+    def __init__(self, mesh, objects):
+        self.mesh = mesh
+        self.objects = objects
+        self.source_faces = len(mesh.polygons)
+        self.result_faces = 0
+        self.seconds = 0.0
+        self.results = []
+        self.error = None
+
+def collect_batch_jobs(objects):
+    """Группировка объектов по общему мешу - каждый меш децимируется один раз"""
+    jobs = {}
+    for obj in objects:
+        if obj is None or obj.type != 'MESH' or len(obj.data.polygons) == 0:
+            continue
+        if obj.data in jobs:
+            jobs[obj.data].objects.append(obj)
+        else:
+            jobs[obj.data] = BatchJob(obj.data, [obj])
+    return list(jobs.values())
+
+def run_batch_job(context, job, props):
+    """Децимация первого объекта задачи, остальные получают тот же lowpoly-меш"""
+    # Ядро децимации загружается при первом запуске, а не при включении аддона
+    from ..core.base_decimate import decimate_single_object
+    from ..core.data_ops import duplicate_object
+
+    start = time.perf_counter()
+    try:
+        lowpoly_obj = decimate_single_object(context, job.objects[0], props)
+        if lowpoly_obj is None:
+            job.error = "decimation failed"
+            return
+        job.results.append(lowpoly_obj)
+        job.result_faces = len(lowpoly_obj.data.polygons)
+
+        # Объекты с общим мешем - связанные копии без повторной децимации
+        for instance in job.objects[1:]:
+            job.results.append(duplicate_object(instance, "Low_" + instance.name, mesh=lowpoly_obj.data))
+    except Exception as e:
+        job.error = str(e)
+    finally:
+        job.seconds = time.perf_counter() - start
+
+def format_batch_summary(jobs, elapsed):
+    """Итоговая статистика: пропускная способность и сводка по объектам"""
+    done = [job for job in jobs if job.error is None and job.results]
+    objects_done = sum(len(job.results) for job in done)
+    faces_done = sum(job.source_faces for job in done)
+    elapsed = max(elapsed, 1e-6)
+
+    lines = [
+        f"📦 Batch: {objects_done} objects ({len(done)}/{len(jobs)} unique meshes) in {elapsed:.2f}s | "
+        f"{faces_done / elapsed:,.0f} faces/s, {objects_done / elapsed:.2f} objects/s"
+    ]
+    for job in jobs:
+        names = ", ".join(obj.name for obj in job.objects)
+        if job.error is not None:
+            lines.append(f"   ❌ {names}: {job.error}")
+        else:
+            lines.append(
+                f"   ✅ {names}: {job.source_faces} → {job.result_faces} faces ({job.seconds:.2f}s)"
+            )
+    return lines
+
+class SHARPDECIMATE_OT_batch_decimate(Operator):
+    bl_idname = "mesh.sharpdecimate_batch_decimate"
+    bl_label = "Batch Generate Lowpoly"
+    bl_description = "Create lowpoly versions of all selected objects or a collection"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    source: EnumProperty(
+        name="Source",
+        items=[
+            ('SELECTED', "Selected Objects", "Process all selected mesh objects"),
+            ('COLLECTION', "Collection", "Process all mesh objects of a collection"),
+        ],
+        default='SELECTED',
+    )
+
+    collection_name: StringProperty(
+        name="Collection",
+        description="Collection to process (empty = active collection)",
+        default="",
+    )
+
+    _timer = None
+
+    @classmethod
+    def poll(cls, context):
+        return context.mode == 'OBJECT'
+
+    def get_source_objects(self, context):
+        if self.source == 'COLLECTION':
+            collection = bpy.data.collections.get(self.collection_name) if self.collection_name \
+                else context.collection
+            return list(collection.all_objects) if collection else []
+        return list(context.selected_objects)
+
+    def start(self, context):
+        self.lang = get_ui_language(context)
+        self.props = context.scene.sharpdecimate_props
+        self.jobs = collect_batch_jobs(self.get_source_objects(context))
+        self.queue = deque(self.jobs)
+        self.start_time = time.perf_counter()
+        return bool(self.jobs)
+
+    def finish(self, context, cancelled=False):
+        elapsed = time.perf_counter() - self.start_time
+        summary = format_batch_summary(self.jobs, elapsed)
+        log(summary[0])
+        for line in summary[1:]:
+            log(line, 'DEBUG')
+
+        # Выделяем созданные объекты
+        created = [obj for job in self.jobs for obj in job.results]
+        for obj in context.selected_objects:
+            obj.select_set(False)
+        for obj in created:
+            obj.select_set(True)
+        if created:
+            context.view_layer.objects.active = created[0]
+
+        key = "batch_cancelled" if cancelled else "batch_finished"
+        self.report({'WARNING'} if cancelled else {'INFO'}, f"{get_text(key, self.lang)}: {summary[0]}")
+        return {'CANCELLED'} if cancelled and not created else {'FINISHED'}
+
+    def execute(self, context):
+        if not self.start(context):
+            self.report({'WARNING'}, get_text("no_mesh", get_ui_language(context)))
+            return {'CANCELLED'}
+
+        while self.queue:
+            run_batch_job(context, self.queue.popleft(), self.props)
+        return self.finish(context)
+
+    def invoke(self, context, event):
+        if not self.start(context):
+            self.report({'WARNING'}, get_text("no_mesh", get_ui_language(context)))
+            return {'CANCELLED'}
+
+        wm = context.window_manager
+        wm.progress_begin(0, len(self.jobs))
+        self._timer = wm.event_timer_add(0.01, window=context.window)
+        wm.modal_handler_add(self)
+        return {'RUNNING_MODAL'}
+
+    def modal(self, context, event):
+        if event.type == 'ESC':
+            return self.cancel_batch(context)
+
+        if event.type != 'TIMER':
+            return {'PASS_THROUGH'}
+
+        # Одна задача за тик таймера - интерфейс остается отзывчивым
+        job = self.queue.popleft()
+        run_batch_job(context, job, self.props)
+        context.window_manager.progress_update(len(self.jobs) - len(self.queue))
+
+        if not self.queue:
+            self.stop_timer(context)
+            return self.finish(context)
+        return {'RUNNING_MODAL'}
+
+    def cancel_batch(self, context):
+        self.stop_timer(context)
+        return self.finish(context, cancelled=True)
+
+    def cancel(self, context):
+        self.stop_timer(context)
+
+    def stop_timer(self, context):
+        wm = context.window_manager
+        if self._timer is not None:
+            wm.event_timer_remove(self._timer)
+            self._timer = None
+            wm.progress_end()
+
+def register():
+    bpy.utils.register_class(SHARPDECIMATE_OT_batch_decimate)
+
+def unregister():
+    bpy.utils.unregister_class(SHARPDECIMATE_OT_batch_decimate)
@@ -0,0 +1,56 @@
+# FILE: operators/generate_lod.py
+import bpy
+from bpy.types import Operator
+
+from ..locale_loader import get_text
+from ..preferences import get_ui_language
+from ..core.profiling import log
+
+class SHARPDECIMATE_OT_generate_lod_chain(Operator):
+    bl_idname = "mesh.sharpdecimate_generate_lod_chain"
+    bl_label = "Generate LOD Chain"
+    bl_description = "Create LOD0..LODn of the active object in a separate collection"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    @classmethod
+    def poll(cls, context):
+        return (context.active_object is not None and 
+                context.active_object.type == 'MESH')
+
+    def execute(self, context):
+        # Ядро децимации загружается при первом запуске, а не при включении аддона
+        from ..core.lod import generate_lod_chain, parse_lod_levels
+        
+        props = context.scene.sharpdecimate_props
+        lang = get_ui_language(context)
+        original_obj = context.active_object
+
+        try:
+            levels = parse_lod_levels(props.lod_levels)
+        except ValueError as e:
+            self.report({'ERROR'}, f"{get_text('lod_invalid_levels', lang)}: {e}")
+            return {'CANCELLED'}
+
+        if not levels:
+            self.report({'WARNING'}, get_text("lod_invalid_levels", lang))
+            return {'CANCELLED'}
+
+        try:
+            lod_objects = generate_lod_chain(context, original_obj, props, levels, props.lod_cascade)
+        except Exception as e:
+            self.report({'ERROR'}, f"{get_text('decimation_error', lang)}: {str(e)}")
+            log(f"🔴 LOD CHAIN ERROR: {e}", 'ERROR')
+            import traceback
+            traceback.print_exc()
+            return {'CANCELLED'}
+
+        summary = " | ".join(f"{obj.name}: {len(obj.data.polygons)}" for obj in lod_objects)
+        log(f"🪜 LOD chain created: {summary}")
+        self.report({'INFO'}, f"{get_text('lod_created', lang)}: {summary}")
+        return {'FINISHED'}
+
+def register():
+    bpy.utils.register_class(SHARPDECIMATE_OT_generate_lod_chain)
+
+def unregister():
+    bpy.utils.unregister_class(SHARPDECIMATE_OT_generate_lod_chain)
@@ -1,11 +1,15 @@
 # FILE: operators/generate_lowpoly.py
 import bpy
-import bmesh
 from bpy.types import Operator
 
 from ..locale_loader import get_text
 from ..preferences import get_ui_language
-from ..core.base_decimate import decimate_single_object
+from ..core.profiling import log
+
+def create_job(context, original_obj):
+    """DecimateJob для объекта (ядро децимации загружается при первом запуске, а не при включении аддона)"""
+    from ..core.base_decimate import DecimateJob
+    return DecimateJob(context, original_obj, context.scene.sharpdecimate_props)
 
 class SHARPDECIMATE_OT_generate_lowpoly(Operator):
     bl_idname = "mesh.sharpdecimate_generate_lowpoly"
@@ -18,97 +22,194 @@ class SHARPDECIMATE_OT_generate_lowpoly(Operator):
         return (context.active_object is not None and 
                 context.active_object.type == 'MESH')
 
-    def execute(self, context):
-        scene = context.scene
-        props = scene.sharpdecimate_props
+    _timer = None
+    job = None
+
+    def prepare(self, context):
+        """Проверки перед децимацией, возвращает исходный объект или None"""
         lang = get_ui_language(context)
         
         original_obj = context.active_object
         if original_obj.type != 'MESH':
             self.report({'WARNING'}, get_text("no_mesh", lang))
-            return {'CANCELLED'}
+            return None
         
         # ПРАВКА: Добавляем валидацию меша
         if not self.validate_mesh(original_obj):
             self.report({'ERROR'}, get_text("invalid_mesh", lang))
-            return {'CANCELLED'}
+            return None
         
         # 🔴 ПРОВЕРКА ВОДОНЕПРОНИЦАЕМОСТИ ДО ДЕЦИМАЦИИ
-        pre_check_ok, pre_check_message = self.validate_mesh_watertight(original_obj)
+        pre_check_ok, pre_check_message = self.validate_mesh_watertight(original_obj, context)
         if not pre_check_ok:
             self.report({'WARNING'}, f"Mesh issues before decimation: {pre_check_message}")
             # Не отменяем, но предупреждаем пользователя
         
-        # Сохраняем статистику исходного меша
-        original_polycount = len(original_obj.data.polygons)
-        original_vertices = len(original_obj.data.vertices)
-        
         # В free-версии только одиночный объект
         if len(context.selected_objects) > 1:
             self.report({'WARNING'}, get_text("multi_select", lang))
+            return None
+        
+        # Сохраняем статистику исходного меша
+        self.original_polycount = len(original_obj.data.polygons)
+        log(f"🟡 STARTING DECIMATION: {original_obj.name}")
+        return original_obj
+
+    def complete(self, context, lowpoly_obj):
+        """Проверка результата, выделение и отчет"""
+        lang = get_ui_language(context)
+        
+        if lowpoly_obj is None:
+            self.report({'ERROR'}, get_text("decimation_failed", lang))
+            return {'CANCELLED'}
+        
+        # 🔴 ПРОВЕРКА ВОДОНЕПРОНИЦАЕМОСТИ ПОСЛЕ ДЕЦИМАЦИИ
+        # Отчет этапа verify, если он есть - меш не проверяется второй раз
+        if self.job is not None and self.job.integrity is not None:
+            post_check_ok, post_check_message = self.job.integrity.as_tuple("; ")
+        else:
+            post_check_ok, post_check_message = self.validate_mesh_watertight(lowpoly_obj, context)
+        if not post_check_ok:
+            self.report({'WARNING'}, f"Mesh issues after decimation: {post_check_message}")
+            # Показываем предупреждение, но не отменяем операцию
+        
+        # ДОБАВЛЯЕМ ОТЛАДОЧНУЮ ИНФОРМАЦИЮ
+        log(f"🟢 LOWPOLY OBJECT CREATED: {lowpoly_obj.name}")
+        log(f"📍 Location: {lowpoly_obj.location}", 'DEBUG')
+        log(f"👀 Visible: {lowpoly_obj.visible_get()}", 'DEBUG')
+        log(f"📊 Polycount: {len(lowpoly_obj.data.polygons)}", 'DEBUG')
+        
+        # Делаем объект видимым и выделяем его
+        lowpoly_obj.hide_set(False)
+        lowpoly_obj.hide_viewport = False
+        lowpoly_obj.hide_render = False
+        
+        # Выделяем новый объект
+        for obj in context.selected_objects:
+            obj.select_set(False)
+        lowpoly_obj.select_set(True)
+        context.view_layer.objects.active = lowpoly_obj
+        
+        # Статистика результата
+        original_polycount = self.original_polycount
+        final_polycount = len(lowpoly_obj.data.polygons)
+        
+        # ПРАВКА: Защита от деления на ноль
+        if original_polycount > 0:
+            reduction = (1 - final_polycount / original_polycount) * 100
+        else:
+            reduction = 0
+        
+        success_message = (
+            f"{get_text('success', lang)}{lowpoly_obj.name} | "
+            f"Polys: {original_polycount} → {final_polycount} "
+            f"({reduction:.1f}% reduction)"
+        )
+        
+        # Добавляем информацию о проверке водонепроницаемости
+        if not post_check_ok:
+            success_message += f" | ⚠️ Check mesh integrity"
+        
+        # Отклонение от исходника (этап error)
+        if self.job is not None and self.job.error_report is not None:
+            success_message += f" | Max error: {self.job.error_report.relative_max * 100:.3f}%"
+        
+        # Время, скорость и рост памяти
+        if self.job is not None:
+            success_message += f" | {self.job.timer.summary_line()}"
+        
+        self.report({'INFO'}, success_message)
+        return {'FINISHED'}
+
+    def report_error(self, context, e):
+        lang = get_ui_language(context)
+        error_msg = f"{get_text('decimation_error', lang)}: {str(e)}"
+        self.report({'ERROR'}, error_msg)
+        log(f"🔴 DECIMATION ERROR: {e}", 'ERROR')
+        import traceback
+        traceback.print_exc()
+
+    def execute(self, context):
+        """Блокирующий запуск (скрипты, повтор через Redo)"""
+        original_obj = self.prepare(context)
+        if original_obj is None:
             return {'CANCELLED'}
 
         try:
-            print(f"🟡 STARTING DECIMATION: {original_obj.name}")
-            lowpoly_obj = decimate_single_object(context, original_obj, props)
-            
-            if lowpoly_obj is None:
-                self.report({'ERROR'}, get_text("decimation_failed", lang))
-                return {'CANCELLED'}
-            
-            # 🔴 ПРОВЕРКА ВОДОНЕПРОНИЦАЕМОСТИ ПОСЛЕ ДЕЦИМАЦИИ
-            post_check_ok, post_check_message = self.validate_mesh_watertight(lowpoly_obj)
-            if not post_check_ok:
-                self.report({'WARNING'}, f"Mesh issues after decimation: {post_check_message}")
-                # Показываем предупреждение, но не отменяем операцию
-            
-            # ДОБАВЛЯЕМ ОТЛАДОЧНУЮ ИНФОРМАЦИЮ
-            print(f"🟢 LOWPOLY OBJECT CREATED: {lowpoly_obj.name}")
-            print(f"📍 Location: {lowpoly_obj.location}")
-            print(f"👀 Visible: {lowpoly_obj.visible_get()}")
-            print(f"📊 Polycount: {len(lowpoly_obj.data.polygons)}")
-            
-            # Делаем объект видимым и выделяем его
-            lowpoly_obj.hide_set(False)
-            lowpoly_obj.hide_viewport = False
-            lowpoly_obj.hide_render = False
-            
-            # Выделяем новый объект
-            bpy.ops.object.select_all(action='DESELECT')
-            lowpoly_obj.select_set(True)
-            context.view_layer.objects.active = lowpoly_obj
-            
-            # Статистика результата
-            final_polycount = len(lowpoly_obj.data.polygons)
-            final_vertices = len(lowpoly_obj.data.vertices)
-            
-            # ПРАВКА: Защита от деления на ноль
-            if original_polycount > 0:
-                reduction = (1 - final_polycount / original_polycount) * 100
-            else:
-                reduction = 0
-            
-            success_message = (
-                f"{get_text('success', lang)}{lowpoly_obj.name} | "
-                f"Polys: {original_polycount} → {final_polycount} "
-                f"({reduction:.1f}% reduction)"
-            )
-            
-            # Добавляем информацию о проверке водонепроницаемости
-            if not post_check_ok:
-                success_message += f" | ⚠️ Check mesh integrity"
-            
-            self.report({'INFO'}, success_message)
-            return {'FINISHED'}
-            
+            self.job = create_job(context, original_obj)
+            lowpoly_obj = self.job.run()
+            return self.complete(context, lowpoly_obj)
         except Exception as e:
-            error_msg = f"{get_text('decimation_error', lang)}: {str(e)}"
-            self.report({'ERROR'}, error_msg)
-            print(f"🔴 DECIMATION ERROR: {e}")
-            import traceback
-            traceback.print_exc()
+            self.report_error(context, e)
             return {'CANCELLED'}
-    
+
+    def invoke(self, context, event):
+        """Модальный запуск: этапы выполняются по таймеру, ESC - отмена"""
+        original_obj = self.prepare(context)
+        if original_obj is None:
+            return {'CANCELLED'}
+
+        try:
+            self.job = create_job(context, original_obj)
+        except Exception as e:
+            self.report_error(context, e)
+            return {'CANCELLED'}
+
+        wm = context.window_manager
+        wm.progress_begin(0, 100)
+        self._timer = wm.event_timer_add(0.01, window=context.window)
+        wm.modal_handler_add(self)
+        self.update_status(context)
+        return {'RUNNING_MODAL'}
+
+    def modal(self, context, event):
+        if event.type == 'ESC':
+            # Откат частично созданного объекта
+            self.job.rollback()
+            self.stop(context)
+            self.report({'WARNING'}, get_text("decimation_cancelled", get_ui_language(context)))
+            return {'CANCELLED'}
+
+        if event.type != 'TIMER':
+            return {'PASS_THROUGH'}
+
+        try:
+            self.job.step()
+        except Exception as e:
+            self.job.rollback()
+            self.stop(context)
+            self.report_error(context, e)
+            return {'CANCELLED'}
+
+        if not self.job.finished:
+            self.update_status(context)
+            return {'RUNNING_MODAL'}
+
+        self.stop(context)
+        self.job.timer.print_report()
+        return self.complete(context, self.job.lowpoly_obj)
+
+    def cancel(self, context):
+        # Оператор прерван извне (например, закрытие файла)
+        self.job.rollback()
+        self.stop(context)
+
+    def update_status(self, context):
+        context.window_manager.progress_update(int(self.job.progress * 100))
+        if context.workspace is not None:
+            context.workspace.status_text_set(
+                f"SharpDecimate: {self.job.stage_name} ({self.job.progress * 100:.0f}%) | ESC - {get_text('cancel', get_ui_language(context))}"
+            )
+
+    def stop(self, context):
+        wm = context.window_manager
+        if self._timer is not None:
+            wm.event_timer_remove(self._timer)
+            self._timer = None
+            wm.progress_end()
+        if context.workspace is not None:
+            context.workspace.status_text_set(None)
+
     def validate_mesh(self, obj):
         """Проверка пригодности меша для упрощения"""
         mesh = obj.data
@@ -127,52 +228,13 @@ class SHARPDECIMATE_OT_generate_lowpoly(Operator):
             
         return True
     
-    def validate_mesh_watertight(self, obj):
+    def validate_mesh_watertight(self, obj, context=None):
         """Проверка что меш водонепроницаем и не имеет проблемной геометрии"""
+        from ..core.integrity import check_object_integrity
+        
+        props = (context or bpy.context).scene.sharpdecimate_props
         try:
-            bm = bmesh.new()
-            bm.from_mesh(obj.data)
-            bm.edges.ensure_lookup_table()
-            bm.verts.ensure_lookup_table()
-            bm.faces.ensure_lookup_table()
-            
-            issues = []
-            
-            # 1. Проверка на non-manifold edges (грани с >2 полигонов)
-            non_manifold_edges = [e for e in bm.edges if not e.is_manifold]
-            if non_manifold_edges:
-                issues.append(f"Non-manifold edges: {len(non_manifold_edges)}")
-            
-            # 2. Проверка на loose vertices (вершины без полигонов)
-            loose_verts = [v for v in bm.verts if not v.link_edges]
-            if loose_verts:
-                issues.append(f"Loose vertices: {len(loose_verts)}")
-            
-            # 3. Проверка на degenerate geometry (вырожденные полигоны)
-            degenerate_faces = [f for f in bm.faces if f.calc_area() < 0.0001]
-            if degenerate_faces:
-                issues.append(f"Degenerate faces: {len(degenerate_faces)}")
-            
-            # 4. Проверка на overlapping vertices (пересекающиеся вершины)
-            vert_locations = {}
-            for v in bm.verts:
-                key = (round(v.co.x, 4), round(v.co.y, 4), round(v.co.z, 4))
-                if key in vert_locations:
-                    vert_locations[key] += 1
-                else:
-                    vert_locations[key] = 1
-            
-            overlapping_verts = sum(1 for count in vert_locations.values() if count > 1)
-            if overlapping_verts > 0:
-                issues.append(f"Overlapping vertices: {overlapping_verts}")
-            
-            bm.free()
-            
-            if issues:
-                return False, "; ".join(issues)
-            
-            return True, "Mesh is watertight"
-            
+            return check_object_integrity(obj, props).as_tuple("; ")
         except Exception as e:
             return False, f"Validation error: {str(e)}"
 
@@ -0,0 +1,70 @@
+# FILE: operators/preview.py
+import bpy
+from bpy.types import Operator
+
+from ..locale_loader import get_text
+from ..preferences import get_ui_language
+from ..core.preview import is_preview_active, start_preview, stop_preview, get_preview_face_count
+from ..core.profiling import log
+
+class SHARPDECIMATE_OT_preview_start(Operator):
+    bl_idname = "mesh.sharpdecimate_preview_start"
+    bl_label = "Start Preview"
+    bl_description = "Preview decimation with a live modifier stack on the active object"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    @classmethod
+    def poll(cls, context):
+        obj = context.active_object
+        return (obj is not None and obj.type == 'MESH' and
+                obj.mode == 'OBJECT' and not is_preview_active(obj))
+
+    def execute(self, context):
+        obj = context.active_object
+        try:
+            start_preview(context, obj, context.scene.sharpdecimate_props)
+        except Exception as e:
+            stop_preview(obj)
+            self.report({'ERROR'}, f"{get_text('decimation_error', get_ui_language(context))}: {str(e)}")
+            return {'CANCELLED'}
+
+        log(f"👁️ Preview started: {obj.name} ({get_preview_face_count(obj)} faces)")
+        return {'FINISHED'}
+
+class SHARPDECIMATE_OT_preview_apply(Operator):
+    bl_idname = "mesh.sharpdecimate_preview_apply"
+    bl_label = "Apply Preview"
+    bl_description = "Remove the preview stack and generate the lowpoly object with the current settings"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    @classmethod
+    def poll(cls, context):
+        return is_preview_active(context.active_object)
+
+    def execute(self, context):
+        stop_preview(context.active_object)
+        return bpy.ops.mesh.sharpdecimate_generate_lowpoly('INVOKE_DEFAULT')
+
+class SHARPDECIMATE_OT_preview_cancel(Operator):
+    bl_idname = "mesh.sharpdecimate_preview_cancel"
+    bl_label = "Cancel Preview"
+    bl_description = "Remove the preview stack from the active object"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    @classmethod
+    def poll(cls, context):
+        return is_preview_active(context.active_object)
+
+    def execute(self, context):
+        stop_preview(context.active_object)
+        return {'FINISHED'}
+
+def register():
+    bpy.utils.register_class(SHARPDECIMATE_OT_preview_start)
+    bpy.utils.register_class(SHARPDECIMATE_OT_preview_apply)
+    bpy.utils.register_class(SHARPDECIMATE_OT_preview_cancel)
+
+def unregister():
+    bpy.utils.unregister_class(SHARPDECIMATE_OT_preview_cancel)
+    bpy.utils.unregister_class(SHARPDECIMATE_OT_preview_apply)
+    bpy.utils.unregister_class(SHARPDECIMATE_OT_preview_start)
@@ -1,8 +1,9 @@
 import bpy
 from bpy.types import AddonPreferences
-from bpy.props import EnumProperty
+from bpy.props import EnumProperty, BoolProperty, StringProperty
 
-from .locale_loader import get_text, get_available_languages
+from .locale_loader import get_text, get_available_languages, resolve_language, invalidate_language
+from .core.profiling import configure, LOG_LEVELS, DEFAULT_LOG_LEVEL
 
 # Основное имя аддона
 ADDON_NAME = "SharpDecimate"
@@ -15,24 +16,20 @@ def get_preferences(context=None):
 
 def get_ui_language(context=None):
     """Получение языка UI с автоматическим определением системного"""
-    prefs = get_preferences(context)
-    
-    # Если язык установлен в "Auto", определяем системный
-    if prefs.ui_language == 'auto':
-        # Получаем язык Blender
-        system_lang = bpy.context.preferences.view.language
-        if system_lang in ['ru_RU', 'ru']:
-            return 'ru'
-        else:
-            return 'en'
-    else:
-        return prefs.ui_language
+    # "Auto" определяется по языку Blender один раз и кэшируется в locale_loader
+    return resolve_language(get_preferences(context).ui_language)
+
+def apply_telemetry_settings(prefs):
+    """Передача уровня журнала и профилирования в core.profiling"""
+    configure(log_level=prefs.log_level, cprofile=prefs.profile_cprofile,
+              dump_dir=bpy.path.abspath(prefs.profile_dump_dir) if prefs.profile_dump_dir else "")
 
 class SharpDecimatePreferences(AddonPreferences):
     bl_idname = ADDON_NAME
 
     def update_language(self, context):
         """Принудительное обновление всех панелей при изменении языка"""
+        invalidate_language()
         # Перерисовываем все области
         for window in context.window_manager.windows:
             for area in window.screen.areas:
@@ -46,21 +43,57 @@ class SharpDecimatePreferences(AddonPreferences):
         update=update_language
     )
 
+    def update_telemetry(self, context):
+        apply_telemetry_settings(self)
+
+    log_level: EnumProperty(
+        name="Log Level",
+        description="Console output: DEBUG also prints per-material and per-stage messages",
+        items=[(level, level.capitalize(), "") for level in LOG_LEVELS],
+        default=DEFAULT_LOG_LEVEL,
+        update=update_telemetry
+    )
+
+    profile_cprofile: BoolProperty(
+        name="cProfile",
+        description="Capture a cProfile of every decimation run (slower)",
+        default=False,
+        update=update_telemetry
+    )
+
+    profile_dump_dir: StringProperty(
+        name="Profile Dump Folder",
+        description="Write a JSON profile of every decimation run to this folder (empty = off)",
+        default="",
+        subtype='DIR_PATH',
+        update=update_telemetry
+    )
+
     def draw(self, context):
         layout = self.layout
         lang = get_ui_language(context)
         layout.prop(self, "ui_language", text=get_text("language", lang))
         
         # Информация о текущем языке
-        current_lang = get_ui_language(context)
-        if current_lang == 'auto':
+        if self.ui_language == 'auto':
             system_lang = bpy.context.preferences.view.language
             layout.label(text=get_text("system_language", lang) + f": {system_lang}")
         
+        box = layout.box()
+        box.label(text=get_text("telemetry", lang), icon='TIME')
+        box.prop(self, "log_level", text=get_text("log_level", lang))
+        box.prop(self, "profile_cprofile", text=get_text("profile_cprofile", lang))
+        box.prop(self, "profile_dump_dir", text=get_text("profile_dump_dir", lang))
+        
         layout.label(text=get_text("by_nefas", lang))
 
 def register():
     bpy.utils.register_class(SharpDecimatePreferences)
+    try:
+        apply_telemetry_settings(get_preferences())
+    except (KeyError, AttributeError):
+        # Настройки еще недоступны (например, при запуске из cli)
+        pass
 
 def unregister():
     bpy.utils.unregister_class(SharpDecimatePreferences)
\ No newline at end of file
@@ -4,6 +4,8 @@ from bpy.types import Panel, Operator
 
 from ..locale_loader import get_text
 from ..preferences import get_ui_language, get_preferences
+from .stats_cache import get_mesh_stats
+from ..core.preview import is_preview_active, get_preview_face_count
 
 class SHARPDECIMATE_OT_auto_setup_materials(Operator):
     """Автоматически создать и настроить материалы"""
@@ -164,7 +166,7 @@ class SHARPDECIMATE_PT_main_panel(Panel):
         # === СТАТУС ОБЪЕКТА ===
         if context.active_object and context.active_object.type == 'MESH':
             obj = context.active_object
-            original_faces = len(obj.data.polygons)
+            original_faces = get_mesh_stats(obj).face_count
             
             box = layout.box()
             row = box.row()
@@ -195,6 +197,27 @@ class SHARPDECIMATE_PT_main_panel(Panel):
             # STANDARD MODE
             self.draw_standard_mode(layout, context, props, lang)
         
+        # Предпросмотр
+        self.draw_preview_settings(layout, context, lang)
+        
+        # Алгоритм децимации
+        self.draw_engine_settings(layout, props, lang)
+        
+        # Бюджет треугольников
+        self.draw_budget_settings(layout, props, lang)
+        
+        # Геометрическая ошибка
+        self.draw_error_settings(layout, props, lang)
+        
+        # Политики островов
+        self.draw_island_settings(layout, props, lang)
+        
+        # LOD-цепочка
+        self.draw_lod_settings(layout, props, lang)
+        
+        # Параллельная обработка
+        self.draw_performance_settings(layout, props, lang)
+        
         # Основная кнопка генерации
         layout.separator()
         box = layout.box()
@@ -207,6 +230,12 @@ class SHARPDECIMATE_PT_main_panel(Panel):
             text=get_text("generate_button", lang),
             icon='EXPORT'
         )
+        row = col.row()
+        row.operator(
+            "mesh.sharpdecimate_batch_decimate",
+            text=get_text("batch_button", lang),
+            icon='DOCUMENTS'
+        )
         
         # Информация о режиме
         if props.use_material_decimation:
@@ -235,7 +264,7 @@ class SHARPDECIMATE_PT_main_panel(Panel):
         # Статистика
         if context.active_object and context.active_object.type == 'MESH':
             obj = context.active_object
-            original_faces = len(obj.data.polygons)
+            original_faces = get_mesh_stats(obj).face_count
             target_faces = int(original_faces * props.ratio)
             reduction = (1 - props.ratio) * 100
             
@@ -249,6 +278,7 @@ class SHARPDECIMATE_PT_main_panel(Panel):
         col.prop(props, "sharp_angle", text=get_text("sharp_angle", lang))
         col.prop(props, "keep_sharp", text=get_text("keep_sharp", lang))
         col.prop(props, "keep_crease", text=get_text("keep_crease", lang))
+        col.prop(props, "edge_transfer_tolerance", text=get_text("edge_transfer_tolerance", lang))
     
     def draw_smart_mode(self, layout, context, props, lang):
         """Отрисовка smart режима"""
@@ -286,16 +316,14 @@ class SHARPDECIMATE_PT_main_panel(Panel):
         if context.active_object and context.active_object.type == 'MESH':
             obj = context.active_object
             if obj.data.materials:
-                high_detail_faces = 0
-                low_detail_faces = 0
-                
-                for poly in obj.data.polygons:
-                    if poly.material_index < len(obj.data.materials):
-                        mat = obj.data.materials[poly.material_index]
-                        if mat and get_text("high_detail_material", lang) in mat.name:
-                            high_detail_faces += 1
-                        else:
-                            low_detail_faces += 1
+                # Число полигонов по слотам берется из кэша, здесь - только проход по слотам
+                stats = get_mesh_stats(obj)
+                high_name = get_text("high_detail_material", lang)
+                materials = obj.data.materials
+                high_detail_faces = stats.count_faces(
+                    lambda index: materials[index] is not None and high_name in materials[index].name
+                )
+                low_detail_faces = sum(stats.material_face_counts) - high_detail_faces
                 
                 total_faces = high_detail_faces + low_detail_faces
                 if total_faces > 0:
@@ -311,6 +339,137 @@ class SHARPDECIMATE_PT_main_panel(Panel):
         col.prop(props, "sharp_angle", text=get_text("sharp_angle", lang))
         col.prop(props, "keep_sharp", text=get_text("keep_sharp", lang))
         col.prop(props, "keep_crease", text=get_text("keep_crease", lang))
+        col.prop(props, "edge_transfer_tolerance", text=get_text("edge_transfer_tolerance", lang))
+    
+    def draw_preview_settings(self, layout, context, lang):
+        """Отрисовка предпросмотра на живом стеке модификаторов"""
+        obj = context.active_object
+        box = layout.box()
+        box.label(text="👁️ " + get_text("preview", lang), icon='HIDE_OFF')
+        
+        if not is_preview_active(obj):
+            row = box.row()
+            row.operator("mesh.sharpdecimate_preview_start", text=get_text("preview_start", lang), icon='PLAY')
+            return
+        
+        preview_faces = get_preview_face_count(obj)
+        if preview_faces is not None:
+            row = box.row()
+            row.label(text=get_text("result_faces", lang) + f": {get_mesh_stats(obj).face_count} → {preview_faces}", icon='SORTTIME')
+        
+        row = box.row(align=True)
+        row.operator("mesh.sharpdecimate_preview_apply", text=get_text("preview_apply", lang), icon='CHECKMARK')
+        row.operator("mesh.sharpdecimate_preview_cancel", text=get_text("cancel", lang), icon='X')
+    
+    def draw_engine_settings(self, layout, props, lang):
+        """Отрисовка выбора алгоритма децимации"""
+        box = layout.box()
+        box.label(text="🧮 " + get_text("decimate_engine", lang), icon='MOD_DECIM')
+        
+        row = box.row()
+        row.prop(props, "decimate_engine", expand=True)
+        
+        if props.decimate_engine == 'QEM':
+            col = box.column(align=True)
+            col.prop(props, "qem_protection", text=get_text("qem_protection", lang))
+            row = col.row()
+            row.enabled = props.qem_protection == 'WEIGHT'
+            row.prop(props, "qem_protected_weight", text=get_text("qem_protected_weight", lang))
+        else:
+            col = box.column(align=True)
+            col.prop(props, "use_protection_weights", text=get_text("use_protection_weights", lang))
+            sub = col.column(align=True)
+            sub.enabled = props.use_protection_weights
+            sub.prop(props, "protection_strength", text=get_text("protection_strength", lang))
+            sub.prop(props, "protection_falloff", text=get_text("protection_falloff", lang))
+            sub.prop(props, "protect_high_detail", text=get_text("protect_high_detail", lang))
+        
+        # Карта важности работает с обоими движками
+        col = box.column(align=True)
+        col.prop(props, "use_importance", text=get_text("use_importance", lang))
+        row = col.row()
+        row.enabled = props.use_importance
+        row.prop(props, "importance_strength", text=get_text("importance_strength", lang))
+    
+    def draw_budget_settings(self, layout, props, lang):
+        """Отрисовка режима бюджета треугольников"""
+        box = layout.box()
+        box.label(text="🎯 " + get_text("target_budget", lang), icon='DRIVER_DISTANCE')
+        
+        row = box.row()
+        row.prop(props, "use_target_budget", text=get_text("use_target_budget", lang))
+        
+        col = box.column(align=True)
+        col.enabled = props.use_target_budget
+        col.prop(props, "target_triangles", text=get_text("target_triangles", lang))
+        col.prop(props, "target_tolerance", text=get_text("target_tolerance", lang))
+        col.prop(props, "target_max_evaluations", text=get_text("target_max_evaluations", lang))
+    
+    def draw_error_settings(self, layout, props, lang):
+        """Отрисовка измерения геометрической ошибки и поиска ratio под ошибку"""
+        box = layout.box()
+        box.label(text="📏 " + get_text("geometric_error", lang), icon='DRIVER_DISTANCE')
+        
+        col = box.column(align=True)
+        col.prop(props, "use_error_check", text=get_text("use_error_check", lang))
+        col.prop(props, "error_sample_count", text=get_text("error_sample_count", lang))
+        
+        col = box.column(align=True)
+        col.prop(props, "use_target_error", text=get_text("use_target_error", lang))
+        row = col.row()
+        row.enabled = props.use_target_error and not props.use_target_budget
+        row.prop(props, "target_max_error", text=get_text("target_max_error", lang))
+    
+    def draw_island_settings(self, layout, props, lang):
+        """Отрисовка политик островов"""
+        box = layout.box()
+        box.label(text="🏝️ " + get_text("island_policies", lang), icon='STICKY_UVS_DISABLE')
+        
+        row = box.row()
+        row.prop(props, "use_island_policies", text=get_text("use_island_policies", lang))
+        
+        col = box.column(align=True)
+        col.enabled = props.use_island_policies
+        col.prop(props, "island_size_threshold", text=get_text("island_size_threshold", lang))
+        col.prop(props, "island_small_policy", text=get_text("island_small_policy", lang))
+    
+    def draw_lod_settings(self, layout, props, lang):
+        """Отрисовка настроек LOD-цепочки"""
+        box = layout.box()
+        box.label(text="🪜 " + get_text("lod_chain", lang), icon='MOD_DECIM')
+        
+        col = box.column(align=True)
+        col.prop(props, "lod_levels", text=get_text("lod_levels", lang))
+        col.prop(props, "lod_cascade", text=get_text("lod_cascade", lang))
+        
+        row = box.row()
+        row.operator("mesh.sharpdecimate_generate_lod_chain", text=get_text("lod_generate", lang), icon='OUTLINER_COLLECTION')
+    
+    def draw_performance_settings(self, layout, props, lang):
+        """Отрисовка настроек параллельной обработки"""
+        box = layout.box()
+        box.label(text="⚡ " + get_text("performance", lang), icon='SYSTEM')
+        
+        row = box.row()
+        row.prop(props, "use_parallel", text=get_text("parallel_processing", lang))
+        
+        col = box.column(align=True)
+        col.enabled = props.use_parallel
+        col.prop(props, "parallel_workers", text=get_text("parallel_workers", lang))
+        col.prop(props, "parallel_granularity", text=get_text("parallel_granularity", lang))
+        col.prop(props, "parallel_merge_order", text=get_text("parallel_merge_order", lang))
+        
+        col = box.column(align=True)
+        col.prop(props, "use_chunking", text=get_text("use_chunking", lang))
+        row = col.row()
+        row.enabled = props.use_chunking
+        row.prop(props, "chunk_memory_budget", text=get_text("chunk_memory_budget", lang))
+        
+        col = box.column(align=True)
+        col.prop(props, "integrity_mode", text=get_text("integrity_mode", lang))
+        row = col.row()
+        row.enabled = props.integrity_mode == 'SAMPLED'
+        row.prop(props, "integrity_sample_size", text=get_text("integrity_sample_size", lang))
     
     def draw_pro_promotion(self, layout, lang):
         """Промо Pro-версии"""
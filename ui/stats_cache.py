@@ -0,0 +1,79 @@
+# FILE: ui/stats_cache.py
+import bpy
+from bpy.app.handlers import persistent
+
+# Статистика по объектам: имя объекта -> MeshStats
+_stats_cache = {}
+
+class MeshStats:
+    """Статистика меша для панели, пересчитывается только при изменении меша"""
+
+    def __init__(self, mesh):
+        self.mesh_name = mesh.name_full
+        self.face_count = len(mesh.polygons)
+        self.vertex_count = len(mesh.vertices)
+        self.material_face_counts = count_material_faces(mesh)
+
+    def count_faces(self, slot_filter):
+        """Число полигонов в слотах материалов, для которых slot_filter(index) истинно"""
+        return sum(count for index, count in enumerate(self.material_face_counts) if slot_filter(index))
+
+def count_material_faces(mesh):
+    """Число полигонов в каждом слоте материала (индексы вне слотов не учитываются)"""
+    # NumPy загружается при первом подсчете, а не при включении аддона
+    from ..core.mesh_arrays import HAS_NUMPY, np, get_polygon_material_indices
+
+    slot_count = len(mesh.materials)
+    if HAS_NUMPY:
+        counts = np.bincount(get_polygon_material_indices(mesh), minlength=slot_count)
+        return counts[:slot_count].tolist()
+
+    counts = [0] * slot_count
+    for poly in mesh.polygons:
+        if poly.material_index < slot_count:
+            counts[poly.material_index] += 1
+    return counts
+
+def get_mesh_stats(obj):
+    """Статистика объекта из кэша (считается при первом обращении после изменения)"""
+    stats = _stats_cache.get(obj.name_full)
+    if stats is None or stats.mesh_name != obj.data.name_full:
+        stats = MeshStats(obj.data)
+        _stats_cache[obj.name_full] = stats
+    return stats
+
+def invalidate_stats(name=None):
+    if name is None:
+        _stats_cache.clear()
+    else:
+        _stats_cache.pop(name, None)
+
+@persistent
+def on_depsgraph_update(scene, depsgraph):
+    """Сброс статистики объектов, у которых изменилась геометрия"""
+    if not _stats_cache:
+        return
+    for update in depsgraph.updates:
+        data = update.id.original
+        if isinstance(data, bpy.types.Object):
+            if update.is_updated_geometry:
+                invalidate_stats(data.name_full)
+        elif isinstance(data, bpy.types.Mesh):
+            # Меш может использоваться несколькими объектами
+            invalidate_stats()
+            return
+
+@persistent
+def on_load_post(*args):
+    invalidate_stats()
+
+def register():
+    bpy.app.handlers.depsgraph_update_post.append(on_depsgraph_update)
+    bpy.app.handlers.load_post.append(on_load_post)
+
+def unregister():
+    if on_depsgraph_update in bpy.app.handlers.depsgraph_update_post:
+        bpy.app.handlers.depsgraph_update_post.remove(on_depsgraph_update)
+    if on_load_post in bpy.app.handlers.load_post:
+        bpy.app.handlers.load_post.remove(on_load_post)
+    invalidate_stats()